@@ -1,8 +1,13 @@
+import os
 import pygame
-import tkinter as tk
-from tkinter import filedialog
 from models.shapes import ShapeFactory
-from views.color_picker_modal import tk_color_picker
+from models.journal import EditJournal
+from models.transform import AffineTransform
+from models.svg import write_svg, load_svg
+from controllers.input_recorder import LiveInputState
+from views.dialog_service import DialogService, DIALOG_RESULT
+from views.band_exporter import BandExporter
+from views.comparison_view import ComparisonView
 
 class DrawingController:
     def __init__(self, canvas, canvasView, toolbarView=None):
@@ -22,21 +27,178 @@ class DrawingController:
         self.current_color = (0, 0, 0)
         self.currentLineWidth = 1
         self.tempPoints = []
+        self.pathShape = None  # Trayectoria (POLYLINE) del polígono en construcción
+        self.journal = None  # Journal del documento abierto o guardado por última vez
+        self.dragPos = None  # Última posición del arrastre con la herramienta SELECT
+        # Estado de ratón y teclado; la reproducción de grabaciones lo reemplaza
+        self.inputState = LiveInputState()
+        # Diálogos de archivo y color; sus resultados llegan como eventos DIALOG_RESULT
+        self.dialogs = DialogService()
+        # Aplanado automático: al superar autoFlattenThreshold figuras se hornean en el
+        # fondo todas menos las flattenKeepRecent más recientes (None lo desactiva)
+        self.autoFlattenThreshold = None
+        self.flattenKeepRecent = 100
+        # Escala de la exportación PNG (1.0: mismo tamaño que el canvas en pantalla)
+        self.exportScale = 1.0
+        # Familias que compara el modo de comparación de algoritmos (tecla C)
+        self.compareFamilies = ("BASIC", "PYGAME")
 
     def handleEvent(self, event):
+        if event.type == DIALOG_RESULT:
+            self.handleDialogResult(event)
+            return
+        if self.currentTool == "SELECT" and self.handleSelectionEvent(event):
+            return
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.pos[0] > self.canvasView.toolbar_width:
                 if event.button == 1:
-                    self.tempPoints.append(event.pos)
+                    if self.currentTool == "POLYGON":
+                        self.addPathVertex(event.pos)
+                    else:
+                        self.tempPoints.append(event.pos)
                 elif event.button == 3:
                     self.processShape(event.pos)
+                    self.autoFlatten()
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_s:
                 self.saveCanvas()
             elif event.key == pygame.K_e:
                 self.exportCanvas()
+            elif event.key == pygame.K_f:
+                self.flattenHistory()
+            elif event.key == pygame.K_b:
+                # Alterna entre los algoritmos básicos y los enteros de Bresenham
+                self.setAlgorithm("BRESENHAM" if self.currentAlgorithm == "BASIC" else "BASIC")
+            elif event.key == pygame.K_c:
+                self.toggleComparison()
+            elif self.canvasView.comparison is not None:
+                comparison = self.canvasView.comparison
+                if event.key == pygame.K_v:
+                    comparison.toggleMode()
+                elif event.key == pygame.K_TAB:
+                    comparison.toggleShown()
+                elif event.key == pygame.K_d:
+                    comparison.highlight = not comparison.highlight
         # Se pueden agregar otros atajos si se desea
 
+    def handleSelectionEvent(self, event):
+        """
+        Maneja selección, resaltado y movimiento de figuras con la herramienta SELECT.
+
+        Args:
+            event (pygame.event.Event): Evento de Pygame.
+
+        Returns:
+            bool: True si el evento fue consumido por la selección.
+        """
+        view = self.canvasView
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if event.pos[0] <= view.toolbar_width:
+                return False
+            shape = view.pickShape(event.pos)
+            if shape is None:
+                view.selected_shapes = []
+            elif self.inputState.keyMods() & pygame.KMOD_SHIFT:
+                if shape in view.selected_shapes:
+                    view.selected_shapes.remove(shape)
+                else:
+                    view.selected_shapes.append(shape)
+            elif shape not in view.selected_shapes:
+                view.selected_shapes = [shape]
+            self.dragPos = event.pos if shape is not None else None
+            return True
+        elif event.type == pygame.MOUSEMOTION:
+            if self.dragPos is not None:
+                dx = event.pos[0] - self.dragPos[0]
+                dy = event.pos[1] - self.dragPos[1]
+                self.dragPos = event.pos
+                self.moveSelection(dx, dy)
+            else:
+                view.hovered_shape = view.pickShape(event.pos)
+            return True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragPos = None
+            return True
+        elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            # Los demás botones no hacen nada con SELECT (no hay figura que crear)
+            return event.pos[0] > view.toolbar_width
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_DELETE:
+            for shape in list(view.selected_shapes):
+                self.canvas.removeShape(shape)
+            view.selected_shapes = []
+            view.hovered_shape = None
+            return True
+        elif event.type == pygame.KEYDOWN and view.selected_shapes:
+            center = self.selectionCenter()
+            if event.key == pygame.K_r:
+                angle = -15 if self.inputState.keyMods() & pygame.KMOD_SHIFT else 15
+                self.transformSelection(AffineTransform.rotation(angle, center))
+                return True
+            elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                self.transformSelection(AffineTransform.scaling(1.1, center=center))
+                return True
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self.transformSelection(AffineTransform.scaling(1 / 1.1, center=center))
+                return True
+        return False
+
+    def moveSelection(self, dx, dy):
+        """
+        Desplaza las figuras seleccionadas.
+
+        Args:
+            dx (int): Desplazamiento horizontal.
+            dy (int): Desplazamiento vertical.
+        """
+        self.transformSelection(AffineTransform.translation(dx, dy))
+
+    def transformSelection(self, transform):
+        """
+        Aplica una transformación afín a todas las figuras seleccionadas en una sola operación.
+
+        Args:
+            transform (AffineTransform): Transformación a aplicar.
+        """
+        shapes = self.canvasView.selected_shapes
+        if shapes and not transform.preservesAxes():
+            # Rectángulos y áreas de borrado son cajas paralelas a los ejes: no se giran
+            boxes = [shape for shape in shapes if transform.isAxisAligned(shape)]
+            if boxes:
+                print("Los rectángulos solo admiten giros de 90°; se dejan sin girar")
+                shapes = [shape for shape in shapes if shape not in boxes]
+        if shapes:
+            self.canvas.transformShapes(shapes, transform)
+
+    def selectionCenter(self):
+        """
+        Calcula el centro del rectángulo que envuelve las figuras seleccionadas.
+
+        Returns:
+            tuple: Coordenadas del centro.
+        """
+        shapes = self.canvasView.selected_shapes
+        rect = shapes[0].drawingAlgorithm.bounds(shapes[0]).unionall(
+            [shape.drawingAlgorithm.bounds(shape) for shape in shapes[1:]])
+        return rect.center
+
+    def flattenHistory(self, keep=0):
+        """
+        Hornea las figuras más antiguas en el mapa de bits de fondo del canvas. Dejan de
+        poder seleccionarse y editarse, pero no vuelven a costar en cada render.
+
+        Args:
+            keep (int, opcional): Número de figuras recientes que se conservan editables.
+        """
+        count = len(self.canvas.shapes) - keep
+        if count <= 0:
+            return
+        self.canvas.flatten(count, self.canvasView.canvas_rect)
+        self.canvasView.render()
+
+    def autoFlatten(self):
+        if self.autoFlattenThreshold is not None and len(self.canvas.shapes) > self.autoFlattenThreshold:
+            self.flattenHistory(min(self.flattenKeepRecent, self.autoFlattenThreshold))
+
     def processShape(self, pos):
         """
         Procesa la acción de la herramienta seleccionada en función de la posición dada.
@@ -45,32 +207,25 @@ class DrawingController:
             pos (tuple): Coordenadas del punto donde se realiza la acción.
         """
         if self.currentTool == "POLYGON":
-            if pygame.mouse.get_pressed()[0]:  # Clic izquierdo
-                self.tempPoints.append(pos)
-                if len(self.tempPoints) > 1:
-                    # Dibuja una línea entre el último punto y el anterior
-                    shape = ShapeFactory.createShape(
-                        "LINE",
-                        self.tempPoints[-2:],
-                        self.current_color,
-                        self.currentLineWidth,
-                        self.currentAlgorithm
-                    )
-                    self.canvas.addShape(shape)
-                    self.canvasView.render()
-            elif pygame.mouse.get_pressed()[2]:  # Clic derecho
+            if self.inputState.mousePressed()[0]:  # Clic izquierdo
+                self.addPathVertex(pos)
+            elif self.inputState.mousePressed()[2]:  # Clic derecho
+                if self.pathShape is not None and self.pathShape in self.canvas.shapes:
+                    # La trayectoria solo era la vista previa: se quita tanto si el
+                    # polígono se cierra como si se cancela con menos de 3 vértices
+                    self.canvas.removeShape(self.pathShape)
                 if len(self.tempPoints) > 2:
                     # Cierra el polígono uniendo el último punto con el primero
-                    self.tempPoints.append(self.tempPoints[0])
                     polygon = ShapeFactory.createShape(
                         "POLYGON",
-                        self.tempPoints,
+                        self.tempPoints + [self.tempPoints[0]],
                         self.current_color,
                         self.currentLineWidth,
                         self.currentAlgorithm
                     )
                     self.canvas.addShape(polygon)
-                    self.canvasView.render()
+                self.canvasView.render()
+                self.pathShape = None
                 self.tempPoints = []  # Reinicia los puntos temporales
         elif self.currentTool == "ERASE_AREA":
             if len(self.tempPoints) >= 1:
@@ -90,6 +245,32 @@ class DrawingController:
             self.canvasView.render()
             self.tempPoints = []  # Reinicia los puntos temporales después de dibujar
 
+    def addPathVertex(self, pos):
+        """
+        Agrega un vértice al polígono en construcción. Mientras se construye, todos sus
+        lados forman una única figura POLYLINE que se actualiza en el sitio con cada
+        vértice; al cerrarlo se reemplaza por la figura POLYGON.
+
+        Args:
+            pos (tuple): Coordenadas del nuevo vértice.
+        """
+        self.tempPoints.append(pos)
+        if len(self.tempPoints) < 2:
+            return
+        if self.pathShape is not None and self.pathShape in self.canvas.shapes:
+            self.canvas.updateShape(self.pathShape, list(self.tempPoints))
+        else:
+            # Primer lado, o la trayectoria se borró mientras se construía
+            self.pathShape = ShapeFactory.createShape(
+                "POLYLINE",
+                list(self.tempPoints),
+                self.current_color,
+                self.currentLineWidth,
+                self.currentAlgorithm
+            )
+            self.canvas.addShape(self.pathShape)
+        self.canvasView.render()
+
     def createShapeFromInput(self, points, color, lineWidth):
         shape = ShapeFactory.createShape(self.currentTool, points, color, lineWidth, self.currentAlgorithm)
         self.canvas.addShape(shape)
@@ -97,7 +278,13 @@ class DrawingController:
 
     def setTool(self, tool):
         self.currentTool = tool
+        self.tempPoints = []
+        self.pathShape = None
         print(f"Herramienta seleccionada: {tool}")
+        if tool != "SELECT":
+            self.canvasView.selected_shapes = []
+            self.canvasView.hovered_shape = None
+            self.dragPos = None
         if tool == "ERASE_AREA":
             self.currentAlgorithm = "BASIC"
             if hasattr(self.canvasView, 'toolbar'):
@@ -113,11 +300,29 @@ class DrawingController:
         self.currentAlgorithm = algorithm
         print(f"Algoritmo seleccionado: {algorithm}")
 
+    def toggleComparison(self):
+        """
+        Activa o desactiva la comparación en vivo de dos familias de algoritmos. Al
+        desactivarla se imprime el resumen de tiempos y diferencias por tipo de figura.
+        """
+        comparison = self.canvasView.comparison
+        if comparison is None:
+            self.canvasView.comparison = ComparisonView(self.canvas, self.canvasView, self.compareFamilies)
+            print(f"Comparación de algoritmos activada: {' / '.join(self.compareFamilies)} "
+                  "(V: lado a lado o superpuesto, Tab: familia visible, D: resaltar diferencias)")
+        else:
+            comparison.printSummary()
+            comparison.close()
+            self.canvasView.comparison = None
+            print("Comparación de algoritmos desactivada")
+
     def setBrushColor(self):
         """
         Abre el selector de color para el pincel y actualiza el color seleccionado.
         """
-        new_color = self.openColorPicker(self.current_color)
+        self.openColorPicker(self.current_color, "brush_color")
+
+    def applyBrushColor(self, new_color):
         if new_color:
             self.current_color = new_color
             # Actualizar el color de fondo del botón de pincel
@@ -127,38 +332,73 @@ class DrawingController:
         """
         Abre el selector de color para el lienzo y actualiza el color seleccionado.
         """
-        new_color = self.openColorPicker(self.canvas.background_color)
+        self.openColorPicker(self.canvas.background_color, "canvas_color")
+
+    def applyCanvasColor(self, new_color):
         if new_color:
             self.canvas.background_color = new_color
             # Actualizar el color de fondo del botón de lienzo
             self.toolbarView.canvas_color_btn.bg_color = new_color
             self.canvasView.render()
 
+    def handleDialogResult(self, event):
+        """
+        Aplica el resultado de un diálogo pedido a DialogService.
+
+        Args:
+            event (pygame.event.Event): Evento DIALOG_RESULT con tag y result.
+        """
+        if event.tag == "save":
+            self.finishSave(event.result)
+        elif event.tag == "export":
+            self.finishExport(event.result)
+        elif event.tag == "open":
+            self.finishOpen(event.result)
+        elif event.tag == "brush_color":
+            self.applyBrushColor(event.result[0] if event.result else None)
+        elif event.tag == "canvas_color":
+            self.applyCanvasColor(event.result[0] if event.result else None)
+
     def saveCanvas(self):
-        root = tk.Tk()
-        root.withdraw()
-        file_path = filedialog.asksaveasfilename(
+        self.dialogs.askSaveFilename(
+            "save",
             title="Guardar Canvas",
             defaultextension=".json",
             filetypes=[("Archivos JSON", "*.json")]
         )
-        root.destroy()
+
+    def finishSave(self, file_path):
         if file_path:
-            json_data = self.canvas.to_json()
-            with open(file_path, "w") as f:
-                f.write(json_data)
+            if self.journal is not None and self.journal.document_path == os.path.abspath(file_path):
+                # Mismo documento: basta con confirmar las operaciones del journal
+                self.journal.commit()
+            else:
+                if self.journal is not None:
+                    self.journal.close()
+                self.journal = EditJournal.create(self.canvas, file_path)
             print(f"Canvas guardado en '{file_path}' (JSON)")
 
     def exportCanvas(self):
-        root = tk.Tk()
-        root.withdraw()
-        file_path = filedialog.asksaveasfilename(
+        self.dialogs.askSaveFilename(
+            "export",
             title="Exportar Canvas",
             defaultextension=".jpg",
-            filetypes=[("JPEG", "*.jpg"), ("PNG", "*.png")]
+            filetypes=[("JPEG", "*.jpg"), ("PNG", "*.png"), ("SVG", "*.svg")]
         )
-        root.destroy()
-        if file_path:
+
+    def finishExport(self, file_path):
+        if file_path and file_path.lower().endswith(".svg"):
+            # Exportación vectorial: se escribe directamente desde los puntos de las figuras
+            with open(file_path, "w", encoding="utf-8") as f:
+                write_svg(self.canvas, f, self.canvasView.canvas_rect)
+            print(f"Canvas exportado a '{file_path}' (SVG)")
+        elif file_path and file_path.lower().endswith(".png"):
+            # PNG rasterizado por franjas desde el modelo, sin copiar la pantalla
+            exporter = BandExporter(self.canvasView.canvas_rect, self.exportScale)
+            with open(file_path, "wb") as f:
+                width, height = exporter.export(self.canvas, f)
+            print(f"Canvas exportado a '{file_path}' (PNG de {width}x{height})")
+        elif file_path:
             rect = self.canvasView.canvas_rect
             canvas_surface = pygame.Surface((rect.width, rect.height))
             canvas_surface.blit(self.canvasView.surface, (0, 0), rect)
@@ -173,18 +413,22 @@ class DrawingController:
                 print("Matplotlib o Numpy no están instalados.")
 
     def openCanvas(self):
-        root = tk.Tk()
-        root.withdraw()
-        file_path = filedialog.askopenfilename(
+        self.dialogs.askOpenFilename(
+            "open",
             title="Abrir Canvas",
-            filetypes=[("Archivos JSON", "*.json")]
+            filetypes=[("Archivos JSON", "*.json"), ("SVG", "*.svg")]
         )
-        root.destroy()
+
+    def finishOpen(self, file_path):
         if file_path:
             try:
-                with open(file_path, "r") as f:
-                    json_data = f.read()
-                self.canvas.load_json(json_data)
+                if self.journal is not None:
+                    self.journal.close()
+                    self.journal = None
+                if file_path.lower().endswith(".svg"):
+                    load_svg(self.canvas, file_path)
+                else:
+                    self.journal = EditJournal.openDocument(self.canvas, file_path)
                 self.canvasView.render()
                 print(f"Canvas abierto desde '{file_path}'")
             except Exception as e:
@@ -198,18 +442,16 @@ class DrawingController:
         elif action == "Exportar":
             self.exportCanvas()
 
-    def openColorPicker(self, initial_color):
+    def openColorPicker(self, initial_color, tag):
         """
-        Abre un selector de color y devuelve el color seleccionado.
+        Abre un selector de color sin bloquear; el color elegido llega como un evento
+        DIALOG_RESULT con la etiqueta indicada.
 
         Args:
             initial_color (tuple): Color inicial que se mostrará en el selector.
-
-        Returns:
-            tuple: Color seleccionado en formato RGB, o None si se cancela.
+            tag (str): Etiqueta del resultado ("brush_color" o "canvas_color").
         """
-        new_color, _ = tk_color_picker(initial_color, self.currentLineWidth, "Seleccione un color", show_thickness=False)
-        return new_color
+        self.dialogs.askColor(tag, initial_color, self.currentLineWidth, "Seleccione un color", show_thickness=False)
 
     def eraseShapesInArea(self, points):
         """
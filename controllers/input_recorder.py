@@ -0,0 +1,124 @@
+import json
+import time
+import pygame
+
+class LiveInputState:
+    """
+    Estado del ratón y del teclado leído directamente de Pygame.
+    """
+    def mousePressed(self):
+        return pygame.mouse.get_pressed()
+
+    def keyMods(self):
+        return pygame.key.get_mods()
+
+class ReplayInputState:
+    """
+    Estado del ratón y del teclado tomado de una grabación, para que la reproducción
+    no dependa del estado real de los dispositivos.
+    """
+    def __init__(self):
+        self.pressed = (False, False, False)
+        self.mods = 0
+
+    def mousePressed(self):
+        return self.pressed
+
+    def keyMods(self):
+        return self.mods
+
+def _to_json(value):
+    if isinstance(value, (tuple, list)):
+        return [_to_json(v) for v in value]
+    if isinstance(value, (int, float, str, bool)) or value is None:
+        return value
+    return str(value)
+
+def _from_json(value):
+    if isinstance(value, list):
+        return tuple(_from_json(v) for v in value)
+    return value
+
+class EventRecorder:
+    """
+    Graba en un archivo los eventos de Pygame que llegan a ToolbarView.handle_event y
+    EventHandler.processEvent.
+
+    El archivo tiene una cabecera JSON seguida de un evento por línea con su instante
+    (segundos desde el inicio), el número de cuadro en que se procesó, su tipo, sus
+    atributos y el estado de los botones del ratón y de las teclas modificadoras en ese
+    momento. La cabecera guarda el tamaño de la ventana y las opciones de línea de
+    comandos con que se inició la aplicación (auto_flatten, indexed_color, compare y
+    export_scale), para que la reproducción se construya igual.
+
+    Atributos:
+        path (str): Ruta del archivo de grabación.
+        frame (int): Número del cuadro actual.
+    """
+    VERSION = 1
+
+    def __init__(self, path, window_size, options=None):
+        self.path = path
+        self.frame = 0
+        self._start = time.perf_counter()
+        self._file = open(path, "w", encoding="utf-8")
+        header = {"version": self.VERSION, "window": list(window_size), "options": dict(options or {})}
+        self._file.write(json.dumps(header) + "\n")
+
+    def record(self, event, inputState=None):
+        """
+        Graba un evento.
+
+        Args:
+            event (pygame.event.Event): Evento a grabar.
+            inputState (LiveInputState, opcional): Estado de los dispositivos a grabar.
+        """
+        inputState = inputState or LiveInputState()
+        entry = {
+            "t": round(time.perf_counter() - self._start, 6),
+            "frame": self.frame,
+            "type": event.type,
+            "name": pygame.event.event_name(event.type),
+            "dict": {key: _to_json(value) for key, value in event.dict.items()},
+            "pressed": list(inputState.mousePressed()),
+            "mods": inputState.keyMods()
+        }
+        self._file.write(json.dumps(entry) + "\n")
+
+    def nextFrame(self):
+        self.frame += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def load_recording(path):
+    """
+    Lee una grabación hecha con EventRecorder.
+
+    Args:
+        path (str): Ruta del archivo de grabación.
+
+    Returns:
+        tuple: (cabecera, lista de entradas). Cada entrada es un dict con "t", "frame",
+        "event" (pygame.event.Event), "pressed" y "mods".
+    """
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != EventRecorder.VERSION:
+            raise ValueError(f"Versión de grabación no soportada: {header.get('version')}")
+        for line in f:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            attributes = {key: _from_json(value) for key, value in data["dict"].items()}
+            entries.append({
+                "t": data["t"],
+                "frame": data["frame"],
+                "event": pygame.event.Event(data["type"], attributes),
+                "pressed": tuple(data["pressed"]),
+                "mods": data["mods"]
+            })
+    return header, entries
@@ -1,9 +1,26 @@
 import sys
+import argparse
 import pygame
 from models.canvas import Canvas
 from views.canvas_view import CanvasView
 from views.toolbar_view import ToolbarView
 from controllers.super_controller import SuperController
+from controllers.input_recorder import EventRecorder
+
+parser = argparse.ArgumentParser(description="Graficador")
+parser.add_argument("--record", metavar="RUTA", help="Graba los eventos de la sesión para reproducirlos con tools.replay")
+parser.add_argument("--auto-flatten", metavar="N", type=int,
+                    help="Aplana en el fondo las figuras más antiguas al superar N figuras")
+parser.add_argument("--export-scale", metavar="FACTOR", type=float, default=1.0,
+                    help="Escala de la exportación a PNG (por ejemplo 10 para un póster)")
+parser.add_argument("--indexed-color", action="store_true",
+                    help="Guarda las capas aplanadas y la caché de sprites con paleta de 8 bits")
+parser.add_argument("--compare", metavar="A,B", type=lambda value: tuple(value.upper().split(",")),
+                    help="Inicia comparando dos familias de algoritmos (por ejemplo BASIC,PYGAME)")
+args = parser.parse_args()
+if args.compare is not None and (len(args.compare) != 2 or
+                                 not set(args.compare) <= {"BASIC", "PYGAME", "BRESENHAM"}):
+    parser.error("--compare espera dos familias entre BASIC, PYGAME y BRESENHAM, por ejemplo BASIC,PYGAME")
 
 pygame.init()
 
@@ -13,7 +30,7 @@ screen = pygame.display.set_mode((window_width, window_height), pygame.RESIZABLE
 pygame.display.set_caption("Graficador")
 
 # Modelo
-canvas = Canvas()
+canvas = Canvas(indexed_color=args.indexed_color)
 
 # Vista
 canvasView = CanvasView(canvas, screen, toolbar_width)
@@ -31,6 +48,20 @@ toolbarView = ToolbarView(
 
 # Asegúrate de pasar toolbarView al DrawingController
 superController.drawingController.toolbarView = toolbarView
+superController.drawingController.autoFlattenThreshold = args.auto_flatten
+superController.drawingController.exportScale = args.export_scale
+if args.compare:
+    superController.drawingController.compareFamilies = args.compare
+    superController.drawingController.toggleComparison()
+
+# Grabación opcional de la sesión
+options = {
+    "auto_flatten": args.auto_flatten,
+    "indexed_color": args.indexed_color,
+    "compare": list(args.compare) if args.compare else None,
+    "export_scale": args.export_scale
+}
+recorder = EventRecorder(args.record, (window_width, window_height), options) if args.record else None
 
 clock = pygame.time.Clock()
 running = True
@@ -43,6 +74,8 @@ while running:
             # Aquí podrías actualizar el layout si lo deseas
             pass
         else:
+            if recorder:
+                recorder.record(event, superController.drawingController.inputState)
             # Procesar eventos de la toolbar
             if not toolbarView.handle_event(event):
                 # Si la toolbar no consumió el evento, se pasa al controlador
@@ -52,6 +85,13 @@ while running:
     toolbarView.draw()
     clock.tick(60)
     pygame.display.flip()
+    if recorder:
+        recorder.nextFrame()
 
+if recorder:
+    recorder.close()
+if canvasView.comparison is not None:
+    canvasView.comparison.printSummary()
+superController.drawingController.dialogs.close()
 pygame.quit()
 sys.exit()
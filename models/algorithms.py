@@ -1,16 +1,428 @@
 import pygame
 import math
-from models.shapes import Circle, Line, Rectangle, Polygon, Curve
+import numpy as np
+from models.shapes import Circle, Ellipse, Line, Rectangle, Polygon, Polyline, Curve
 from abc import ABC, abstractmethod
 
+def clip_parameters(x1, y1, x2, y2, left, top, right, bottom):
+    """
+    Recorta analíticamente un segmento contra un rectángulo (Liang–Barsky).
+
+    Args:
+        x1, y1, x2, y2 (float): Extremos del segmento.
+        left, top, right, bottom (float): Límites inclusivos del rectángulo.
+
+    Returns:
+        tuple: Parámetros (t0, t1) del tramo visible, con 0 <= t0 <= t1 <= 1, o None si
+        el segmento queda completamente fuera.
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x1 - left), (dx, right - x1), (-dy, y1 - top), (dy, bottom - y1)):
+        if p == 0:
+            if q < 0:
+                return None
+        else:
+            r = q / p
+            if p < 0:
+                if r > t1:
+                    return None
+                if r > t0:
+                    t0 = r
+            else:
+                if r < t0:
+                    return None
+                if r < t1:
+                    t1 = r
+    return t0, t1
+
+def clip_segment(p1, p2, canvas_rect):
+    """
+    Recorta el segmento p1-p2 al área de píxeles del canvas.
+
+    Returns:
+        tuple: Extremos enteros del tramo visible, o None si no hay tramo visible.
+    """
+    params = clip_parameters(p1[0], p1[1], p2[0], p2[1],
+                             canvas_rect.left, canvas_rect.top, canvas_rect.right - 1, canvas_rect.bottom - 1)
+    if params is None:
+        return None
+    t0, t1 = params
+    dx = p2[0] - p1[0]
+    dy = p2[1] - p1[1]
+    start = p1 if t0 == 0 else (round(p1[0] + t0 * dx), round(p1[1] + t0 * dy))
+    end = p2 if t1 == 1 else (round(p1[0] + t1 * dx), round(p1[1] + t1 * dy))
+    return start, end
+
+def draw_clipped_lines(surface, color, points, closed, thickness, canvas_rect):
+    """
+    Dibuja una polilínea recortando cada tramo al canvas antes de rasterizarlo, de modo
+    que los tramos fuera del canvas no cuestan nada y los parcialmente visibles
+    conservan su geometría.
+    """
+    count = len(points)
+    last = count if closed and count > 2 else count - 1
+    for i in range(last):
+        segment = clip_segment(points[i], points[(i + 1) % count], canvas_rect)
+        if segment is not None:
+            draw_line(surface, color, segment[0], segment[1], thickness)
+
+def pygame_line_runs(x1, y1, x2, y2, width, rows):
+    """
+    Tramos horizontales de los píxeles que pinta pygame.draw.line en una superficie que
+    contiene el segmento completo.
+
+    pygame.draw.line recorre el segmento con Bresenham y, con grosor mayor que 1,
+    pinta en cada paso un tramo de width píxeles perpendicular al eje mayor. Antes
+    recorta los extremos contra el área de recorte de la superficie y traza el segmento
+    recortado, por lo que un segmento que sale de la superficie se desplaza.
+    Aquí cada fila se calcula directamente a partir del segmento completo: el error del
+    paso k queda siempre en [0, d_mayor), así que el desplazamiento del eje menor es
+    ceil((k·d_menor - e0) / d_mayor), con e0 = d_mayor // 2.
+
+    Args:
+        rows (tuple): Filas (mínima, máxima) que se generan.
+
+    Returns:
+        list: Tramos (y, x_inicial, x_final).
+    """
+    half = width // 2 if width > 1 else 0
+    extra = 1 - width % 2 if width > 1 else 0
+    dx, dy = abs(x2 - x1), abs(y2 - y1)
+    sx = 1 if x2 > x1 else -1
+    sy = 1 if y2 > y1 else -1
+    runs = []
+    if dx == 0 and dy == 0:
+        if rows[0] <= y1 <= rows[1]:
+            runs.append((y1, x1 - half + extra, x1 + half))
+        return runs
+    if dx <= dy:
+        # Un paso por fila; el grosor se extiende en x
+        e0 = dy // 2
+        first, last = (rows[0] - y1, rows[1] - y1) if sy > 0 else (y1 - rows[1], y1 - rows[0])
+        for j in range(max(0, first), min(dy, last) + 1):
+            x = x1 + sx * -((e0 - j * dx) // dy)
+            runs.append((y1 + sy * j, x - half + extra, x + half))
+        return runs
+    # Un paso por columna; el grosor se extiende en y. La fila r recibe las columnas
+    # cuyo desplazamiento en y cae en [low, high], que son consecutivas.
+    e0 = dx // 2
+    for r in range(rows[0], rows[1] + 1):
+        if sy > 0:
+            low, high = r - half - y1, r + half - extra - y1
+        else:
+            low, high = y1 - r - half + extra, y1 - r + half
+        if dy == 0:
+            if low > 0 or high < 0:
+                continue
+            k_min, k_max = 0, dx
+        else:
+            k_min = max(0, ((low - 1) * dx + e0) // dy + 1)
+            k_max = min(dx, (high * dx + e0) // dy)
+        if k_min <= k_max:
+            xa, xb = x1 + sx * k_min, x1 + sx * k_max
+            runs.append((r, min(xa, xb), max(xa, xb)))
+    return runs
+
+def draw_line(surface, color, start, end, width=1):
+    """
+    Equivale a pygame.draw.line, pero el resultado no depende del área de recorte de
+    la superficie: cada píxel pintado es el mismo que con una superficie que contiene
+    todo el segmento. Así una franja de exportación o una región redibujada coinciden
+    con el render completo.
+
+    Si el segmento y su grosor caben en el área de recorte (lo habitual en pantalla,
+    donde los tramos ya vienen recortados al canvas) se dibuja con pygame.draw.line.
+    """
+    (x1, y1), (x2, y2) = start, end
+    clip = surface.get_clip()
+    pad = width // 2 + 1
+    if (clip.left <= min(x1, x2) - pad and max(x1, x2) + pad < clip.right and
+            clip.top <= min(y1, y2) - pad and max(y1, y2) + pad < clip.bottom):
+        pygame.draw.line(surface, color, start, end, width)
+        return
+    # Solo las filas que, con el grosor, pueden caer en el área visible
+    rows = (max(clip.top, min(y1, y2) - pad), min(clip.bottom - 1, max(y1, y2) + pad))
+    if rows[0] <= rows[1]:
+        fill_runs(surface, pygame_line_runs(x1, y1, x2, y2, width, rows), color, clip)
+
+def draw_lines(surface, color, closed, points, width=1):
+    """
+    Equivale a pygame.draw.lines (y a pygame.draw.polygon con grosor, si closed), con
+    draw_line en cada tramo cuando la polilínea no cabe en el área de recorte.
+    """
+    count = len(points)
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    clip = surface.get_clip()
+    pad = width // 2 + 1
+    if (clip.left <= min(xs) - pad and max(xs) + pad < clip.right and
+            clip.top <= min(ys) - pad and max(ys) + pad < clip.bottom):
+        pygame.draw.lines(surface, color, closed, points, width)
+        return
+    last = count if closed and count > 2 else count - 1
+    for i in range(last):
+        draw_line(surface, color, points[i], points[(i + 1) % count], width)
+
+def bezier_points(p0, p1, p2, steps=100):
+    """
+    Muestrea una curva cuadrática de Bézier en steps + 1 puntos enteros.
+
+    Cada muestra se calcula como desplazamiento desde p0 y se redondea hacia abajo:
+    así desplazar los puntos de control un número entero de píxeles (por ejemplo a una
+    franja de exportación) desplaza las muestras lo mismo, sin que el redondeo ni el
+    error de punto flotante cambien algún píxel.
+
+    Returns:
+        list: Puntos (x, y) de la curva.
+    """
+    x0, y0 = p0
+    ax, ay = p1[0] - x0, p1[1] - y0
+    bx, by = p2[0] - x0, p2[1] - y0
+    curve_points = []
+    for i in range(steps + 1):
+        t = i / steps
+        u = 2 * (1 - t) * t
+        v = t ** 2
+        curve_points.append((x0 + math.floor(u * ax + v * bx), y0 + math.floor(u * ay + v * by)))
+    return curve_points
+
+def line_runs(x0, y0, x1, y1, rows=None):
+    """
+    Rasteriza un segmento con el algoritmo de Bresenham, solo con aritmética entera.
+
+    El paso i del eje mayor cae en el desplazamiento floor((2·i·d_menor + d_mayor) /
+    (2·d_mayor)) del eje menor, el mismo píxel que elige el bucle incremental de
+    Bresenham; así cada fila se calcula directamente y se pueden generar solo las filas
+    visibles de un segmento largo.
+
+    Args:
+        rows (tuple, opcional): Filas (mínima, máxima) que se generan. Por defecto todas.
+
+    Returns:
+        list: Tramos horizontales (y, x_inicial, x_final) con x_inicial <= x_final,
+        en el orden en que se recorre el segmento.
+    """
+    dx = abs(x1 - x0)
+    dy = abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    first, last = 0, dy
+    if rows is not None:
+        low, high = (rows[0] - y0, rows[1] - y0) if sy > 0 else (y0 - rows[1], y0 - rows[0])
+        first, last = max(first, low), min(last, high)
+    runs = []
+    for j in range(first, last + 1):
+        if dy == 0:
+            start, end = 0, dx
+        elif dx >= dy:
+            # Pasos en x cuyo desplazamiento en y es j
+            start = max(0, -((dx - 2 * j * dx) // (2 * dy)))
+            end = min(dx, -((dx - 2 * (j + 1) * dx) // (2 * dy)) - 1)
+        else:
+            start = end = (2 * j * dx + dy) // (2 * dy)
+        xa, xb = x0 + sx * start, x0 + sx * end
+        runs.append((y0 + sy * j, min(xa, xb), max(xa, xb)))
+    return runs
+
+_quadrants = {}  # (a, b) -> filas del primer cuadrante
+
+def ellipse_quadrant(a, b):
+    """
+    Recorre el primer cuadrante de una elipse con el algoritmo del punto medio, con las
+    variables de decisión multiplicadas por 4 para trabajar solo con enteros. El
+    resultado se guarda por semiejes y no debe modificarse.
+
+    Args:
+        a (int): Semieje horizontal.
+        b (int): Semieje vertical.
+
+    Returns:
+        list: Para cada fila y = 0..b, el par (x mínima, x máxima) del contorno.
+    """
+    rows = _quadrants.get((a, b))
+    if rows is None:
+        if len(_quadrants) >= 256:
+            _quadrants.clear()
+        rows = _quadrants[(a, b)] = _ellipse_quadrant(a, b)
+    return rows
+
+def _ellipse_quadrant(a, b):
+    if b == 0:
+        return [(0, a)]
+    rows = [None] * (b + 1)
+    def plot(x, y):
+        row = rows[y]
+        rows[y] = (x, x) if row is None else (min(row[0], x), max(row[1], x))
+    a2, b2 = a * a, b * b
+    x, y = 0, b
+    dx, dy = 0, 2 * a2 * y
+    d = 4 * b2 - 4 * a2 * b + a2
+    while dx < dy:
+        plot(x, y)
+        x += 1
+        dx += 2 * b2
+        if d < 0:
+            d += 4 * (dx + b2)
+        else:
+            y -= 1
+            dy -= 2 * a2
+            d += 4 * (dx - dy + b2)
+    d = b2 * (2 * x + 1) ** 2 + 4 * a2 * (y - 1) ** 2 - 4 * a2 * b2
+    while y >= 0:
+        plot(x, y)
+        y -= 1
+        dy -= 2 * a2
+        if d > 0:
+            d += 4 * (a2 - dy)
+        else:
+            x += 1
+            dx += 2 * b2
+            d += 4 * (dx - dy + a2)
+    return rows
+
+def ellipse_runs(xc, yc, a, b, thickness=1, rows=None):
+    """
+    Tramos horizontales del contorno de una elipse. Con grosor mayor que 1 se rellena
+    la corona entre una elipse exterior y una interior, sin huecos.
+
+    Args:
+        rows (tuple, opcional): Filas (mínima, máxima) que se necesitan; se omiten las
+            filas del cuadrante que no caen en ellas en ninguna de las dos mitades.
+
+    Returns:
+        list: Tramos (y, x_inicial, x_final).
+    """
+    def offsets(count):
+        if rows is None:
+            return range(count)
+        spans = ((rows[0] - yc, rows[1] - yc), (yc - rows[1], yc - rows[0]))
+        return sorted({y for low, high in spans for y in range(max(0, low), min(count - 1, high) + 1)})
+    runs = []
+    def mirrored(y, x0, x1):
+        # Refleja un tramo del primer cuadrante en los cuatro cuadrantes
+        for row in ((yc + y, yc - y) if y else (yc,)):
+            if x0 == 0:
+                runs.append((row, xc - x1, xc + x1))
+            else:
+                runs.append((row, xc + x0, xc + x1))
+                runs.append((row, xc - x1, xc - x0))
+    if thickness <= 1:
+        quadrant = ellipse_quadrant(a, b)
+        for y in offsets(len(quadrant)):
+            mirrored(y, *quadrant[y])
+        return runs
+    outer_pad = thickness // 2
+    outer = ellipse_quadrant(a + outer_pad, b + outer_pad)
+    ai, bi = a + outer_pad - thickness, b + outer_pad - thickness
+    inner = ellipse_quadrant(ai, bi) if ai >= 0 and bi >= 0 else []
+    for y in offsets(len(outer)):
+        mirrored(y, inner[y][1] + 1 if y < len(inner) else 0, outer[y][1])
+    return runs
+
+_octants = {}  # radio -> (xs, ys) del octante del punto medio
+
+def midpoint_octant(radius):
+    """
+    Recorre un octante de la circunferencia con el algoritmo del punto medio. El
+    resultado se guarda por radio, ya que una misma circunferencia se vuelve a dibujar
+    en cada redibujado y en cada franja de una exportación.
+
+    Returns:
+        tuple: Arreglos (xs, ys) con los puntos del octante, desde (0, radio).
+    """
+    octant = _octants.get(radius)
+    if octant is None:
+        x = 0
+        y = radius
+        d = 1 - radius
+        xs, ys = [x], [y]
+        while x < y:
+            if d < 0:
+                d = d + 2 * x + 3
+            else:
+                d = d + 2 * (x - y) + 5
+                y -= 1
+            x += 1
+            xs.append(x)
+            ys.append(y)
+        if len(_octants) >= 256:
+            _octants.clear()
+        octant = _octants[radius] = (np.array(xs, dtype=np.int64), np.array(ys, dtype=np.int64))
+    return octant
+
+def circle_points(xc, yc, radius):
+    """
+    Refleja el octante del punto medio en los ocho octantes de la circunferencia.
+
+    Returns:
+        tuple: Arreglos (px, py) con las coordenadas de los puntos.
+    """
+    xs, ys = midpoint_octant(radius)
+    px = np.concatenate([xc + xs, xc - xs, xc + xs, xc - xs, xc + ys, xc - ys, xc + ys, xc - ys])
+    py = np.concatenate([yc + ys, yc + ys, yc - ys, yc - ys, yc + xs, yc + xs, yc - xs, yc - xs])
+    return px, py
+
+def fill_runs(surface, runs, color, clip):
+    """
+    Escribe tramos horizontales en la superficie como cortes completos de filas,
+    recortados al rectángulo indicado.
+    """
+    left, top, right, bottom = clip.left, clip.top, clip.right - 1, clip.bottom - 1
+    if surface.get_bitsize() == 32:
+        target = pygame.surfarray.pixels2d(surface)
+        mapped = surface.map_rgb(color) & 0xFFFFFFFF
+        for y, x0, x1 in runs:
+            if top <= y <= bottom:
+                x0, x1 = max(x0, left), min(x1, right)
+                if x0 <= x1:
+                    target[x0:x1 + 1, y] = mapped
+        del target  # Libera el bloqueo de la superficie
+    else:
+        for y, x0, x1 in runs:
+            if top <= y <= bottom:
+                x0, x1 = max(x0, left), min(x1, right)
+                if x0 <= x1:
+                    surface.fill(color, (x0, y, x1 - x0 + 1, 1))
+
 class DrawingAlgorithm(ABC):
     def __init__(self, algorithmType = "BASIC"):
-        self.algorithmType = algorithmType  # "BASIC" o "PYGAME"
+        self.algorithmType = algorithmType  # "BASIC", "PYGAME" o "BRESENHAM"
 
     @abstractmethod
     def draw(self, shape, surface, canvas_rect):
         pass
 
+    def bounds(self, shape):
+        """
+        Calcula un rectángulo que contiene todos los píxeles que el algoritmo puede pintar.
+
+        Args:
+            shape (Shape): Figura a acotar.
+
+        Returns:
+            pygame.Rect: Rectángulo envolvente conservador de la figura.
+        """
+        if isinstance(shape, Ellipse):
+            return self.ellipse_bounds(shape, max(1, shape.lineWidth) + 1)
+        xs = [p[0] for p in shape.points]
+        ys = [p[1] for p in shape.points]
+        pad = max(1, shape.lineWidth) + 1
+        left, top = math.floor(min(xs)) - pad, math.floor(min(ys)) - pad
+        right, bottom = math.ceil(max(xs)) + pad, math.ceil(max(ys)) + pad
+        return pygame.Rect(left, top, right - left + 1, bottom - top + 1)
+
+    def circle_bounds(self, shape, pad):
+        x_center, y_center = shape.points[0]
+        radius = int(math.hypot(shape.points[1][0] - x_center, shape.points[1][1] - y_center)) + pad
+        return pygame.Rect(x_center - radius, y_center - radius, 2 * radius + 1, 2 * radius + 1)
+
+    def ellipse_bounds(self, shape, pad):
+        (xc, yc), (x, y) = shape.points[0], shape.points[1]
+        a, b = abs(round(x - xc)) + pad, abs(round(y - yc)) + pad
+        return pygame.Rect(round(xc) - a, round(yc) - b, 2 * a + 1, 2 * b + 1)
+
 class DDADrawingAlgorithm(DrawingAlgorithm):
     def __init__(self):
         super().__init__("BASIC")
@@ -27,59 +439,135 @@ class DDADrawingAlgorithm(DrawingAlgorithm):
             return
         xIncrement = dx / steps
         yIncrement = dy / steps
-        x, y = x1, y1
-        for _ in range(steps + 1):
-            if canvas_rect.collidepoint(round(x), round(y)):
-                pygame.draw.circle(surface, shape.color, (round(x), round(y)), max(1, shape.lineWidth // 2))
-            x += xIncrement
-            y += yIncrement
+        radius = max(1, shape.lineWidth // 2)
+        # Solo se generan los pasos cuyo píxel puede caer dentro del canvas y cuyo pincel
+        # alcanza el área de recorte de la superficie. Los pasos a más de un píxel del
+        # borde del canvas no necesitan comprobación individual.
+        reach = surface.get_clip().inflate(2 * radius + 2, 2 * radius + 2)
+        outer = self.step_range(x1, y1, x2, y2, steps, canvas_rect.clip(reach), 1, math.floor, math.ceil)
+        if outer is None:
+            return
+        inner = self.step_range(x1, y1, x2, y2, steps, canvas_rect, -1, math.ceil, math.floor) or (1, 0)
+        for i in range(outer[0], outer[1] + 1):
+            x = round(x1 + i * xIncrement)
+            y = round(y1 + i * yIncrement)
+            if inner[0] <= i <= inner[1] or canvas_rect.collidepoint(x, y):
+                pygame.draw.circle(surface, shape.color, (x, y), radius)
+
+    @staticmethod
+    def step_range(x1, y1, x2, y2, steps, canvas_rect, margin, round_start, round_end):
+        params = clip_parameters(x1, y1, x2, y2,
+                                 canvas_rect.left - margin, canvas_rect.top - margin,
+                                 canvas_rect.right - 1 + margin, canvas_rect.bottom - 1 + margin)
+        if params is None:
+            return None
+        start = max(0, round_start(params[0] * steps))
+        end = min(steps, round_end(params[1] * steps))
+        return (start, end) if start <= end else None
 
 class MidpointCircleAlgorithm(DrawingAlgorithm):
     def __init__(self):
         super().__init__("BASIC")
 
     def draw(self, shape, surface, canvas_rect):
+        if not self.bounds(shape).colliderect(canvas_rect):
+            return
         x_center, y_center = shape.points[0]
         radius = int(math.hypot(shape.points[1][0] - x_center, shape.points[1][1] - y_center))
-        x = 0
-        y = radius
-        d = 1 - radius
-        self.draw_circle_points(surface, x_center, y_center, x, y, shape.color, canvas_rect)
-        while x < y:
-            if d < 0:
-                d = d + 2 * x + 3
+        px, py = circle_points(x_center, y_center, radius)
+        # Solo los puntos dentro del canvas y del área de recorte de la superficie
+        clip = canvas_rect.clip(surface.get_clip())
+        inside = (px >= clip.left) & (px < clip.right) & (py >= clip.top) & (py < clip.bottom)
+        px, py = px[inside], py[inside]
+        if surface.get_bitsize() == 32:
+            target = pygame.surfarray.pixels2d(surface)
+            target[px, py] = surface.map_rgb(shape.color) & 0xFFFFFFFF
+            del target  # Libera el bloqueo de la superficie
+        else:
+            for point in zip(px.tolist(), py.tolist()):
+                surface.set_at(point, shape.color)
+
+    def bounds(self, shape):
+        return self.circle_bounds(shape, 1)
+
+class BresenhamLineAlgorithm(DrawingAlgorithm):
+    """
+    Líneas con el algoritmo de Bresenham: solo aritmética entera y escritura por tramos
+    horizontales, de modo que los trazos casi horizontales se escriben como cortes
+    largos de una fila.
+    """
+    def __init__(self):
+        super().__init__("BRESENHAM")
+
+    def draw(self, shape, surface, canvas_rect):
+        clip = canvas_rect.clip(surface.get_clip())
+        width = max(1, shape.lineWidth)
+        pad = width // 2
+        if not self.bounds(shape).colliderect(clip):
+            return
+        # Se recorta contra el canvas ampliado por el grosor para conservar los bordes;
+        # el recorte de la superficie no cambia la geometría del trazo
+        segment = clip_segment(shape.points[0], shape.points[1], canvas_rect.inflate(2 * pad + 2, 2 * pad + 2))
+        if segment is None:
+            return
+        (x0, y0), (x1, y1) = [(int(round(x)), int(round(y))) for x, y in segment]
+        # Solo las filas que, con el grosor, pueden caer en el área visible
+        runs = line_runs(x0, y0, x1, y1, (clip.top - width, clip.bottom - 1 + width))
+        if width > 1 and runs:
+            if abs(x1 - x0) >= abs(y1 - y0):
+                # Trazo mayormente horizontal: el grosor se agrega en filas. Cada fila de
+                # salida cubre las filas base de una ventana de alto width; como los
+                # tramos base avanzan de forma monótona y se tocan, su unión es un solo
+                # tramo entre los extremos de los tramos de los bordes de la ventana.
+                by_row = {y: (xa, xb) for y, xa, xb in runs}
+                low, high = min(by_row), max(by_row)
+                rows = range(max(low - pad, clip.top), min(high + width - pad, clip.bottom))
+                runs = []
+                for y in rows:
+                    first = by_row[max(low, y - (width - pad - 1))]
+                    last = by_row[min(high, y + pad)]
+                    runs.append((y, min(first[0], last[0]), max(first[1], last[1])))
             else:
-                d = d + 2 * (x - y) + 5
-                y -= 1
-            x += 1
-            self.draw_circle_points(surface, x_center, y_center, x, y, shape.color, canvas_rect)
+                runs = [(y, xa - pad, xb + width - pad - 1) for y, xa, xb in runs]
+        fill_runs(surface, runs, shape.color, clip)
 
-    def draw_circle_points(self, surface, xc, yc, x, y, color, canvas_rect):
-        points = [
-            (xc + x, yc + y), (xc - x, yc + y), (xc + x, yc - y), (xc - x, yc - y),
-            (xc + y, yc + x), (xc - y, yc + x), (xc + y, yc - x), (xc - y, yc - x)
-        ]
-        for px, py in points:
-            if canvas_rect.collidepoint(px, py):
-                surface.set_at((px, py), color)
+class BresenhamEllipseAlgorithm(DrawingAlgorithm):
+    """
+    Círculos y elipses con el algoritmo del punto medio en aritmética entera, escritos
+    por tramos horizontales. El grosor se dibuja como la corona entre dos elipses.
+    """
+    def __init__(self, algorithmType="BRESENHAM"):
+        super().__init__(algorithmType)
+
+    def draw(self, shape, surface, canvas_rect):
+        clip = canvas_rect.clip(surface.get_clip())
+        if not self.bounds(shape).colliderect(clip):
+            return
+        (xc, yc), (x, y) = shape.points[0], shape.points[1]
+        xc, yc = int(round(xc)), int(round(yc))
+        if isinstance(shape, Circle):
+            a = b = int(math.hypot(x - xc, y - yc))
+        else:
+            a, b = abs(int(round(x)) - xc), abs(int(round(y)) - yc)
+        runs = ellipse_runs(xc, yc, a, b, max(1, shape.lineWidth), (clip.top, clip.bottom - 1))
+        fill_runs(surface, runs, shape.color, clip)
+
+    def bounds(self, shape):
+        if isinstance(shape, Circle):
+            return self.circle_bounds(shape, max(1, shape.lineWidth) + 1)
+        return super().bounds(shape)
 
 class BezierCurveAlgorithm(DrawingAlgorithm):
     def draw(self, shape, surface, canvas_rect):
         if len(shape.points) < 3:
             print("Error: Se necesitan al menos 3 puntos para dibujar una curva Bézier.")
             return
-        p0, p1, p2 = shape.points[0], shape.points[1], shape.points[2]
-        curve_points = []
-        steps = 100
+        # La curva está contenida en la envolvente de sus puntos de control
+        if not self.bounds(shape).colliderect(canvas_rect):
+            return
         try:
-            for i in range(steps + 1):
-                t = i / steps
-                x = (1 - t) ** 2 * p0[0] + 2 * (1 - t) * t * p1[0] + t ** 2 * p2[0]
-                y = (1 - t) ** 2 * p0[1] + 2 * (1 - t) * t * p1[1] + t ** 2 * p2[1]
-                curve_points.append((int(x), int(y)))
-            for i in range(len(curve_points) - 1):
-                if canvas_rect.collidepoint(curve_points[i]) or canvas_rect.collidepoint(curve_points[i + 1]):
-                    pygame.draw.line(surface, shape.color, curve_points[i], curve_points[i + 1], shape.lineWidth)
+            curve_points = bezier_points(shape.points[0], shape.points[1], shape.points[2])
+            draw_clipped_lines(surface, shape.color, curve_points, False, shape.lineWidth, canvas_rect)
         except Exception as e:
             print(f"Error al dibujar la curva Bézier: {e}")
 
@@ -88,67 +576,63 @@ class PygameDrawingAlgorithm(DrawingAlgorithm):
         super().__init__("PYGAME")
 
     def draw(self, shape, surface, canvas_rect):
+        if not self.bounds(shape).colliderect(canvas_rect):
+            return
         if isinstance(shape, Circle):
             x_center, y_center = shape.points[0]
             radius = int(math.hypot(shape.points[1][0] - x_center, shape.points[1][1] - y_center))
-            x = 0
-            y = radius
-            d = 1 - radius
-            self.draw_circle_points(surface, x_center, y_center, x, y, shape.color, shape.lineWidth, canvas_rect)
-            while x < y:
-                if d < 0:
-                    d = d + 2 * x + 3
-                else:
-                    d = d + 2 * (x - y) + 5
-                    y -= 1
-                x += 1
-                self.draw_circle_points(surface, x_center, y_center, x, y, shape.color, shape.lineWidth, canvas_rect)
+            px, py = circle_points(x_center, y_center, radius)
+            brush = max(1, shape.lineWidth // 2)
+            # Puntos dentro del canvas cuyo pincel alcanza el área de recorte
+            reach = surface.get_clip().inflate(2 * brush + 2, 2 * brush + 2).clip(canvas_rect)
+            inside = (px >= reach.left) & (px < reach.right) & (py >= reach.top) & (py < reach.bottom)
+            for point in zip(px[inside].tolist(), py[inside].tolist()):
+                pygame.draw.circle(surface, shape.color, point, brush)
         else:
             if isinstance(shape, Line):
-                x1, y1 = shape.points[0]
-                x2, y2 = shape.points[1]
-                pygame.draw.line(surface, shape.color, (x1, y1), (x2, y2), shape.lineWidth)
+                segment = clip_segment(shape.points[0], shape.points[1], canvas_rect)
+                if segment is not None:
+                    draw_line(surface, shape.color, segment[0], segment[1], shape.lineWidth)
+            elif isinstance(shape, Ellipse):
+                rect = self.ellipse_bounds(shape, 0)
+                if rect.width > 1 and rect.height > 1:
+                    pygame.draw.ellipse(surface, shape.color, rect, max(1, shape.lineWidth))
             elif isinstance(shape, Rectangle):
                 x1, y1 = shape.points[0]
                 x2, y2 = shape.points[1]
                 rect = pygame.Rect(min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1))
                 pygame.draw.rect(surface, shape.color, rect, shape.lineWidth)
             elif isinstance(shape, Polygon):
-                pygame.draw.polygon(surface, shape.color, shape.points, shape.lineWidth)
+                if shape.lineWidth > 0:
+                    draw_lines(surface, shape.color, True, shape.points, shape.lineWidth)
+                else:
+                    pygame.draw.polygon(surface, shape.color, shape.points, 0)
+            elif isinstance(shape, Polyline):
+                if len(shape.points) < 2:
+                    return
+                if canvas_rect.contains(self.bounds(shape)):
+                    # Todos los tramos y sus uniones en una sola llamada
+                    draw_lines(surface, shape.color, False, shape.points, shape.lineWidth)
+                else:
+                    draw_clipped_lines(surface, shape.color, shape.points, False, shape.lineWidth, canvas_rect)
             elif isinstance(shape, Curve):
                 if len(shape.points) >= 3:
-                    p0, p1, p2 = shape.points[0], shape.points[1], shape.points[2]
-                    curve_points = []
-                    steps = 100
-                    for i in range(steps + 1):
-                        t = i / steps
-                        x = (1 - t) ** 2 * p0[0] + 2 * (1 - t) * t * p1[0] + t ** 2 * p2[0]
-                        y = (1 - t) ** 2 * p0[1] + 2 * (1 - t) * t * p1[1] + t ** 2 * p2[1]
-                        curve_points.append((int(x), int(y)))
+                    curve_points = bezier_points(shape.points[0], shape.points[1], shape.points[2])
                     if len(curve_points) > 1:
-                        pygame.draw.lines(surface, shape.color, False, curve_points, shape.lineWidth)
-
-    def draw_circle_points(self, surface, xc, yc, x, y, color, lineWidth, canvas_rect):
-        # Calcula los puntos del círculo y verifica si están dentro del área del canvas
-        points = [
-            (xc + x, yc + y), (xc - x, yc + y), (xc + x, yc - y), (xc - x, yc - y),
-            (xc + y, yc + x), (xc - y, yc + x), (xc + y, yc - x), (xc - y, yc - x)
-        ]
-        for px, py in points:
-            if canvas_rect.collidepoint(px, py):  # Verifica si el punto está dentro del área del canvas
-                pygame.draw.circle(surface, color, (px, py), max(1, lineWidth // 2))
+                        draw_lines(surface, shape.color, False, curve_points, shape.lineWidth)
+
+    def bounds(self, shape):
+        if isinstance(shape, Circle):
+            return self.circle_bounds(shape, max(1, shape.lineWidth) + 1)
+        return super().bounds(shape)
 
 class BasicRectangleAlgorithm(DrawingAlgorithm):
     def draw(self, shape, surface, canvas_rect):
         x1, y1 = shape.points[0]
         x2, y2 = shape.points[1]
         rect = pygame.Rect(min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1))
-        rect = rect.clip(canvas_rect)
-        thickness = shape.lineWidth
-        pygame.draw.line(surface, shape.color, (rect.left, rect.top), (rect.right, rect.top), thickness)
-        pygame.draw.line(surface, shape.color, (rect.right, rect.top), (rect.right, rect.bottom), thickness)
-        pygame.draw.line(surface, shape.color, (rect.right, rect.bottom), (rect.left, rect.bottom), thickness)
-        pygame.draw.line(surface, shape.color, (rect.left, rect.bottom), (rect.left, rect.top), thickness)
+        corners = [(rect.left, rect.top), (rect.right, rect.top), (rect.right, rect.bottom), (rect.left, rect.bottom)]
+        draw_clipped_lines(surface, shape.color, corners, True, shape.lineWidth, canvas_rect)
 
 class BasicPolygonAlgorithm(DrawingAlgorithm):
     def draw(self, shape, surface, canvas_rect):
@@ -160,14 +644,127 @@ class BasicPolygonAlgorithm(DrawingAlgorithm):
             surface (pygame.Surface): Superficie donde se dibuja.
             canvas_rect (pygame.Rect): Área del canvas.
         """
-        points = [p for p in shape.points if canvas_rect.collidepoint(p)]
-        if len(points) < 2:
+        if len(shape.points) < 2:
             return
-        thickness = shape.lineWidth
-        for i in range(len(points) - 1):
-            pygame.draw.line(surface, shape.color, points[i], points[i + 1], thickness)
-        if len(points) > 2:
-            pygame.draw.line(surface, shape.color, points[-1], points[0], thickness)
+        # Cada arista se recorta por separado: los vértices fuera del canvas se conservan
+        # y el contorno visible mantiene su forma.
+        draw_clipped_lines(surface, shape.color, shape.points, True, shape.lineWidth, canvas_rect)
+
+class BasicPolylineAlgorithm(DrawingAlgorithm):
+    """
+    Rasteriza todos los tramos de una trayectoria en una sola pasada: genera con NumPy
+    las muestras DDA de todos los segmentos, estampa en ellas el pincel circular (que
+    también forma las uniones) y escribe todos los píxeles de una vez.
+
+    Dos muestras seguidas de un tramo están a un paso de 8-vecindad, así que lo que un
+    pincel aporta y el siguiente no cubre está en su contorno: basta estampar el contorno
+    en cada muestra y el pincel completo solo en la última muestra de cada tramo.
+
+    Lejos de los bordes del canvas el resultado coincide con dibujar cada tramo con
+    DDADrawingAlgorithm. A menos de un radio de pincel del borde puede diferir: aquí se
+    estampan también las muestras que caen justo fuera del canvas (recortadas a él),
+    mientras que DDADrawingAlgorithm omite las muestras cuyo centro queda fuera.
+    """
+    _brushes = {}  # radio -> desplazamientos (n, 2) de los píxeles del pincel
+    _outlines = {}  # radio -> desplazamientos del contorno del pincel
+    STAMP_PIXELS = 1 << 20  # Píxeles que se estampan por bloque
+
+    def __init__(self):
+        super().__init__("BASIC")
+
+    def draw(self, shape, surface, canvas_rect):
+        if not shape.points or not self.bounds(shape).colliderect(canvas_rect):
+            return
+        if surface.get_bitsize() != 32:
+            draw_clipped_lines(surface, shape.color, shape.points, False, shape.lineWidth, canvas_rect)
+            return
+        # La escritura directa de píxeles ignora el recorte de la superficie
+        clip = canvas_rect.clip(surface.get_clip())
+        radius = max(1, shape.lineWidth // 2)
+        visible = self.samples(shape.points, clip, radius + 1)
+        if visible is None:
+            return
+        samples, ends = visible
+        outline = self.outline(radius)
+        mapped = surface.map_rgb(shape.color) & 0xFFFFFFFF
+        target = pygame.surfarray.pixels2d(surface)
+        # Por bloques, para que los arreglos temporales de trazos gruesos y largos no
+        # crezcan con la longitud del trazo
+        chunk = max(1, self.STAMP_PIXELS // len(outline))
+        for first in range(0, len(samples), chunk):
+            self.stamp(target, samples[first:first + chunk], outline, clip, mapped)
+        self.stamp(target, samples[ends], self.brush(radius), clip, mapped)
+        del target  # Libera el bloqueo de la superficie
+
+    @staticmethod
+    def stamp(target, points, offsets, clip, mapped):
+        pixels = (points[:, None, :] + offsets[None, :, :]).reshape(-1, 2)
+        inside = ((pixels[:, 0] >= clip.left) & (pixels[:, 0] < clip.right) &
+                  (pixels[:, 1] >= clip.top) & (pixels[:, 1] < clip.bottom))
+        pixels = pixels[inside]
+        target[pixels[:, 0], pixels[:, 1]] = mapped
+
+    @staticmethod
+    def samples(points, clip, margin):
+        """
+        Calcula las muestras DDA de todos los tramos, limitadas a los pasos que pueden
+        caer a menos de margin píxeles del área de recorte.
+
+        Returns:
+            tuple: Coordenadas enteras (n, 2) de las muestras e índices de la última
+            muestra de cada tramo, o None si ningún tramo es visible.
+        """
+        p = np.asarray(points, dtype=float)
+        if len(p) == 1:
+            p = np.vstack([p, p])
+        start, end = p[:-1], p[1:]
+        steps = np.abs(end - start).max(axis=1)
+        increments = (end - start) / np.where(steps > 0, steps, 1)[:, None]
+        segments, first, last = [], [], []
+        for index, ((x1, y1), (x2, y2), count) in enumerate(zip(start, end, steps)):
+            visible = DDADrawingAlgorithm.step_range(x1, y1, x2, y2, count, clip, margin, math.floor, math.ceil)
+            if visible is not None:
+                segments.append(index)
+                first.append(visible[0])
+                last.append(visible[1])
+        if not segments:
+            return None
+        segments, first = np.array(segments), np.array(first, dtype=np.int64)
+        counts = np.array(last, dtype=np.int64) - first + 1
+        owner = np.repeat(np.arange(len(segments)), counts)
+        steps_taken = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + first[owner]
+        segment = segments[owner]
+        samples = np.rint(start[segment] + steps_taken[:, None] * increments[segment]).astype(np.int64)
+        return samples, np.cumsum(counts) - 1
+
+    @classmethod
+    def brush(cls, radius):
+        offsets = cls._brushes.get(radius)
+        if offsets is None:
+            # Mismo pincel que pygame.draw.circle usa en el algoritmo DDA
+            size = 2 * radius + 3
+            stamp = pygame.Surface((size, size), 0, 32)
+            pygame.draw.circle(stamp, (255, 255, 255), (radius + 1, radius + 1), radius)
+            xs, ys = np.nonzero(pygame.surfarray.array2d(stamp))
+            offsets = cls._brushes[radius] = np.stack([xs - radius - 1, ys - radius - 1], axis=1)
+        return offsets
+
+    @classmethod
+    def outline(cls, radius):
+        offsets = cls._outlines.get(radius)
+        if offsets is None:
+            # Píxeles del pincel con algún vecino (de 8-vecindad) fuera del pincel
+            brush = cls.brush(radius)
+            size = 2 * radius + 3
+            mask = np.zeros((size + 2, size + 2), dtype=bool)
+            mask[brush[:, 0] + radius + 2, brush[:, 1] + radius + 2] = True
+            interior = mask.copy()
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    interior[1:-1, 1:-1] &= mask[1 + dx:size + 1 + dx, 1 + dy:size + 1 + dy]
+            xs, ys = np.nonzero(mask & ~interior)
+            offsets = cls._outlines[radius] = np.stack([xs - radius - 2, ys - radius - 2], axis=1)
+        return offsets
 
 class EraseAreaAlgorithm(DrawingAlgorithm):
     def draw(self, shape, surface, canvas_rect):
@@ -182,6 +779,4 @@ class FreehandEraseAlgorithm(DrawingAlgorithm):
         points = shape.points
         if len(points) < 2:
             return
-        filtered_points = [p for p in points if canvas_rect.collidepoint(p)]
-        if len(filtered_points) > 1:
-            pygame.draw.lines(surface, shape.erase_color, False, filtered_points, shape.lineWidth)
+        draw_clipped_lines(surface, shape.erase_color, points, False, shape.lineWidth, canvas_rect)
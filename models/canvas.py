@@ -1,78 +1,376 @@
+import base64
+import io
 import json
+from models.point_grid import PointGrid
 from models.shapes import ShapeFactory
 
 class Canvas:
-    def __init__(self):
+    def __init__(self, indexed_color=False):
         self.shapes = []
-        self.background_color = (255, 255, 255)
+        # Modo de color indexado: el mapa de bits de fondo se guarda con paleta de 8 bits
+        self.indexed_color = indexed_color
+        self._background_color = (255, 255, 255)
+        # Mapa de bits (pygame.Surface con transparencia) con las figuras aplanadas y el
+        # rectángulo, en coordenadas de pantalla, que ocupa
+        self.background_image = None
+        self.background_rect = None
+        # Codificación en base64 del PNG del mapa de bits de fondo, calculada al guardar
+        # y descartada cada vez que el mapa de bits cambia
+        self._background_png = None
+        # Funciones notificadas por cada operación de edición con el registro (dict
+        # serializable) y la tupla de figuras afectadas
+        self.listeners = []
+        # Celdas con los puntos de cada figura, para que el borrado por área solo revise
+        # las figuras cercanas. Se mantiene en cada operación de edición.
+        self._points = PointGrid()
+        # Figura -> posición en shapes. Las posiciones desde _valid_positions pueden estar
+        # desplazadas por una eliminación y se recalculan al consultarlas.
+        self._positions = {}
+        self._valid_positions = 0
+
+    @property
+    def background_image(self):
+        return self._background_image
+
+    @background_image.setter
+    def background_image(self, image):
+        self._background_image = image
+        self._background_png = None
+
+    @property
+    def background_color(self):
+        return self._background_color
+
+    @background_color.setter
+    def background_color(self, color):
+        self._background_color = tuple(color)
+        self.notify({"op": "background", "color": list(self._background_color)})
+
+    def addListener(self, listener):
+        self.listeners.append(listener)
+
+    def removeListener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, record, shapes=()):
+        for listener in list(self.listeners):
+            listener(record, shapes)
 
     def addShape(self, shape):
+        if self._valid_positions == len(self.shapes):
+            self._valid_positions += 1
+        self._positions[shape] = len(self.shapes)
         self.shapes.append(shape)
+        self._points.insert(shape, shape.points)
+        if self.listeners:
+            self.notify({"op": "add", "shape": self.shapeToDict(shape)}, (shape,))
 
     def removeShape(self, shape):
-        self.shapes.remove(shape)
+        index = self.indexOf(shape)
+        del self.shapes[index]
+        del self._positions[shape]
+        self._valid_positions = min(self._valid_positions, index)
+        self._points.remove(shape)
+        self.notify({"op": "remove", "index": index}, (shape,))
+
+    def updateShape(self, shape, newPoints):
+        """
+        Reemplaza los puntos de una figura del canvas y notifica el cambio.
+
+        Args:
+            shape (Shape): Figura a modificar.
+            newPoints (list): Nuevos puntos de la figura.
+        """
+        shape.updatePoints(newPoints)
+        self._points.insert(shape, shape.points)
+        if self.listeners:
+            self.notify({"op": "update", "index": self.indexOf(shape), "points": newPoints}, (shape,))
+
+    def indexOf(self, shape):
+        """
+        Posición de una figura en la lista de figuras, sin recorrerla: las posiciones se
+        guardan al agregar figuras y, tras una eliminación, solo se recalculan las de las
+        figuras posteriores, la primera vez que se consultan.
+
+        Args:
+            shape (Shape): Figura del canvas.
+
+        Returns:
+            int: Índice de la figura en shapes.
+
+        Raises:
+            ValueError: Si la figura no está en el canvas.
+        """
+        index = self._positions.get(shape)
+        if index is None or index >= self._valid_positions:
+            for position in range(self._valid_positions, len(self.shapes)):
+                self._positions[self.shapes[position]] = position
+            self._valid_positions = len(self.shapes)
+            index = self._positions.get(shape)
+            if index is None:
+                raise ValueError("La figura no está en el canvas")
+        return index
+
+    def transformShapes(self, shapes, transform):
+        """
+        Aplica una transformación afín a varias figuras del canvas y notifica el cambio
+        como una sola operación.
+
+        Args:
+            shapes (list): Figuras a transformar.
+            transform (AffineTransform): Transformación a aplicar.
+        """
+        shapes = list(shapes)
+        transform.applyTo(shapes)
+        for shape in shapes:
+            self._points.insert(shape, shape.points)
+        if self.listeners:
+            record = {
+                "op": "transform",
+                "indices": [self.indexOf(shape) for shape in shapes],
+                "matrix": transform.toList()
+            }
+            self.notify(record, tuple(shapes))
 
     def clear(self):
+        removed = tuple(self.shapes)
         self.shapes.clear()
+        self._points.clear()
+        self._positions.clear()
+        self._valid_positions = 0
+        self.background_image = None
+        self.background_rect = None
+        self.notify({"op": "clear"}, removed)
 
-    def to_json(self):
-        shapes_data = []
-        for shape in self.shapes:
-            shape_type = None
-            from models.shapes import Line, Circle, Rectangle, Polygon, Curve, EraseArea
-            if isinstance(shape, Line):
-                shape_type = "LINE"
-            elif isinstance(shape, Circle):
-                shape_type = "CIRCLE"
-            elif isinstance(shape, Rectangle):
-                shape_type = "RECTANGLE"
-            elif isinstance(shape, Polygon):
-                shape_type = "POLYGON"
-            elif isinstance(shape, Curve):
-                shape_type = "CURVE"
-            elif isinstance(shape, EraseArea):
-                shape_type = "ERASE_AREA"
-            shape_data = {
-                "type": shape_type,
-                "points": shape.points,
-                "color": shape.color,
-                "lineWidth": shape.lineWidth,
-                "algorithmType": shape.drawingAlgorithm.algorithmType
-            }
-            shapes_data.append(shape_data)
+    def flatten(self, count, area_rect):
+        """
+        Hornea las figuras más antiguas en el mapa de bits de fondo y las quita de la
+        lista de figuras, de modo que dejan de costar en cada render.
+
+        Args:
+            count (int): Número de figuras, desde la más antigua, a aplanar.
+            area_rect (pygame.Rect): Área del canvas en pantalla que debe cubrir el mapa
+                de bits (se une con la que ya tuviera).
+        """
+        import pygame
+        count = min(count, len(self.shapes))
+        if count <= 0:
+            return
+        flattened = tuple(self.shapes[:count])
+        rect = pygame.Rect(area_rect)
+        if self.background_rect is not None:
+            rect = rect.union(self.background_rect)
+        # Se dibuja en coordenadas absolutas para conservar el redondeo de los algoritmos
+        scratch = pygame.Surface((rect.right, rect.bottom), pygame.SRCALPHA)
+        if self.background_image is not None:
+            scratch.blit(self.background_image, self.background_rect)
+        for shape in flattened:
+            shape.drawingAlgorithm.draw(shape, scratch, rect)
+        self.background_image = self.storedImage(scratch.subsurface(rect))
+        self.background_rect = rect
+        del self.shapes[:count]
+        for shape in flattened:
+            self._points.remove(shape)
+            self._positions.pop(shape, None)
+        self._valid_positions = 0  # Todas las posiciones bajan count lugares
+        self.notify({"op": "flatten", "count": count, "rect": list(area_rect)}, flattened)
+
+    def storedImage(self, image):
+        """
+        Prepara un mapa de bits para guardarlo como fondo. En modo de color indexado se
+        guarda con paleta de 8 bits (un cuarto de la memoria) si sus colores caben en ella.
+
+        Args:
+            image (pygame.Surface): Mapa de bits RGBA.
+
+        Returns:
+            pygame.Surface: Copia del mapa de bits, indexada o RGBA.
+        """
+        if self.indexed_color:
+            from models.palette import to_indexed, document_colors
+            indexed = to_indexed(image, document_colors(self))
+            if indexed is not None:
+                return indexed
+        return image.copy()
+
+    def drawBackgroundImage(self, surface, canvas_rect):
+        """
+        Dibuja el mapa de bits de figuras aplanadas, recortado al área del canvas.
+        """
+        if self.background_image is None:
+            return
+        visible = self.background_rect.clip(canvas_rect)
+        if visible.width and visible.height:
+            surface.blit(self.background_image, visible.topleft,
+                         visible.move(-self.background_rect.x, -self.background_rect.y))
+
+    def applyOperation(self, record):
+        """
+        Aplica un registro de operación emitido por notify (por ejemplo, al reproducir un journal).
+
+        Args:
+            record (dict): Registro con la clave "op" y los datos de la operación.
+        """
+        op = record.get("op")
+        if op == "add":
+            self.addShape(self.shapeFromDict(record["shape"]))
+        elif op == "remove":
+            self.removeShape(self.shapes[record["index"]])
+        elif op == "update":
+            self.updateShape(self.shapes[record["index"]], [tuple(p) for p in record["points"]])
+        elif op == "transform":
+            from models.transform import AffineTransform
+            self.transformShapes([self.shapes[i] for i in record["indices"]], AffineTransform(record["matrix"]))
+        elif op == "erase":
+            import pygame
+            self.removeShapesInArea(pygame.Rect(record["rect"]))
+        elif op == "background":
+            self.background_color = record["color"]
+        elif op == "clear":
+            self.clear()
+        elif op == "flatten":
+            self.flatten(record["count"], record["rect"])
+        elif op == "load":
+            self.load_dict(record["canvas"])
+        else:
+            raise ValueError(f"Operación no reconocida: {op}")
+
+    @staticmethod
+    def shapeToDict(shape):
+        from models.shapes import Line, Circle, Ellipse, Rectangle, Polygon, Polyline, Curve, EraseArea
+        shape_type = None
+        if isinstance(shape, Line):
+            shape_type = "LINE"
+        elif isinstance(shape, Circle):
+            shape_type = "CIRCLE"
+        elif isinstance(shape, Ellipse):
+            shape_type = "ELLIPSE"
+        elif isinstance(shape, Rectangle):
+            shape_type = "RECTANGLE"
+        elif isinstance(shape, Polygon):
+            shape_type = "POLYGON"
+        elif isinstance(shape, Polyline):
+            shape_type = "POLYLINE"
+        elif isinstance(shape, Curve):
+            shape_type = "CURVE"
+        elif isinstance(shape, EraseArea):
+            shape_type = "ERASE_AREA"
+        data = {
+            "type": shape_type,
+            "points": shape.points,
+            "color": shape.color,
+            "lineWidth": shape.lineWidth,
+            "algorithmType": shape.drawingAlgorithm.algorithmType
+        }
+        if shape.exactPoints is not None:
+            data["exactPoints"] = shape.exactPoints
+        return data
+
+    @staticmethod
+    def shapeFromDict(data):
+        shape_type = data.get("type")
+        points = data.get("points")
+        color = tuple(data.get("color"))
+        lineWidth = data.get("lineWidth")
+        algorithmType = data.get("algorithmType")
+        shape = ShapeFactory.createShape(shape_type, points, color, lineWidth, algorithmType)
+        if data.get("exactPoints") is not None:
+            shape.exactPoints = [tuple(p) for p in data["exactPoints"]]
+        return shape
+
+    def to_dict(self):
         canvas_data = {
             "background_color": self.background_color,
-            "shapes": shapes_data
+            "shapes": [self.shapeToDict(shape) for shape in self.shapes]
         }
-        return json.dumps(canvas_data)
+        if self.background_image is not None:
+            canvas_data["background_image"] = {
+                "rect": list(self.background_rect),
+                "png": self.encodeBackgroundImage()
+            }
+        return canvas_data
 
-    def load_json(self, json_str):
-        canvas_data = json.loads(json_str)
-        self.background_color = tuple(canvas_data.get("background_color", (255, 255, 255)))
+    def encodeBackgroundImage(self):
+        """
+        Devuelve el PNG del mapa de bits de fondo en base64. La codificación se guarda
+        hasta que el mapa de bits cambia, de modo que guardar o exportar varias veces
+        el mismo documento no vuelve a comprimir la imagen.
+        """
+        if self._background_png is None:
+            from models.palette import encode_png
+            self._background_png = base64.b64encode(encode_png(self.background_image)).decode("ascii")
+        return self._background_png
+
+    def decodeBackgroundImage(self, image_data):
+        import pygame
+        png = base64.b64decode(image_data["png"])
+        image = pygame.image.load(io.BytesIO(png), "png")
+        if self.indexed_color and image.get_bitsize() == 8:
+            self.background_image = image  # PNG con paleta guardado en modo indexado
+        elif self.indexed_color:
+            self.background_image = self.storedImage(image)
+        else:
+            self.background_image = image.convert_alpha() if pygame.display.get_surface() else image
+        self.background_rect = pygame.Rect(image_data["rect"])
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def load_dict(self, canvas_data):
+        self._background_color = tuple(canvas_data.get("background_color", (255, 255, 255)))
         shapes_data = canvas_data.get("shapes", [])
         self.shapes.clear()
         for data in shapes_data:
-            shape_type = data.get("type")
-            points = data.get("points")
-            color = tuple(data.get("color"))
-            lineWidth = data.get("lineWidth")
-            algorithmType = data.get("algorithmType")
-            shape = ShapeFactory.createShape(shape_type, points, color, lineWidth, algorithmType)
-            self.shapes.append(shape)
+            self.shapes.append(self.shapeFromDict(data))
+        self._positions.clear()
+        self._valid_positions = 0
+        self.reindex()
+        self.background_image = None
+        self.background_rect = None
+        if canvas_data.get("background_image"):
+            self.decodeBackgroundImage(canvas_data["background_image"])
+        self.notify({"op": "load", "canvas": canvas_data})
+
+    def load_json(self, json_str):
+        self.load_dict(json.loads(json_str))
 
     def removeShapesInArea(self, area_rect):
         """
         Elimina las figuras que intersectan con un área rectangular.
 
+        Solo se revisan las figuras con puntos en las celdas que toca el área, de modo
+        que el costo depende de las figuras cercanas y no del total.
+
         Args:
             area_rect (pygame.Rect): Área rectangular de borrado.
         """
-        shapes_to_remove = []
+        if len(self._points) != len(self.shapes):
+            self.reindex()  # Hay figuras agregadas directamente a la lista
+        hits = {shape for shape in self._points.query(area_rect) if self.shapeIntersectsArea(shape, area_rect)}
+        removed = sorted(hits, key=self.indexOf)
+        if removed:
+            first = self.indexOf(removed[0])
+            self.shapes[first:] = [shape for shape in self.shapes[first:] if shape not in hits]
+            for shape in removed:
+                self._points.remove(shape)
+                del self._positions[shape]
+            self._valid_positions = min(self._valid_positions, first)
+        if self.background_image is not None:
+            # El contenido aplanado del área también se borra
+            local = area_rect.move(-self.background_rect.x, -self.background_rect.y)
+            transparent = self.background_image.get_colorkey() or (0, 0, 0, 0)
+            if self.background_image.fill(transparent, local):
+                self._background_png = None  # El mapa de bits cambió en el sitio
+        self.notify({"op": "erase", "rect": list(area_rect)}, tuple(removed))
+
+    def reindex(self):
+        """
+        Reconstruye el índice de puntos de todas las figuras.
+        """
+        self._points.clear()
         for shape in self.shapes:
-            if self.shapeIntersectsArea(shape, area_rect):
-                shapes_to_remove.append(shape)
-        for shape in shapes_to_remove:
-            self.removeShape(shape)
+            self._points.insert(shape, shape.points)
 
     def shapeIntersectsArea(self, shape, area_rect):
         """
@@ -85,7 +383,4 @@ class Canvas:
         Returns:
             bool: True si la figura intersecta con el área, False en caso contrario.
         """
-        for point in shape.points:
-            if area_rect.collidepoint(point):
-                return True
-        return False
+        return any(map(area_rect.collidepoint, shape.points))
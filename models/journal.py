@@ -0,0 +1,196 @@
+import json
+import os
+
+class EditJournal:
+    """
+    Journal de ediciones de solo anexado asociado a un documento JSON del canvas.
+
+    El documento se guarda como una instantánea completa (el mismo formato de
+    Canvas.to_json) más un archivo "<documento>.journal" con una operación JSON por
+    línea. Las operaciones se escriben a medida que ocurren y cada guardado solo anexa
+    una marca de commit y hace un único fsync, de modo que guardar tras pocas ediciones
+    cuesta lo mismo sin importar el tamaño del documento. Al abrir se carga la
+    instantánea y se reproducen las operaciones hasta el último commit. Cuando el journal
+    supera compact_threshold bytes se compacta en una nueva instantánea.
+
+    La instantánea y la cabecera del journal llevan un número de generación; un journal
+    cuya generación no coincide con la de la instantánea (por ejemplo, tras una
+    compactación interrumpida) se descarta.
+
+    Atributos:
+        canvas (Canvas): Canvas cuyas operaciones se registran.
+        document_path (str): Ruta absoluta de la instantánea.
+        journal_path (str): Ruta absoluta del journal.
+        generation (int): Generación actual de la instantánea.
+        compact_threshold (int): Tamaño del journal, en bytes, a partir del cual se compacta.
+    """
+    def __init__(self, canvas, document_path, generation=0, compact_threshold=1024 * 1024):
+        self.canvas = canvas
+        self.document_path = os.path.abspath(document_path)
+        self.journal_path = self.document_path + ".journal"
+        self.generation = generation
+        self.compact_threshold = compact_threshold
+        self.pending = 0
+        self._file = None
+
+    @classmethod
+    def create(cls, canvas, document_path, **kwargs):
+        """
+        Guarda el canvas como instantánea completa y comienza un journal vacío.
+
+        Args:
+            canvas (Canvas): Canvas a guardar.
+            document_path (str): Ruta del documento.
+
+        Returns:
+            EditJournal: Journal asociado al documento.
+        """
+        generation = 0
+        if os.path.exists(document_path):
+            generation = cls.readGeneration(document_path) + 1
+        journal = cls(canvas, document_path, generation, **kwargs)
+        journal.writeSnapshot()
+        journal.attach(truncate_at=None)
+        return journal
+
+    @classmethod
+    def openDocument(cls, canvas, document_path, **kwargs):
+        """
+        Carga la instantánea en el canvas, reproduce el journal y lo deja asociado.
+
+        Args:
+            canvas (Canvas): Canvas donde se carga el documento.
+            document_path (str): Ruta del documento.
+
+        Returns:
+            EditJournal: Journal asociado al documento.
+        """
+        with open(document_path, "r") as f:
+            canvas_data = json.load(f)
+        canvas.load_dict(canvas_data)
+        journal = cls(canvas, document_path, canvas_data.get("journal_generation", 0), **kwargs)
+        committed_offset = journal.replay()
+        journal.attach(truncate_at=committed_offset)
+        return journal
+
+    @staticmethod
+    def readGeneration(document_path):
+        try:
+            with open(document_path, "r") as f:
+                return json.load(f).get("journal_generation", 0)
+        except (OSError, ValueError):
+            return 0
+
+    def replay(self):
+        """
+        Aplica al canvas las operaciones confirmadas del journal.
+
+        Returns:
+            int: Posición del archivo tras el último commit, o None si el journal no es válido.
+        """
+        if not os.path.exists(self.journal_path):
+            return None
+        committed = []
+        batch = []
+        committed_offset = None
+        with open(self.journal_path, "rb") as f:
+            header = f.readline()
+            try:
+                if json.loads(header).get("generation") != self.generation:
+                    return None
+            except ValueError:
+                return None
+            committed_offset = f.tell()
+            for line in iter(f.readline, b""):
+                if not line.endswith(b"\n"):
+                    break  # Línea incompleta: escritura interrumpida
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if record.get("op") == "commit":
+                    committed.extend(batch)
+                    batch = []
+                    committed_offset = f.tell()
+                else:
+                    batch.append(record)
+        for record in committed:
+            self.canvas.applyOperation(record)
+        return committed_offset
+
+    def attach(self, truncate_at=None):
+        """
+        Abre el journal para anexar y comienza a escuchar las operaciones del canvas.
+
+        Args:
+            truncate_at (int, opcional): Posición donde cortar el journal existente
+                (descarta operaciones no confirmadas). Si es None se crea un journal nuevo.
+        """
+        if truncate_at is None:
+            self._file = open(self.journal_path, "wb")
+            self._file.write(self.encode({"generation": self.generation}))
+            self.sync()
+        else:
+            self._file = open(self.journal_path, "r+b")
+            self._file.truncate(truncate_at)
+            self._file.seek(truncate_at)
+        self.canvas.addListener(self.record)
+
+    def record(self, record, shapes=()):
+        """
+        Anexa una operación al journal. Se escribe en el búfer del archivo; la
+        sincronización con disco se hace en bloque en commit.
+        """
+        self._file.write(self.encode(record))
+        self.pending += 1
+
+    def commit(self):
+        """
+        Confirma las operaciones pendientes con un único fsync y compacta si el journal
+        superó el umbral.
+        """
+        if self.pending:
+            self._file.write(self.encode({"op": "commit"}))
+            self.sync()
+            self.pending = 0
+        if self._file.tell() > self.compact_threshold:
+            self.compact()
+
+    def compact(self):
+        """
+        Reescribe el documento como una instantánea completa y reinicia el journal.
+        """
+        self.generation += 1
+        self.writeSnapshot()
+        self._file.close()
+        self._file = open(self.journal_path, "wb")
+        self._file.write(self.encode({"generation": self.generation}))
+        self.sync()
+        self.pending = 0
+
+    def writeSnapshot(self):
+        canvas_data = self.canvas.to_dict()
+        canvas_data["journal_generation"] = self.generation
+        tmp_path = self.document_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(canvas_data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.document_path)
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        """
+        Deja de escuchar el canvas y cierra el journal sin confirmar lo pendiente.
+        """
+        self.canvas.removeListener(self.record)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def encode(record):
+        return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
@@ -0,0 +1,128 @@
+"""
+Almacenamiento con paleta de 8 bits para los mapas de bits en caché.
+
+Los dibujos usan pocos colores (los del pincel y el fondo), por lo que las capas
+aplanadas y los sprites de la caché se pueden guardar con un índice de un byte por
+píxel en lugar de cuatro. La conversión es exacta: la paleta se construye con los
+colores del documento más los que aparezcan en la imagen, y si no caben en 255
+entradas (o hay transparencia parcial) la imagen se deja en RGB. El índice 0 se reserva
+para la transparencia, con un color clave que no usa la imagen. Al presentar o exportar
+basta con copiar la superficie sobre una de 32 bits, que es cuando se pasa a RGB.
+"""
+import io
+import struct
+import zlib
+import numpy as np
+import pygame
+
+MAX_COLORS = 255  # El índice 0 es el color clave de la transparencia
+
+def document_colors(canvas):
+    """
+    Colores que usa el documento: el fondo y los de las figuras (incluido el color con
+    que borran las áreas de borrado).
+
+    Returns:
+        set: Tuplas (r, g, b).
+    """
+    colors = {tuple(canvas.background_color)[:3]}
+    for shape in canvas.shapes:
+        colors.add(tuple(shape.color)[:3])
+        if hasattr(shape, "erase_color"):
+            colors.add(tuple(shape.erase_color)[:3])
+    return colors
+
+def _pack(colors):
+    return np.array(sorted({(r << 16) | (g << 8) | b for r, g, b in colors}), dtype=np.uint32)
+
+def to_indexed(surface, colors=()):
+    """
+    Convierte una superficie a 8 bits con paleta sin alterar ningún píxel.
+
+    Args:
+        surface (pygame.Surface): Superficie RGB o RGBA.
+        colors (iterable, opcional): Colores conocidos de antemano (los del documento);
+            evitan buscar los colores distintos de toda la imagen.
+
+    Returns:
+        pygame.Surface: Superficie de 8 bits (con color clave si la original tenía
+        transparencia), o None si la imagen no se puede representar con la paleta.
+    """
+    width, height = surface.get_size()
+    if not width or not height:
+        return None
+    if surface.get_bytesize() not in (3, 4):
+        converted = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+        converted.fill((0, 0, 0, 0))
+        converted.blit(surface, (0, 0))
+        surface = converted
+    transparent = None
+    if surface.get_flags() & pygame.SRCALPHA:
+        alpha = pygame.surfarray.pixels_alpha(surface)
+        transparent = alpha == 0
+        partial = not np.logical_or(transparent, alpha == 255).all()
+        del alpha
+        if partial:
+            return None
+    rgb = pygame.surfarray.pixels3d(surface)
+    packed = (rgb[..., 0].astype(np.uint32) << 16) | (rgb[..., 1].astype(np.uint32) << 8) | rgb[..., 2]
+    del rgb
+    values = packed if transparent is None else packed[~transparent]
+
+    # Los colores del documento cubren casi todos los píxeles; solo los demás se buscan
+    known = _pack(colors)
+    if len(known):
+        position = np.minimum(np.searchsorted(known, values), len(known) - 1)
+        extra = np.unique(values[known[position] != values])
+    else:
+        extra = np.unique(values)
+    palette = np.union1d(known, extra)
+    if len(palette) > MAX_COLORS:
+        palette = np.unique(values)  # Solo los colores presentes en la imagen
+        if len(palette) > MAX_COLORS:
+            return None
+
+    key = 0xFF00FF
+    while key in palette:
+        key = (key + 1) & 0xFFFFFF
+    entries = [key] + palette.tolist()
+    entries += [0] * (256 - len(entries))
+    indexed = pygame.Surface((width, height), 0, 8)
+    indexed.set_palette([((v >> 16) & 0xFF, (v >> 8) & 0xFF, v & 0xFF) for v in entries])
+    indices = (np.searchsorted(palette, packed) + 1).astype(np.uint8)
+    if transparent is not None:
+        indices[transparent] = 0
+    pixels = pygame.surfarray.pixels2d(indexed)
+    pixels[...] = indices
+    del pixels
+    if transparent is not None:
+        indexed.set_colorkey(indexed.get_palette_at(0))
+    return indexed
+
+def encode_png(surface):
+    """
+    Codifica una superficie como PNG. Las superficies de 8 bits se guardan como PNG con
+    paleta; su color clave se escribe como transparencia (bloque tRNS), de modo que al
+    cargarlas se recupera tanto la paleta como la transparencia.
+
+    Returns:
+        bytes: Contenido del archivo PNG.
+    """
+    buffer = io.BytesIO()
+    pygame.image.save(surface, buffer, "png")
+    data = buffer.getvalue()
+    key = surface.get_colorkey()
+    if surface.get_bitsize() != 8 or key is None:
+        return data
+    alphas = b"\xff" * surface.map_rgb(key) + b"\x00"
+    trns = struct.pack(">I", len(alphas)) + b"tRNS" + alphas + struct.pack(">I", zlib.crc32(alphas, zlib.crc32(b"tRNS")))
+    output = [data[:8]]
+    position = 8
+    while position < len(data):
+        length, kind = struct.unpack(">I4s", data[position:position + 8])
+        end = position + 12 + length
+        output.append(data[position:end])
+        if kind == b"PLTE":
+            output.append(trns)
+        position = end
+    return b"".join(output)
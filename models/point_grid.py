@@ -0,0 +1,83 @@
+class PointGrid:
+    """
+    Índice de los puntos de las figuras sobre una rejilla uniforme.
+
+    Cada figura se registra en las celdas que contienen alguno de sus puntos (no en
+    las que cubre su trazo), que es el criterio del borrado por área: buscar las figuras
+    con algún punto en una región solo recorre las celdas de esa región. Insertar o
+    quitar una figura cuesta lo proporcional a su número de puntos, y una figura con
+    puntos lejos del canvas solo ocupa las celdas de esos puntos.
+
+    Atributos:
+        cell_size (int): Lado de cada celda en píxeles.
+    """
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self._cells = {}  # (columna, fila) -> figuras con algún punto en la celda
+        self._keys = {}  # figura -> celdas en que está registrada
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def insert(self, key, points):
+        """
+        Registra una figura con sus puntos, reemplazando los anteriores si ya existía.
+
+        Args:
+            key: Figura (o cualquier clave hashable).
+            points (list): Puntos (x, y) de la figura.
+        """
+        self.remove(key)
+        size = self.cell_size
+        # int trunca como Rect.collidepoint con coordenadas flotantes
+        cells = {(int(x) // size, int(y) // size) for x, y in points}
+        self._keys[key] = cells
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        """
+        Quita una figura del índice; no hace nada si no estaba.
+        """
+        for cell in self._keys.pop(key, ()):
+            keys = self._cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self._cells[cell]
+
+    def query(self, region):
+        """
+        Devuelve las figuras que pueden tener algún punto en una región: todas las
+        registradas en las celdas que la región toca. El llamador comprueba los puntos.
+
+        Args:
+            region (pygame.Rect): Región de búsqueda.
+
+        Returns:
+            set: Figuras candidatas.
+        """
+        candidates = set()
+        if region.width <= 0 or region.height <= 0:
+            return candidates
+        size = self.cell_size
+        columns = range(region.left // size, (region.right - 1) // size + 1)
+        rows = range(region.top // size, (region.bottom - 1) // size + 1)
+        if len(columns) * len(rows) > len(self._cells):
+            # Región más grande que lo ocupado: se recorren solo las celdas con puntos
+            for (column, row), keys in self._cells.items():
+                if column in columns and row in rows:
+                    candidates.update(keys)
+            return candidates
+        for column in columns:
+            for row in rows:
+                keys = self._cells.get((column, row))
+                if keys:
+                    candidates.update(keys)
+        return candidates
+
+    def clear(self):
+        self._cells.clear()
+        self._keys.clear()
@@ -2,7 +2,13 @@ from abc import ABC, abstractmethod
 
 class Shape(ABC):
     def __init__(self, points, color, lineWidth, drawingAlgorithm):
+        # version se incrementa cada vez que cambia algo que afecta la rasterización,
+        # lo que permite a las cachés de render detectar sprites obsoletos.
+        self.version = 0
         self.points = points
+        # Puntos exactos (flotantes) tras una transformación afín; points guarda su
+        # versión redondeada, que es la que se rasteriza. None si coinciden.
+        self.exactPoints = None
         self.color = color
         self.lineWidth = lineWidth
         self.drawingAlgorithm = drawingAlgorithm
@@ -11,8 +17,34 @@ class Shape(ABC):
     def draw(self, surface, canvas_rect):
         pass
 
-    def updatePoints(self, newPoints):
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        self._color = value
+        self.invalidate()
+
+    @property
+    def lineWidth(self):
+        return self._lineWidth
+
+    @lineWidth.setter
+    def lineWidth(self, value):
+        self._lineWidth = value
+        self.invalidate()
+
+    def updatePoints(self, newPoints, exactPoints=None):
         self.points = newPoints
+        self.exactPoints = exactPoints
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Marca la rasterización en caché de la figura como obsoleta.
+        """
+        self.version += 1
 
 class Line(Shape):
     def draw(self, surface, canvas_rect):
@@ -22,6 +54,14 @@ class Circle(Shape): # NOTE: Circle no imprime los puntos teniendo en cuenta el
     def draw(self, surface, canvas_rect):
         self.drawingAlgorithm.draw(self, surface, canvas_rect)
 
+class Ellipse(Shape):
+    """
+    Elipse de ejes paralelos a los del lienzo, definida por su centro y una esquina del
+    rectángulo que la contiene.
+    """
+    def draw(self, surface, canvas_rect):
+        self.drawingAlgorithm.draw(self, surface, canvas_rect)
+
 class Rectangle(Shape):
     def draw(self, surface, canvas_rect):
         self.drawingAlgorithm.draw(self, surface, canvas_rect)
@@ -30,6 +70,14 @@ class Polygon(Shape):
     def draw(self, surface, canvas_rect):
         self.drawingAlgorithm.draw(self, surface, canvas_rect)
 
+class Polyline(Shape):
+    """
+    Trayectoria abierta de segmentos encadenados. Si el último punto coincide con el
+    primero, la trayectoria queda cerrada.
+    """
+    def draw(self, surface, canvas_rect):
+        self.drawingAlgorithm.draw(self, surface, canvas_rect)
+
 class Curve(Shape):
     def draw(self, surface, canvas_rect):
         self.drawingAlgorithm.draw(self, surface, canvas_rect)
@@ -60,10 +108,14 @@ class ShapeFactory:
                 return Line(points, color, lineWidth, algorithm)
             elif shapeType == "CIRCLE":
                 return Circle(points, color, lineWidth, algorithm)
+            elif shapeType == "ELLIPSE":
+                return Ellipse(points, color, lineWidth, algorithm)
             elif shapeType == "RECTANGLE":
                 return Rectangle(points, color, lineWidth, algorithm)
             elif shapeType == "POLYGON":
                 return Polygon(points, color, lineWidth, algorithm)
+            elif shapeType == "POLYLINE":
+                return Polyline(points, color, lineWidth, algorithm)
             elif shapeType == "CURVE":
                 return Curve(points, color, lineWidth, algorithm)
             elif shapeType == "ERASE_AREA":
@@ -79,6 +131,10 @@ class ShapeFactory:
                 from models.algorithms import MidpointCircleAlgorithm
                 algorithm = MidpointCircleAlgorithm()
                 return Circle(points, color, lineWidth, algorithm)
+            elif shapeType == "ELLIPSE":
+                from models.algorithms import BresenhamEllipseAlgorithm
+                algorithm = BresenhamEllipseAlgorithm("BASIC")
+                return Ellipse(points, color, lineWidth, algorithm)
             elif shapeType == "RECTANGLE":
                 from models.algorithms import BasicRectangleAlgorithm
                 algorithm = BasicRectangleAlgorithm()
@@ -87,6 +143,10 @@ class ShapeFactory:
                 from models.algorithms import BasicPolygonAlgorithm
                 algorithm = BasicPolygonAlgorithm()
                 return Polygon(points, color, lineWidth, algorithm)
+            elif shapeType == "POLYLINE":
+                from models.algorithms import BasicPolylineAlgorithm
+                algorithm = BasicPolylineAlgorithm()
+                return Polyline(points, color, lineWidth, algorithm)
             elif shapeType == "CURVE":
                 from models.algorithms import BezierCurveAlgorithm
                 algorithm = BezierCurveAlgorithm()
@@ -97,5 +157,19 @@ class ShapeFactory:
                 return EraseArea(points, color, lineWidth, algorithm)
             else:
                 raise ValueError("Tipo de figura no reconocido")
+        elif algorithmType == "BRESENHAM":
+            # Rasterizadores enteros por tramos horizontales
+            if shapeType == "LINE":
+                from models.algorithms import BresenhamLineAlgorithm
+                return Line(points, color, lineWidth, BresenhamLineAlgorithm())
+            elif shapeType == "CIRCLE":
+                from models.algorithms import BresenhamEllipseAlgorithm
+                return Circle(points, color, lineWidth, BresenhamEllipseAlgorithm())
+            elif shapeType == "ELLIPSE":
+                from models.algorithms import BresenhamEllipseAlgorithm
+                return Ellipse(points, color, lineWidth, BresenhamEllipseAlgorithm())
+            else:
+                # Las demás figuras usan los algoritmos básicos
+                return ShapeFactory.createShape(shapeType, points, color, lineWidth, "BASIC")
         else:
             raise ValueError("Tipo de algoritmo no reconocido")
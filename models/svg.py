@@ -0,0 +1,274 @@
+"""
+Exportación e importación del canvas en formato SVG.
+
+La exportación recorre Canvas.shapes y escribe un elemento por figura directamente en
+el archivo, a partir de sus puntos y sin rasterizar, por lo que usa memoria constante.
+La importación lee el archivo de forma incremental (iterparse) y descarta cada elemento
+en cuanto lo convierte en la descripción de una figura para ShapeFactory.
+
+Cada elemento lleva los atributos data-type y data-algorithm con el tipo de figura y de
+algoritmo originales, de modo que un documento exportado se vuelve a importar sin
+pérdidas. Los SVG de otras fuentes se importan a partir de la etiqueta del elemento.
+El mapa de bits de figuras aplanadas se escribe como un <image> con el PNG embebido.
+"""
+import math
+import re
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+SVG_NS = "http://www.w3.org/2000/svg"
+
+def _hex(color):
+    return "#%02x%02x%02x" % tuple(color[:3])
+
+def _num(value):
+    return ("%d" % value) if float(value).is_integer() else ("%g" % value)
+
+def _points(points):
+    return " ".join(f"{_num(x)},{_num(y)}" for x, y in points)
+
+def shape_element(data):
+    """
+    Construye el elemento SVG de una figura.
+
+    Args:
+        data (dict): Descripción de la figura, como la devuelve Canvas.shapeToDict.
+
+    Returns:
+        str: Elemento SVG, o None si el tipo de figura no se puede representar.
+    """
+    shape_type = data["type"]
+    points = data["points"]
+    color = _hex(data["color"])
+    attrs = (f'data-type="{shape_type}" data-algorithm={quoteattr(str(data["algorithmType"]))} '
+             f'stroke="{color}" stroke-width="{_num(data["lineWidth"])}" fill="none"')
+    if shape_type == "LINE":
+        (x1, y1), (x2, y2) = points[0], points[1]
+        return f'<line {attrs} x1="{_num(x1)}" y1="{_num(y1)}" x2="{_num(x2)}" y2="{_num(y2)}"/>'
+    elif shape_type == "CIRCLE":
+        (cx, cy), (px, py) = points[0], points[1]
+        radius = int(math.hypot(px - cx, py - cy))
+        return f'<circle {attrs} cx="{_num(cx)}" cy="{_num(cy)}" r="{radius}"/>'
+    elif shape_type == "ELLIPSE":
+        (cx, cy), (px, py) = points[0], points[1]
+        return (f'<ellipse {attrs} cx="{_num(cx)}" cy="{_num(cy)}" '
+                f'rx="{_num(abs(px - cx))}" ry="{_num(abs(py - cy))}"/>')
+    elif shape_type in ("RECTANGLE", "ERASE_AREA"):
+        (x1, y1), (x2, y2) = points[0], points[1]
+        x, y = min(x1, x2), min(y1, y2)
+        w, h = abs(x2 - x1), abs(y2 - y1)
+        if shape_type == "ERASE_AREA":
+            attrs = (f'data-type="ERASE_AREA" data-algorithm={quoteattr(str(data["algorithmType"]))} '
+                     f'fill="{color}" stroke="none"')
+        return f'<rect {attrs} x="{_num(x)}" y="{_num(y)}" width="{_num(w)}" height="{_num(h)}"/>'
+    elif shape_type == "POLYGON":
+        vertices = list(points)
+        if len(vertices) > 1 and tuple(vertices[-1]) == tuple(vertices[0]):
+            vertices = vertices[:-1]  # El cierre queda implícito en <polygon>
+        return f'<polygon {attrs} points="{_points(vertices)}"/>'
+    elif shape_type == "POLYLINE":
+        return f'<polyline {attrs} points="{_points(points)}"/>'
+    elif shape_type == "CURVE":
+        (x0, y0), (x1, y1), (x2, y2) = points[0], points[1], points[2]
+        return (f'<path {attrs} d="M {_num(x0)} {_num(y0)} '
+                f'Q {_num(x1)} {_num(y1)} {_num(x2)} {_num(y2)}"/>')
+    return None
+
+def write_svg(canvas, file, view_rect):
+    """
+    Escribe el canvas como SVG en un archivo de texto abierto.
+
+    Args:
+        canvas (Canvas): Canvas a exportar.
+        file (io.TextIOBase): Archivo destino.
+        view_rect (pygame.Rect): Área del canvas en coordenadas de pantalla; define el
+            viewBox, de modo que las figuras conservan sus coordenadas.
+    """
+    from models.canvas import Canvas
+    x, y, w, h = view_rect
+    file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    file.write(f'<svg xmlns="{SVG_NS}" width="{w}" height="{h}" viewBox="{x} {y} {w} {h}">\n')
+    file.write(f'<rect data-type="BACKGROUND" x="{x}" y="{y}" width="{w}" height="{h}" '
+               f'fill="{_hex(canvas.background_color)}"/>\n')
+    if canvas.background_image is not None:
+        bx, by, bw, bh = canvas.background_rect
+        file.write(f'<image data-type="FLATTENED" x="{bx}" y="{by}" width="{bw}" height="{bh}" '
+                   f'href="data:image/png;base64,{canvas.encodeBackgroundImage()}"/>\n')
+    for shape in canvas.shapes:
+        element = shape_element(Canvas.shapeToDict(shape))
+        if element is not None:
+            file.write(element)
+            file.write("\n")
+    file.write("</svg>\n")
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_LENGTH = re.compile(r"\s*(" + _NUMBER.pattern + r")\s*([A-Za-z]*)\s*")
+_QUADRATIC_PATH = re.compile(r"\s*M([^A-Za-z]*)Q([^A-Za-z]*)")
+# Píxeles por unidad absoluta de CSS (96 px por pulgada)
+_UNITS = {"": 1, "px": 1, "pt": 96 / 72, "pc": 16, "in": 96, "cm": 96 / 2.54, "mm": 96 / 25.4, "q": 96 / 101.6}
+
+def _parse_number(value):
+    """
+    Convierte una longitud SVG en píxeles. Acepta las unidades absolutas de CSS (px, pt,
+    pc, in, cm, mm, Q); las relativas (em, %, ...) no tienen un valor fijo.
+
+    Raises:
+        ValueError: Si el valor no es una longitud o usa una unidad relativa.
+    """
+    match = _LENGTH.fullmatch(str(value))
+    if match is None or match.group(2).lower() not in _UNITS:
+        raise ValueError(f"longitud no válida: {value!r}")
+    value = float(match.group(1)) * _UNITS[match.group(2).lower()]
+    return int(value) if value.is_integer() else value
+
+def _parse_numbers(text):
+    return [_parse_number(n) for n in _NUMBER.findall(text or "")]
+
+def _pairs(values):
+    return [(values[i], values[i + 1]) for i in range(0, len(values) - 1, 2)]
+
+def parse_color(value, default=(0, 0, 0)):
+    """
+    Convierte un color SVG (#rgb, #rrggbb o rgb(r, g, b)) en una tupla RGB.
+    """
+    if not value or value == "none":
+        return default
+    value = value.strip()
+    if value.startswith("#"):
+        digits = value[1:]
+        if len(digits) == 3:
+            digits = "".join(c * 2 for c in digits)
+        if len(digits) == 6:
+            return tuple(int(digits[i:i + 2], 16) for i in (0, 2, 4))
+    elif value.startswith("rgb"):
+        values = _parse_numbers(value)
+        if len(values) >= 3:
+            return tuple(int(v) for v in values[:3])
+    return default
+
+def element_to_shape(tag, attrib):
+    """
+    Convierte un elemento SVG en la descripción de una figura para ShapeFactory.
+
+    Returns:
+        dict: Descripción con type, points, color, lineWidth y algorithmType, o None si
+        el elemento no corresponde a una figura soportada.
+    """
+    shape_type = attrib.get("data-type")
+    algorithm_type = attrib.get("data-algorithm", "BASIC")
+    color = parse_color(attrib.get("stroke"))
+    line_width = max(1, int(round(_parse_number(attrib.get("stroke-width", 1)))))
+    get = lambda name: _parse_number(attrib.get(name, 0))
+    if tag == "line":
+        points = [(get("x1"), get("y1")), (get("x2"), get("y2"))]
+        shape_type = "LINE"
+    elif tag == "circle":
+        cx, cy, r = get("cx"), get("cy"), get("r")
+        points = [(cx, cy), (cx + r, cy)]
+        shape_type = "CIRCLE"
+    elif tag == "ellipse":
+        cx, cy = get("cx"), get("cy")
+        points = [(cx, cy), (cx + get("rx"), cy + get("ry"))]
+        shape_type = "ELLIPSE"
+    elif tag == "rect":
+        x, y = get("x"), get("y")
+        points = [(x, y), (x + get("width"), y + get("height"))]
+        if shape_type == "ERASE_AREA":
+            color = parse_color(attrib.get("fill"), (255, 255, 255))
+        else:
+            shape_type = "RECTANGLE"
+    elif tag == "polygon":
+        points = _pairs(_parse_numbers(attrib.get("points")))
+        if len(points) < 2:
+            return None
+        points.append(points[0])
+        shape_type = "POLYGON"
+    elif tag == "polyline":
+        points = _pairs(_parse_numbers(attrib.get("points")))
+        if len(points) < 2:
+            return None
+        shape_type = "POLYLINE"
+    elif tag == "path":
+        # Solo se reconoce la forma que produce la exportación: M x0 y0 Q x1 y1 x2 y2
+        match = _QUADRATIC_PATH.fullmatch(attrib.get("d", ""))
+        if match is None:
+            return None
+        values = _parse_numbers(match.group(1)) + _parse_numbers(match.group(2))
+        if len(values) != 6:
+            return None
+        points = _pairs(values)
+        shape_type = "CURVE"
+    else:
+        return None
+    return {
+        "type": shape_type,
+        # Los algoritmos rasterizan puntos enteros, como los que producen los eventos
+        # del ratón: las coordenadas fraccionarias o convertidas de otras unidades se
+        # redondean al píxel más cercano
+        "points": [(int(round(x)), int(round(y))) for x, y in points],
+        "color": color,
+        "lineWidth": line_width,
+        "algorithmType": algorithm_type if algorithm_type in ("BASIC", "PYGAME", "BRESENHAM") else "BASIC"
+    }
+
+def iter_svg_shapes(file, on_background=None, on_background_image=None):
+    """
+    Lee un SVG de forma incremental y produce las figuras que contiene.
+
+    Args:
+        file (str o archivo binario): Ruta o archivo SVG.
+        on_background (callable, opcional): Función llamada con el color de fondo si el
+            documento lo declara.
+        on_background_image (callable, opcional): Función llamada con el mapa de bits de
+            figuras aplanadas ({"rect", "png"}) si el documento lo incluye.
+
+    Yields:
+        dict: Descripción de cada figura, en orden de documento.
+    """
+    depth = 0
+    root = None
+    for event, element in ET.iterparse(file, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            depth += 1
+            continue
+        depth -= 1
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag == "rect" and element.get("data-type") == "BACKGROUND":
+            if on_background is not None:
+                on_background(parse_color(element.get("fill"), (255, 255, 255)))
+        elif tag == "image" and element.get("data-type") == "FLATTENED":
+            href = element.get("href") or element.get("{http://www.w3.org/1999/xlink}href", "")
+            prefix = "data:image/png;base64,"
+            if on_background_image is not None and href.startswith(prefix):
+                rect = [int(value) for value in _parse_numbers(" ".join(
+                    element.get(name, "0") for name in ("x", "y", "width", "height")))]
+                on_background_image({"rect": rect, "png": href[len(prefix):]})
+        else:
+            try:
+                data = element_to_shape(tag, element.attrib)
+            except ValueError as e:
+                # Un elemento mal formado no impide importar el resto del documento
+                print(f"Se omite un elemento <{tag}> del SVG: {e}")
+                data = None
+            if data is not None:
+                yield data
+        if depth == 1:
+            root.clear()  # Libera los elementos ya procesados
+
+def load_svg(canvas, file):
+    """
+    Reemplaza el contenido del canvas con las figuras de un SVG.
+
+    Args:
+        canvas (Canvas): Canvas destino.
+        file (str o archivo binario): Ruta o archivo SVG.
+    """
+    canvas_data = {"background_color": canvas.background_color, "shapes": []}
+    def set_background(color):
+        canvas_data["background_color"] = color
+    def set_background_image(image_data):
+        canvas_data["background_image"] = image_data
+    canvas_data["shapes"] = list(iter_svg_shapes(file, set_background, set_background_image))
+    canvas.load_dict(canvas_data)
@@ -0,0 +1,134 @@
+import math
+import numpy as np
+
+class AffineTransform:
+    """
+    Transformación afín 2D representada por una matriz homogénea de 3x3.
+
+    applyTo transforma muchas figuras a la vez: empaqueta los puntos de todas en un solo
+    arreglo de NumPy, aplica la matriz en una única operación y reparte el resultado
+    entre las figuras. Los círculos conservan su significado (centro y punto del radio):
+    el centro se transforma y el radio se escala por el factor de escala uniforme
+    equivalente, manteniendo la dirección del punto del radio. Los rectángulos (y las
+    áreas de borrado) se guardan como dos esquinas opuestas de una caja paralela a los
+    ejes, por lo que solo admiten transformaciones que conservan los ejes; las demás
+    los dejan sin cambios.
+
+    Atributos:
+        matrix (numpy.ndarray): Matriz homogénea de 3x3.
+    """
+    def __init__(self, matrix):
+        self.matrix = np.asarray(matrix, dtype=float).reshape(3, 3)
+
+    @staticmethod
+    def translation(dx, dy):
+        return AffineTransform([[1, 0, dx], [0, 1, dy], [0, 0, 1]])
+
+    @staticmethod
+    def rotation(angle, center=(0, 0)):
+        """
+        Rotación alrededor de un centro.
+
+        Args:
+            angle (float): Ángulo en grados, en sentido horario en pantalla.
+            center (tuple, opcional): Centro de rotación.
+        """
+        c = math.cos(math.radians(angle))
+        s = math.sin(math.radians(angle))
+        rotation = AffineTransform([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+        return AffineTransform.aroundPoint(rotation, center)
+
+    @staticmethod
+    def scaling(sx, sy=None, center=(0, 0)):
+        """
+        Escalado respecto a un centro.
+
+        Args:
+            sx (float): Factor horizontal.
+            sy (float, opcional): Factor vertical. Por defecto igual a sx.
+            center (tuple, opcional): Centro del escalado.
+        """
+        sy = sx if sy is None else sy
+        scaling = AffineTransform([[sx, 0, 0], [0, sy, 0], [0, 0, 1]])
+        return AffineTransform.aroundPoint(scaling, center)
+
+    @staticmethod
+    def aroundPoint(transform, center):
+        cx, cy = center
+        return AffineTransform.translation(cx, cy).compose(transform).compose(AffineTransform.translation(-cx, -cy))
+
+    def compose(self, other):
+        """
+        Devuelve la transformación que aplica primero other y luego self.
+        """
+        return AffineTransform(self.matrix @ other.matrix)
+
+    def toList(self):
+        return self.matrix.tolist()
+
+    def preservesAxes(self, tolerance=1e-9):
+        """
+        Indica si la transformación lleva los ejes del lienzo a ejes del lienzo
+        (traslaciones, escalados, reflejos y giros de 90°).
+        """
+        nonzero = np.abs(self.matrix[:2, :2]) > tolerance
+        return bool((nonzero.sum(axis=0) == 1).all() and (nonzero.sum(axis=1) == 1).all())
+
+    @staticmethod
+    def isAxisAligned(shape):
+        """
+        Indica si la figura solo puede representar cajas paralelas a los ejes.
+        """
+        from models.shapes import Rectangle, EraseArea
+        return isinstance(shape, (Rectangle, EraseArea))
+
+    def applyTo(self, shapes):
+        """
+        Aplica la transformación a un conjunto de figuras con una sola operación vectorizada.
+
+        Se parte de los puntos exactos de cada figura (los de la transformación anterior,
+        si la hubo) y el resultado se guarda también exacto; solo los puntos con que se
+        rasteriza se redondean a enteros, como los que producen los eventos del ratón. Así
+        los giros y escalados sucesivos no acumulan error. Los rectángulos se omiten si la
+        transformación no conserva los ejes.
+
+        Args:
+            shapes (list): Figuras a transformar.
+        """
+        from models.shapes import Circle, Ellipse
+        keep_boxes = self.preservesAxes()
+        shapes = [shape for shape in shapes if shape.points and (keep_boxes or not self.isAxisAligned(shape))]
+        if not shapes:
+            return
+        sources = [shape.exactPoints if shape.exactPoints is not None else shape.points for shape in shapes]
+        counts = [len(points) for points in sources]
+        packed = np.array([p for points in sources for p in points], dtype=float).reshape(-1, 2)
+        linear = self.matrix[:2, :2]
+        transformed = packed @ linear.T + self.matrix[:2, 2]
+
+        offsets = np.cumsum(counts)[:-1]
+        is_circle = np.array([isinstance(shape, Circle) for shape in shapes])
+        if is_circle.any():
+            # Radio: se transforma la dirección con la parte lineal y se reescala la
+            # longitud por sqrt(|det|), el factor de escala uniforme equivalente.
+            starts = np.concatenate(([0], offsets))[is_circle]
+            centers = packed[starts]
+            radii = packed[starts + 1] - centers
+            lengths = np.hypot(radii[:, 0], radii[:, 1]) * math.sqrt(abs(np.linalg.det(linear)))
+            directions = radii @ linear.T
+            norms = np.hypot(directions[:, 0], directions[:, 1])
+            norms[norms == 0] = 1
+            transformed[starts + 1] = transformed[starts] + directions * (lengths / norms)[:, None]
+        is_ellipse = np.array([isinstance(shape, Ellipse) for shape in shapes])
+        if is_ellipse.any():
+            # Las elipses conservan los ejes paralelos al lienzo: sus semiejes pasan a
+            # ser las semiextensiones de la elipse transformada (exacto en traslaciones,
+            # escalados y giros de 90°).
+            starts = np.concatenate(([0], offsets))[is_ellipse]
+            semi_axes = np.abs(packed[starts + 1] - packed[starts])
+            extents = np.sqrt((semi_axes[:, None, :] * linear[None, :, :]) ** 2 @ np.ones(2))
+            transformed[starts + 1] = transformed[starts] + extents
+
+        rounded = np.rint(transformed).astype(int)
+        for shape, chunk, exact in zip(shapes, np.split(rounded, offsets), np.split(transformed, offsets)):
+            shape.updatePoints(list(map(tuple, chunk.tolist())), list(map(tuple, exact.tolist())))
@@ -0,0 +1,384 @@
+"""
+Servidor local de edición colaborativa del canvas.
+
+El servidor mantiene el Canvas autoritativo y recibe operaciones de varios clientes por
+un socket local. Las aplica en orden de llegada sobre un único bucle asyncio, les asigna
+un número de secuencia y las difunde por lotes: cada lote es una sola línea JSON con los
+registros de operación (los mismos que emite Canvas.notify), codificada una vez y
+escrita a todos los clientes. Los clientes aplican cada registro a su réplica con
+Canvas.applyOperation, de modo que las vistas suscritas al canvas (CanvasView, PickBuffer,
+SpriteCache) se actualizan de forma incremental, sin volver a cargar el documento.
+
+    python -m services.collab_server --port 8766 [--document dibujo.json]
+
+Protocolo (una línea JSON por mensaje):
+    servidor -> cliente al conectar:
+        {"type": "snapshot", "client": id, "seq": n, "canvas": {...Canvas.to_dict...}}
+    cliente -> servidor:
+        {"type": "op", "id": k, "op": registro}      registro: add, remove o erase
+    servidor -> todos los clientes:
+        {"type": "delta", "ops": [[seq, cliente, k, registro], ...]}
+    servidor -> cliente que envió una operación no válida:
+        {"type": "reject", "id": k, "reason": "..."}
+
+Un registro "remove" puede incluir la descripción de la figura ("shape"); si el índice
+ya no corresponde a esa figura por operaciones concurrentes, el servidor la busca y
+difunde el índice correcto, o rechaza la operación si la figura ya no existe.
+"""
+import argparse
+import asyncio
+import json
+import math
+from models.canvas import Canvas
+
+ACCEPTED_OPS = ("add", "remove", "erase")
+MAX_CLIENT_BUFFER = 8 * 1024 * 1024  # Clientes con más datos pendientes se desconectan
+# Límites de las figuras que envían los clientes: acotan el costo de rasterizarlas
+POINT_COUNTS = {"LINE": (2, 2), "CIRCLE": (2, 2), "ELLIPSE": (2, 2), "RECTANGLE": (2, 2),
+                "ERASE_AREA": (2, 2), "CURVE": (3, 3), "POLYGON": (2, 10000), "POLYLINE": (2, 10000)}
+ALGORITHM_TYPES = ("BASIC", "PYGAME", "BRESENHAM")
+MAX_COORDINATE = 100000
+MAX_LINE_WIDTH = 100
+
+def _encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+def _normalized(data):
+    return json.loads(json.dumps(data))
+
+def _coordinate(value, exact=False):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise TypeError(f"coordenada no válida: {value!r}")
+    if abs(value) > MAX_COORDINATE:
+        raise ValueError(f"coordenada fuera de rango: {value}")
+    return float(value) if exact else int(round(value))
+
+def _point_list(points, count, exact=False):
+    if not isinstance(points, list) or len(points) != count:
+        raise ValueError("número de puntos no válido")
+    result = []
+    for point in points:
+        if not isinstance(point, (list, tuple)) or len(point) != 2:
+            raise TypeError(f"punto no válido: {point!r}")
+        result.append([_coordinate(point[0], exact), _coordinate(point[1], exact)])
+    return result
+
+def validate_shape(data):
+    """
+    Comprueba la descripción de una figura enviada por un cliente y la normaliza (puntos
+    enteros, color y grosor enteros).
+
+    Returns:
+        dict: Descripción normalizada.
+
+    Raises:
+        ValueError, TypeError: Si la descripción no es válida.
+    """
+    if not isinstance(data, dict):
+        raise TypeError("la figura debe ser un objeto")
+    shape_type = data.get("type")
+    if shape_type not in POINT_COUNTS:
+        raise ValueError(f"tipo de figura '{shape_type}' no válido")
+    points = data.get("points")
+    low, high = POINT_COUNTS[shape_type]
+    if not isinstance(points, list) or not low <= len(points) <= high:
+        needed = low if low == high else f"entre {low} y {high}"
+        raise ValueError(f"{shape_type} necesita {needed} puntos")
+    color = data.get("color")
+    if (not isinstance(color, (list, tuple)) or len(color) != 3
+            or not all(isinstance(c, int) and not isinstance(c, bool) and 0 <= c <= 255 for c in color)):
+        raise ValueError(f"color no válido: {color!r}")
+    line_width = data.get("lineWidth")
+    if isinstance(line_width, bool) or not isinstance(line_width, int) or not 1 <= line_width <= MAX_LINE_WIDTH:
+        raise ValueError(f"grosor no válido: {line_width!r}")
+    if data.get("algorithmType") not in ALGORITHM_TYPES:
+        raise ValueError(f"algoritmo '{data.get('algorithmType')}' no válido")
+    shape = {"type": shape_type, "points": _point_list(points, len(points)), "color": list(color),
+             "lineWidth": line_width, "algorithmType": data["algorithmType"]}
+    if data.get("exactPoints") is not None:
+        shape["exactPoints"] = _point_list(data["exactPoints"], len(points), exact=True)
+    return shape
+
+def _shape_key(data):
+    # Clave comparable de una descripción de figura, con puntos y color como tuplas
+    return (data["type"], tuple(tuple(p) for p in data["points"]), tuple(data["color"]),
+            data["lineWidth"], data["algorithmType"])
+
+class CollabServer:
+    """
+    Servidor asyncio con el canvas autoritativo.
+
+    Atributos:
+        canvas (Canvas): Canvas autoritativo.
+        batch_interval (float): Segundos que se acumulan operaciones antes de difundirlas.
+        seq (int): Número de secuencia de la última operación aplicada.
+        clients (dict): Escritores de los clientes conectados, por identificador.
+    """
+    def __init__(self, canvas=None, batch_interval=0.002):
+        self.canvas = canvas if canvas is not None else Canvas()
+        self.batch_interval = batch_interval
+        self.seq = 0
+        self.clients = {}
+        self._next_client = 1
+        self._batch = []
+        self._flush_handle = None
+        self._server = None
+        self._handlers = set()
+
+    async def start(self, host="127.0.0.1", port=8766):
+        """
+        Empieza a aceptar conexiones.
+
+        Returns:
+            int: Puerto en que escucha el servidor (útil con port=0).
+        """
+        self._server = await asyncio.start_server(self.handleClient, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.flush()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in list(self.clients.values()):
+            writer.close()
+        self.clients.clear()
+        if self._handlers:
+            # Al cerrar cada conexión su manejador lee el fin de flujo y termina
+            await asyncio.wait(list(self._handlers), timeout=1)
+
+    async def handleClient(self, reader, writer):
+        client_id = self._next_client
+        self._next_client += 1
+        # La instantánea ya incluye las operaciones del lote pendiente; el cliente las
+        # descarta por su número de secuencia.
+        writer.write(_encode({"type": "snapshot", "client": client_id, "seq": self.seq,
+                              "canvas": self.canvas.to_dict()}))
+        self.clients[client_id] = writer
+        self._handlers.add(asyncio.current_task())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(message, dict) and message.get("type") == "op":
+                    self.submit(client_id, message.get("id"), message.get("op"))
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.pop(client_id, None)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    def submit(self, client_id, op_id, record):
+        """
+        Valida, aplica y encola para difusión una operación de un cliente.
+        """
+        try:
+            record = self.resolve(record)
+            if record is not None:
+                self.canvas.applyOperation(record)
+        except (AttributeError, KeyError, IndexError, TypeError, ValueError) as e:
+            self.reject(client_id, op_id, f"Operación no válida: {e}")
+            return
+        if record is None:
+            self.reject(client_id, op_id, "La figura ya no existe")
+            return
+        if record["op"] == "add":
+            # Se difunde la descripción normalizada de la figura creada
+            record = {"op": "add", "shape": _normalized(self.canvas.shapeToDict(self.canvas.shapes[-1]))}
+        self.seq += 1
+        self._batch.append([self.seq, client_id, op_id, record])
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_interval, self.flush)
+
+    def resolve(self, record):
+        """
+        Convierte el registro de un cliente en el registro que se aplica y se difunde.
+
+        Returns:
+            dict: Registro resuelto, o None si la figura a eliminar ya no existe.
+        """
+        if not isinstance(record, dict):
+            raise TypeError("el registro debe ser un objeto")
+        op = record.get("op")
+        if op not in ACCEPTED_OPS:
+            raise ValueError(f"operación '{op}' no aceptada")
+        if op == "add":
+            return {"op": "add", "shape": validate_shape(record["shape"])}
+        if op == "erase":
+            rect = record["rect"]
+            if not isinstance(rect, list) or len(rect) != 4:
+                raise ValueError("el área de borrado necesita 4 valores")
+            x, y, width, height = (_coordinate(v) for v in rect)
+            if width < 0 or height < 0:
+                raise ValueError("el área de borrado no puede tener tamaño negativo")
+            return {"op": "erase", "rect": [x, y, width, height]}
+        index = record["index"]
+        if isinstance(index, bool) or not isinstance(index, int):
+            raise TypeError(f"índice no válido: {index!r}")
+        shape_data = record.get("shape")
+        if shape_data is None:
+            if not 0 <= index < len(self.canvas.shapes):
+                raise IndexError("índice fuera de rango")
+            return {"op": "remove", "index": index}
+        key = _shape_key(validate_shape(shape_data))
+        if 0 <= index < len(self.canvas.shapes) and self.matches(self.canvas.shapes[index], key):
+            return {"op": "remove", "index": index}
+        for candidate, shape in enumerate(self.canvas.shapes):
+            if self.matches(shape, key):
+                return {"op": "remove", "index": candidate}
+        return None
+
+    def matches(self, shape, key):
+        # Descarte rápido por el primer punto antes de construir la clave completa
+        points = shape.points
+        if len(points) != len(key[1]) or tuple(points[0]) != key[1][0]:
+            return False
+        return _shape_key(self.canvas.shapeToDict(shape)) == key
+
+    def reject(self, client_id, op_id, reason):
+        writer = self.clients.get(client_id)
+        if writer is not None:
+            writer.write(_encode({"type": "reject", "id": op_id, "reason": reason}))
+
+    def flush(self):
+        """
+        Difunde a todos los clientes las operaciones acumuladas en un solo mensaje.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._batch:
+            return
+        data = _encode({"type": "delta", "ops": self._batch})
+        self._batch = []
+        for client_id, writer in list(self.clients.items()):
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                print(f"Cliente {client_id} desconectado: no recibe los cambios a tiempo")
+                self.clients.pop(client_id, None)
+                writer.close()
+                continue
+            writer.write(data)
+
+class CollabClient:
+    """
+    Cliente asyncio con una réplica del canvas.
+
+    Las operaciones propias se envían al servidor y se aplican a la réplica cuando
+    vuelven en un lote, en el orden que fijó el servidor, por lo que todas las réplicas
+    pasan por los mismos estados.
+
+    Atributos:
+        canvas (Canvas): Réplica local; se le pueden suscribir vistas.
+        client_id (int): Identificador asignado por el servidor.
+        seq (int): Número de secuencia de la última operación aplicada.
+    """
+    def __init__(self, canvas=None):
+        self.canvas = canvas if canvas is not None else Canvas()
+        self.client_id = None
+        self.seq = 0
+        self._next_op = 1
+        self._pending = {}
+        self._reader = None
+        self._writer = None
+        self._task = None
+
+    async def connect(self, host="127.0.0.1", port=8766):
+        self._reader, self._writer = await asyncio.open_connection(host, port, limit=MAX_CLIENT_BUFFER)
+        snapshot = json.loads(await self._reader.readline())
+        self.client_id = snapshot["client"]
+        self.seq = snapshot["seq"]
+        self.canvas.load_dict(snapshot["canvas"])
+        self._task = asyncio.create_task(self._receive())
+
+    def submit(self, record):
+        """
+        Envía una operación al servidor.
+
+        Returns:
+            asyncio.Future: Se resuelve con el número de secuencia asignado cuando la
+            operación se aplica a la réplica, o falla con ValueError si se rechaza.
+        """
+        op_id = self._next_op
+        self._next_op += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[op_id] = future
+        self._writer.write(_encode({"type": "op", "id": op_id, "op": record}))
+        return future
+
+    def addShape(self, shape):
+        return self.submit({"op": "add", "shape": Canvas.shapeToDict(shape)})
+
+    def removeShape(self, index):
+        return self.submit({"op": "remove", "index": index,
+                            "shape": Canvas.shapeToDict(self.canvas.shapes[index])})
+
+    def eraseArea(self, rect):
+        return self.submit({"op": "erase", "rect": list(rect)})
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _receive(self):
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            if message["type"] == "delta":
+                for seq, client_id, op_id, record in message["ops"]:
+                    if seq <= self.seq:
+                        continue  # Ya incluida en la instantánea
+                    self.canvas.applyOperation(record)
+                    self.seq = seq
+                    if client_id == self.client_id:
+                        future = self._pending.pop(op_id, None)
+                        if future is not None and not future.done():
+                            future.set_result(seq)
+            elif message["type"] == "reject":
+                future = self._pending.pop(message["id"], None)
+                if future is not None and not future.done():
+                    future.set_exception(ValueError(message["reason"]))
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Conexión cerrada por el servidor"))
+        self._pending.clear()
+
+async def serve(port, document=None, batch_interval=0.002):
+    canvas = Canvas()
+    if document:
+        with open(document, "r") as f:
+            canvas.load_json(f.read())
+    server = CollabServer(canvas, batch_interval)
+    port = await server.start(port=port)
+    print(f"Servidor colaborativo escuchando en 127.0.0.1:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local de edición colaborativa del canvas.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--document", metavar="RUTA", help="Documento JSON con el estado inicial.")
+    parser.add_argument("--batch-ms", type=float, default=2.0, help="Milisegundos que se acumulan operaciones por lote.")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.port, args.document, args.batch_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Servicio local de render de documentos del canvas.
+
+Recibe documentos en el formato de Canvas.to_json por HTTP, los rasteriza sin ventana con
+los algoritmos de la aplicación en un grupo de procesos y devuelve imágenes PNG. Los
+resultados se guardan en una caché LRU indexada por el hash del documento, el tamaño de
+salida y el origen, de modo que las vistas previas repetidas no vuelven a rasterizar.
+
+El servidor solo escucha en la interfaz local (127.0.0.1) y no usa dependencias aparte
+de las de la aplicación.
+
+    python -m services.render_service --port 8765 --workers 4
+
+Uso:
+    POST /render?width=740&height=640[&x=60&y=0]   cuerpo: JSON del canvas
+        -> 200 image/png, cabecera X-Cache: HIT o MISS
+        El origen (x, y) no puede ser negativo y x + width, y + height no pueden superar
+        MAX_DIMENSION; el cuerpo no puede superar MAX_BODY_BYTES.
+    GET /health
+        -> 200 con estadísticas de la caché en JSON
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+MAX_DIMENSION = 8192
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+def _init_worker():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    pygame.init()
+
+def render_document(document, width, height, origin):
+    """
+    Rasteriza un documento JSON del canvas y devuelve el PNG. Se ejecuta en los procesos
+    del grupo de trabajo.
+    """
+    from models.canvas import Canvas
+    from views.offscreen_renderer import OffscreenRenderer
+    canvas = Canvas()
+    canvas.load_json(document)
+    renderer = OffscreenRenderer(origin)
+    return renderer.encodePng(renderer.render(canvas, width, height))
+
+class RenderCache:
+    """
+    Caché LRU de PNG renderizados con límite de memoria.
+
+    Atributos:
+        max_bytes (int): Memoria máxima ocupada por las imágenes.
+        used_bytes (int): Memoria ocupada actualmente.
+        hits (int): Consultas resueltas desde la caché.
+        misses (int): Consultas que requirieron rasterizar.
+        shared (int): Consultas que esperaron un render ya en curso del mismo documento.
+    """
+    def __init__(self, max_bytes=128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(document, width, height, origin):
+        digest = hashlib.sha256(document.encode("utf-8") if isinstance(document, str) else document)
+        digest.update(f"|{width}x{height}@{origin[0]},{origin[1]}".encode("ascii"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def count(self, shared):
+        """
+        Registra una consulta que no estaba en la caché: un render nuevo o la espera de
+        uno en curso.
+        """
+        with self._lock:
+            if shared:
+                self.shared += 1
+            else:
+                self.misses += 1
+
+    def put(self, key, png):
+        with self._lock:
+            if key in self._entries or len(png) > self.max_bytes:
+                return
+            self._entries[key] = png
+            self.used_bytes += len(png)
+            while self.used_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.used_bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.used_bytes,
+                    "hits": self.hits, "misses": self.misses, "shared": self.shared}
+
+class RenderService:
+    """
+    Coordina la caché y el grupo de procesos de render.
+
+    Las peticiones simultáneas del mismo documento comparten un único render.
+    """
+    def __init__(self, workers=None, cache_bytes=128 * 1024 * 1024):
+        self.cache = RenderCache(cache_bytes)
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def render(self, document, width, height, origin=(60, 0)):
+        """
+        Devuelve el PNG de un documento, desde la caché si está disponible.
+
+        Returns:
+            tuple: (bytes del PNG, True si vino de la caché).
+        """
+        key = self.cache.key(document, width, height, origin)
+        png = self.cache.get(key)
+        if png is not None:
+            return png, True
+        with self._lock:
+            future = self._pending.get(key)
+            shared = future is not None
+            if not shared:
+                future = self.pool.submit(render_document, document, width, height, origin)
+                self._pending[key] = future
+        self.cache.count(shared)
+        try:
+            png = future.result()
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+        self.cache.put(key, png)
+        return png, False
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    service = None  # Se asigna al crear el servidor
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self.sendBody(200, "application/json", json.dumps(self.service.cache.stats()).encode("utf-8"))
+        else:
+            self.sendError(404, "Ruta no encontrada")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/render":
+            self.sendError(404, "Ruta no encontrada")
+            return
+        params = parse_qs(url.query)
+        try:
+            width = int(params.get("width", ["740"])[0])
+            height = int(params.get("height", ["640"])[0])
+            origin = (int(params.get("x", ["60"])[0]), int(params.get("y", ["0"])[0]))
+        except ValueError:
+            self.sendError(400, "Parámetros de tamaño no válidos")
+            return
+        if not (0 < width <= MAX_DIMENSION and 0 < height <= MAX_DIMENSION):
+            self.sendError(400, f"El tamaño debe estar entre 1 y {MAX_DIMENSION}")
+            return
+        # Se rasteriza en coordenadas absolutas: el origen suma al tamaño de la superficie
+        if not (0 <= origin[0] <= MAX_DIMENSION - width and 0 <= origin[1] <= MAX_DIMENSION - height):
+            self.sendError(400, f"El origen no puede ser negativo y origen + tamaño no puede superar {MAX_DIMENSION}")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.sendError(400, "Content-Length no válido")
+            return
+        if length > MAX_BODY_BYTES:
+            # Se responde sin leer el cuerpo
+            self.sendError(413, f"El documento supera {MAX_BODY_BYTES} bytes")
+            return
+        try:
+            document = self.rfile.read(length).decode("utf-8")
+            json.loads(document)
+        except ValueError:
+            self.sendError(400, "El cuerpo no es un documento JSON válido")
+            return
+        try:
+            png, cached = self.service.render(document, width, height, origin)
+        except Exception as e:
+            self.sendError(500, f"Error al renderizar: {e}")
+            return
+        self.sendBody(200, "image/png", png, {"X-Cache": "HIT" if cached else "MISS"})
+
+    def sendBody(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def sendError(self, status, message):
+        self.sendBody(status, "text/plain; charset=utf-8", message.encode("utf-8"))
+
+    def log_message(self, format, *args):
+        pass
+
+def create_server(port=8765, workers=None, cache_bytes=128 * 1024 * 1024):
+    """
+    Crea el servidor HTTP ligado a 127.0.0.1.
+
+    Returns:
+        ThreadingHTTPServer: Servidor listo para serve_forever; su atributo service es
+        el RenderService asociado.
+    """
+    service = RenderService(workers, cache_bytes)
+    handler = type("BoundRenderRequestHandler", (RenderRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.service = service
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio local de render de documentos del canvas.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="Procesos de render (por defecto, uno por CPU).")
+    parser.add_argument("--cache-mb", type=int, default=128, help="Memoria máxima de la caché de PNG.")
+    args = parser.parse_args(argv)
+    server = create_server(args.port, args.workers, args.cache_mb * 1024 * 1024)
+    print(f"Servicio de render escuchando en http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.shutdown()
+
+if __name__ == "__main__":
+    main()
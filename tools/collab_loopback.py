@@ -0,0 +1,147 @@
+"""
+Banco de pruebas de bucle local para el servidor colaborativo.
+
+Levanta un CollabServer en un puerto libre de 127.0.0.1 y conecta varios CollabClient
+que hacen de usuarios remotos: cada uno envía a la vez figuras nuevas, eliminaciones y
+borrados por área. Al terminar mide la latencia de cada operación (desde el envío
+hasta que vuelve aplicada en un lote) y comprueba que todas las réplicas coinciden con
+el canvas del servidor. Como el servidor y todas las réplicas comparten un proceso, la
+latencia medida incluye el costo de aplicar cada lote en todas ellas.
+
+Cada usuario envía --rate operaciones por segundo (5 por defecto, 120 op/s en total con
+24 usuarios). Con --rate 0 envía tan rápido como le permiten sus --in-flight operaciones
+sin confirmar: el proceso se satura y la latencia pasa a ser la cola de espera
+(operaciones en vuelo / operaciones por segundo), útil para medir el rendimiento máximo.
+
+    python -m tools.collab_loopback --clients 24 --ops 200 [--rate 5] [--in-flight 8]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from models.canvas import Canvas
+from services.collab_server import CollabServer, CollabClient
+from tools.replay import percentile
+
+SHAPE_TYPES = ["LINE", "CIRCLE", "RECTANGLE", "POLYLINE", "CURVE"]
+
+def random_shape(rng, width=740, height=640, origin=(60, 0)):
+    shape_type = rng.choice(SHAPE_TYPES)
+    num_points = {"CURVE": 3, "POLYLINE": rng.randint(2, 6)}.get(shape_type, 2)
+    points = [(origin[0] + rng.randint(0, width), origin[1] + rng.randint(0, height)) for _ in range(num_points)]
+    color = [rng.randint(0, 255) for _ in range(3)]
+    return {"type": shape_type, "points": points, "color": color,
+            "lineWidth": rng.randint(1, 4), "algorithmType": rng.choice(["BASIC", "PYGAME"])}
+
+async def run_client(client, ops, seed, max_in_flight=8, rate=0.0):
+    """
+    Envía las operaciones de un usuario simulado, a rate operaciones por segundo (o
+    sin pausa si rate es 0).
+
+    Returns:
+        tuple: (latencias en segundos, número de operaciones rechazadas)
+    """
+    rng = random.Random(seed)
+    latencies = []
+    rejected = 0
+    in_flight = set()
+    # Desfase inicial al azar para que los usuarios no envíen todos a la vez
+    next_send = time.perf_counter() + (rng.random() / rate if rate > 0 else 0.0)
+
+    async def track(future, sent):
+        nonlocal rejected
+        try:
+            await future
+            latencies.append(time.perf_counter() - sent)
+        except ValueError:
+            rejected += 1  # Otra réplica eliminó antes la misma figura
+
+    for _ in range(ops):
+        if rate > 0:
+            await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+            next_send += 1 / rate
+        roll = rng.random()
+        shapes = client.canvas.shapes
+        sent = time.perf_counter()
+        if roll < 0.15 and shapes:
+            future = client.removeShape(rng.randrange(len(shapes)))
+        elif roll < 0.2:
+            x, y = 60 + rng.randint(0, 700), rng.randint(0, 600)
+            future = client.eraseArea([x, y, rng.randint(5, 40), rng.randint(5, 40)])
+        else:
+            future = client.submit({"op": "add", "shape": random_shape(rng)})
+        task = asyncio.ensure_future(track(future, sent))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        if len(in_flight) >= max_in_flight:
+            await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        await asyncio.sleep(0)
+    if in_flight:
+        await asyncio.wait(in_flight)
+    return latencies, rejected
+
+async def run(num_clients, ops, batch_ms, seed, max_in_flight=8, rate=0.0):
+    server = CollabServer(batch_interval=batch_ms / 1000)
+    port = await server.start(port=0)
+    clients = [CollabClient() for _ in range(num_clients)]
+    await asyncio.gather(*(client.connect(port=port) for client in clients))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run_client(client, ops, f"{seed}:{i}", max_in_flight, rate) for i, client in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+
+    # Espera a que el último lote llegue a todas las réplicas
+    await asyncio.sleep(4 * server.batch_interval + 0.05)
+    expected = json.dumps(server.canvas.to_dict(), sort_keys=True)
+    diverged = [client.client_id for client in clients
+                if json.dumps(json.loads(json.dumps(client.canvas.to_dict())), sort_keys=True) != expected]
+    for client in clients:
+        await client.close()
+    await server.close()
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    return {
+        "clients": num_clients,
+        "operations": server.seq,
+        "rejected": sum(result[1] for result in results),
+        "seconds": elapsed,
+        "ops_per_second": server.seq / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": 1000 * percentile(latencies, 0.5),
+            "p95": 1000 * percentile(latencies, 0.95),
+            "max": 1000 * (latencies[-1] if latencies else 0.0),
+        },
+        "shapes": len(server.canvas.shapes),
+        "diverged": diverged,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de bucle local del servidor colaborativo.")
+    parser.add_argument("--clients", type=int, default=24)
+    parser.add_argument("--ops", type=int, default=200, help="Operaciones por cliente.")
+    parser.add_argument("--batch-ms", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--in-flight", type=int, default=8, help="Operaciones sin confirmar por cliente.")
+    parser.add_argument("--rate", type=float, default=5.0,
+                        help="Operaciones por segundo de cada cliente (0: sin pausa, satura el proceso).")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args.clients, args.ops, args.batch_ms, args.seed, args.in_flight, args.rate))
+    latency = report["latency_ms"]
+    print(f"Clientes: {report['clients']}  Operaciones aplicadas: {report['operations']}  "
+          f"Rechazadas: {report['rejected']}  ({report['ops_per_second']:.0f} op/s)")
+    print(f"Latencia (ms): p50 {latency['p50']:.2f}  p95 {latency['p95']:.2f}  máx {latency['max']:.2f}")
+    if report["diverged"]:
+        print(f"ERROR: réplicas distintas del servidor: {report['diverged']}")
+        return 1
+    print(f"Todas las réplicas coinciden con el servidor ({report['shapes']} figuras).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
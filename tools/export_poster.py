@@ -0,0 +1,64 @@
+"""
+Exportación de un documento del canvas a un PNG de gran tamaño, sin abrir la interfaz.
+
+Las figuras se vuelven a rasterizar a la escala de salida con sus propios algoritmos,
+franja por franja, y cada franja se comprime al archivo en cuanto se termina, por lo que
+la memoria usada es la de una franja aunque la imagen tenga decenas de miles de píxeles
+de lado:
+
+    python -m tools.export_poster dibujo.json poster.png --width 20000
+    python -m tools.export_poster dibujo.json poster.png --scale 10 --band-mb 32
+"""
+import argparse
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # No disponible en Windows
+    resource = None
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from models.canvas import Canvas
+from views.band_exporter import BandExporter
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta un documento del canvas a un PNG de gran tamaño.")
+    parser.add_argument("document", help="Documento JSON del canvas.")
+    parser.add_argument("output", help="Archivo PNG de salida.")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--width", type=int, help="Ancho de la imagen de salida en píxeles.")
+    size.add_argument("--scale", type=float, help="Factor de escala respecto del canvas en pantalla.")
+    parser.add_argument("--canvas-size", type=int, nargs=2, default=[740, 640], metavar=("ANCHO", "ALTO"),
+                        help="Tamaño del canvas en pantalla con que se dibujó el documento.")
+    parser.add_argument("--origin", type=int, nargs=2, default=[60, 0], metavar=("X", "Y"),
+                        help="Esquina superior izquierda del canvas en pantalla.")
+    parser.add_argument("--band-mb", type=float, default=64, help="Memoria aproximada de cada franja, en MB.")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    canvas = Canvas()
+    with open(args.document, "r") as f:
+        canvas.load_json(f.read())
+    canvas_rect = pygame.Rect(args.origin, args.canvas_size)
+    scale = args.scale or (args.width / canvas_rect.width if args.width else 1.0)
+    exporter = BandExporter(canvas_rect, scale, int(args.band_mb * 1024 * 1024))
+
+    start = time.perf_counter()
+    with open(args.output, "wb") as f:
+        width, height = exporter.export(canvas, f)
+    elapsed = time.perf_counter() - start
+    pygame.quit()
+
+    print(f"Imagen de {width}x{height} escrita en '{args.output}' en {elapsed:.1f} s ({len(canvas.shapes)} figuras)")
+    if resource is not None:
+        # ru_maxrss está en KB en Linux
+        print(f"Memoria máxima del proceso: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
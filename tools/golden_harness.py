@@ -0,0 +1,302 @@
+"""
+Arnés de regresión con imágenes de referencia para los algoritmos de rasterización.
+
+Renderiza un corpus de figuras generado con semilla fija a través de cada algoritmo y
+compara el resultado, píxel a píxel, con las imágenes guardadas en tools/golden. Cada
+caso se renderiza por dos caminos: dibujo directo con el algoritmo y dibujo a través de
+la caché de sprites, de modo que ambos deben producir exactamente la referencia.
+
+Funciona sin ventana con el driver "dummy" de SDL:
+
+    python -m tools.golden_harness            # compara contra las referencias
+    python -m tools.golden_harness --update   # regenera las referencias
+
+Cuando un caso falla se escribe una imagen de diferencias en el directorio de salida
+(por defecto tools/golden_diffs): los píxeles distintos en rojo sobre la referencia
+atenuada.
+
+Además de los casos con referencia, el arnés ejecuta comprobaciones (CHECKS) que no
+necesitan imágenes guardadas: cada una renderiza por dos caminos que deben coincidir, o
+verifica que un documento se puede importar y renderizar, y devuelve la lista de
+problemas encontrados.
+"""
+import argparse
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from models.shapes import ShapeFactory
+from views.sprite_cache import SpriteCache
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "golden")
+SURFACE_SIZE = (320, 240)
+# El canvas no ocupa toda la superficie para ejercitar el recorte en sus bordes
+CANVAS_RECT = pygame.Rect(40, 10, 260, 220)
+BACKGROUND = (255, 255, 255)
+
+# nombre -> (tipo de figura, tipo de algoritmo, número de puntos, número de figuras)
+CASES = {
+    "dda_lines": ("LINE", "BASIC", 2, 40),
+    "midpoint_circles": ("CIRCLE", "BASIC", 2, 25),
+    "basic_ellipses": ("ELLIPSE", "BASIC", 2, 25),
+    "bresenham_lines": ("LINE", "BRESENHAM", 2, 40),
+    "bresenham_circles": ("CIRCLE", "BRESENHAM", 2, 25),
+    "bezier_curves": ("CURVE", "BASIC", 3, 25),
+    "basic_rectangles": ("RECTANGLE", "BASIC", 2, 25),
+    "basic_polygons": ("POLYGON", "BASIC", 5, 15),
+    "basic_polylines": ("POLYLINE", "BASIC", 6, 15),
+    "erase_areas": ("ERASE_AREA", "BASIC", 2, 10),
+    "pygame_lines": ("LINE", "PYGAME", 2, 30),
+    "pygame_circles": ("CIRCLE", "PYGAME", 2, 20),
+    "pygame_ellipses": ("ELLIPSE", "PYGAME", 2, 20),
+    "pygame_rectangles": ("RECTANGLE", "PYGAME", 2, 20),
+    "pygame_polygons": ("POLYGON", "PYGAME", 5, 15),
+    "pygame_polylines": ("POLYLINE", "PYGAME", 6, 15),
+    "pygame_curves": ("CURVE", "PYGAME", 3, 20),
+}
+
+def build_corpus(name, seed=1234):
+    """
+    Genera las figuras de un caso. Las coordenadas se salen del canvas a propósito
+    para cubrir figuras parcialmente visibles y completamente fuera.
+
+    Args:
+        name (str): Nombre del caso.
+        seed (int, opcional): Semilla base del generador.
+
+    Returns:
+        list: Figuras del caso, en orden de dibujo.
+    """
+    shape_type, algorithm_type, num_points, count = CASES[name]
+    rng = random.Random(f"{seed}:{name}")
+    width, height = SURFACE_SIZE
+    shapes = []
+    if shape_type == "ERASE_AREA":
+        # Las áreas de borrado solo se ven sobre otras figuras
+        shapes.extend(build_corpus("dda_lines", seed)[:20])
+    for _ in range(count):
+        points = [(rng.randint(-40, width + 40), rng.randint(-40, height + 40)) for _ in range(num_points)]
+        if shape_type == "POLYGON":
+            points.append(points[0])
+        if shape_type == "ERASE_AREA":
+            color = BACKGROUND
+        else:
+            color = (rng.randint(0, 200), rng.randint(0, 200), rng.randint(0, 200))
+        line_width = rng.randint(1, 6)
+        shapes.append(ShapeFactory.createShape(shape_type, points, color, line_width, algorithm_type))
+    return shapes
+
+def render_case(name, path="direct"):
+    """
+    Renderiza un caso en una superficie nueva.
+
+    Args:
+        name (str): Nombre del caso.
+        path (str, opcional): "direct" para dibujar con el algoritmo o "cached" para
+            dibujar a través de SpriteCache.
+
+    Returns:
+        pygame.Surface: Superficie renderizada.
+    """
+    surface = pygame.Surface(SURFACE_SIZE, 0, 32)
+    surface.fill((128, 128, 128))
+    surface.fill(BACKGROUND, CANVAS_RECT)
+    cache = SpriteCache() if path == "cached" else None
+    for shape in build_corpus(name):
+        if cache is not None:
+            cache.draw(shape, surface, CANVAS_RECT)
+        else:
+            shape.drawingAlgorithm.draw(shape, surface, CANVAS_RECT)
+    # Solo se compara el interior del canvas: fuera de él el contenido no está definido
+    result = pygame.Surface(CANVAS_RECT.size, 0, 32)
+    result.blit(surface, (0, 0), CANVAS_RECT)
+    return result
+
+def compare(actual, expected, tolerance=0):
+    """
+    Compara dos superficies.
+
+    Args:
+        actual (pygame.Surface): Resultado obtenido.
+        expected (pygame.Surface): Referencia.
+        tolerance (int, opcional): Diferencia máxima permitida por canal.
+
+    Returns:
+        numpy.ndarray: Máscara (ancho, alto) con los píxeles que difieren.
+    """
+    a = pygame.surfarray.array3d(actual).astype(np.int16)
+    b = pygame.surfarray.array3d(expected).astype(np.int16)
+    return (np.abs(a - b) > tolerance).any(axis=2)
+
+def write_diff_image(expected, mask, file_path):
+    arr = pygame.surfarray.array3d(expected) // 3 + 170
+    arr[mask] = (255, 0, 0)
+    pygame.image.save(pygame.surfarray.make_surface(arr), file_path)
+
+def check_svg_fractional_import():
+    """
+    Importa un SVG con coordenadas fraccionarias y en milímetros para todos los tipos
+    de elemento y familias de algoritmos, y lo renderiza.
+
+    Returns:
+        list: Descripción de cada problema encontrado.
+    """
+    import io
+    from models.canvas import Canvas
+    from models.svg import load_svg
+    from views.offscreen_renderer import OffscreenRenderer
+    elements = [
+        '<line x1="100.5" y1="20.25" x2="30mm" y2="150.75" stroke-width="2.5"/>',
+        '<circle cx="150.5" cy="100.4" r="10mm"/>',
+        '<ellipse cx="40mm" cy="30.5mm" rx="20.5" ry="0.5in"/>',
+        '<rect x="10.5mm" y="5.25" width="60.5" height="20mm"/>',
+        '<polygon points="60.5,10.5 200.25,40.75 120.5,180.5"/>',
+        '<polyline points="70.5,20.5 210.25,50.75 130.5,190.5 80.1,60.9"/>',
+        '<path d="M 65.5 15.5 Q 150.25 200.75 250.5 30.5"/>',
+    ]
+    problems = []
+    for algorithm in ("BASIC", "PYGAME", "BRESENHAM"):
+        body = "".join(element.replace("/>", f' stroke="#204060" data-algorithm="{algorithm}"/>')
+                       for element in elements)
+        document = f'<svg xmlns="http://www.w3.org/2000/svg">{body}</svg>'.encode("utf-8")
+        canvas = Canvas()
+        load_svg(canvas, io.BytesIO(document))
+        if len(canvas.shapes) != len(elements):
+            problems.append(f"{algorithm}: se importaron {len(canvas.shapes)} de {len(elements)} figuras")
+        for shape in canvas.shapes:
+            if not all(isinstance(v, int) for point in shape.points for v in point):
+                problems.append(f"{algorithm}: {type(shape).__name__} con coordenadas no enteras {shape.points}")
+        try:
+            OffscreenRenderer(CANVAS_RECT.topleft).render(canvas, *CANVAS_RECT.size)
+        except Exception as e:
+            problems.append(f"{algorithm}: error al renderizar: {e!r}")
+    return problems
+
+def export_png(canvas, scale, band_bytes):
+    import io
+    from views.band_exporter import BandExporter
+    buffer = io.BytesIO()
+    BandExporter(CANVAS_RECT, scale, band_bytes).export(canvas, buffer)
+    buffer.seek(0)
+    return pygame.image.load(buffer, "png")
+
+def check_band_export():
+    """
+    Exporta el corpus de cada caso a PNG por franjas de varios altos, a escala 1 y 3, y
+    lo compara píxel a píxel con la exportación en una sola franja. A escala 1 la
+    exportación en una sola franja también debe coincidir con el render directo.
+
+    Returns:
+        list: Descripción de cada problema encontrado.
+    """
+    from models.canvas import Canvas
+    problems = []
+    for name in CASES:
+        canvas = Canvas()
+        canvas.shapes.extend(build_corpus(name))
+        for scale in (1, 3):
+            single = export_png(canvas, scale, 1 << 40)
+            if scale == 1:
+                diff = int(compare(single, render_case(name)).sum())
+                if diff:
+                    problems.append(f"{name}: la exportación difiere del render directo en {diff} píxeles")
+            row_bytes = 4 * round(CANVAS_RECT.right * scale)
+            for rows in (40, 70, 130):
+                diff = int(compare(export_png(canvas, scale, rows * row_bytes), single).sum())
+                if diff:
+                    problems.append(f"{name} a escala {scale}: franjas de ~{rows} filas difieren en {diff} píxeles")
+    return problems
+
+# nombre -> función sin argumentos que devuelve la lista de problemas encontrados
+CHECKS = {
+    "svg_fractional_import": check_svg_fractional_import,
+    "band_export": check_band_export,
+}
+
+def run_checks(names):
+    """
+    Ejecuta las comprobaciones indicadas.
+
+    Returns:
+        bool: True si ninguna encontró problemas.
+    """
+    ok = True
+    for name in names:
+        problems = CHECKS[name]()
+        if not problems:
+            print(f"OK      {name} [comprobación]")
+            continue
+        ok = False
+        print(f"FALLA   {name} [comprobación]: {len(problems)} problemas")
+        for problem in problems[:10]:
+            print(f"        {problem}")
+    return ok
+
+def run(cases, update=False, tolerance=0, max_diff_pixels=0, output_dir=None, paths=("direct", "cached")):
+    """
+    Ejecuta el arnés sobre los casos indicados.
+
+    Returns:
+        bool: True si todos los casos coinciden con sus referencias (o se actualizaron).
+    """
+    ok = True
+    for name in cases:
+        reference_path = os.path.join(GOLDEN_DIR, f"{name}.png")
+        if update:
+            os.makedirs(GOLDEN_DIR, exist_ok=True)
+            pygame.image.save(render_case(name, "direct"), reference_path)
+            print(f"Referencia actualizada: {reference_path}")
+            continue
+        if not os.path.exists(reference_path):
+            print(f"FALTA   {name}: no existe {reference_path} (ejecute con --update)")
+            ok = False
+            continue
+        expected = pygame.image.load(reference_path)
+        for path in paths:
+            mask = compare(render_case(name, path), expected, tolerance)
+            diff_pixels = int(mask.sum())
+            if diff_pixels <= max_diff_pixels:
+                print(f"OK      {name} [{path}]")
+                continue
+            ok = False
+            message = f"FALLA   {name} [{path}]: {diff_pixels} píxeles distintos"
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+                diff_path = os.path.join(output_dir, f"{name}-{path}-diff.png")
+                write_diff_image(expected, mask, diff_path)
+                message += f" (diferencias en {diff_path})"
+            print(message)
+    return ok
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regresión con imágenes de referencia de los algoritmos de dibujo.")
+    parser.add_argument("cases", nargs="*", help="Casos o comprobaciones a ejecutar (por defecto todos).")
+    parser.add_argument("--update", action="store_true", help="Regenera las imágenes de referencia.")
+    parser.add_argument("--tolerance", type=int, default=0, help="Diferencia máxima por canal (0 = exacta).")
+    parser.add_argument("--max-diff-pixels", type=int, default=0, help="Píxeles distintos permitidos por caso.")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "golden_diffs"),
+                        help="Directorio donde se escriben las imágenes de diferencias.")
+    parser.add_argument("--path", choices=["direct", "cached", "all"], default="all",
+                        help="Camino de render a verificar.")
+    args = parser.parse_args(argv)
+    names = args.cases or list(CASES) + list(CHECKS)
+    unknown = [name for name in names if name not in CASES and name not in CHECKS]
+    if unknown:
+        parser.error(f"Casos desconocidos: {', '.join(unknown)}")
+    cases = [name for name in names if name in CASES]
+    checks = [name for name in names if name in CHECKS]
+    paths = ("direct", "cached") if args.path == "all" else (args.path,)
+    pygame.init()
+    ok = run(cases, args.update, args.tolerance, args.max_diff_pixels, args.output, paths)
+    if not args.update:
+        ok = run_checks(checks) and ok
+    pygame.quit()
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
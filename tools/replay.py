@@ -0,0 +1,169 @@
+"""
+Reproducción sin ventana de sesiones grabadas con `python main.py --record RUTA`.
+
+Construye la aplicación igual que main.py, con las opciones de línea de comandos
+guardadas en la grabación, sobre el driver "dummy" de SDL y le entrega
+los eventos grabados, cuadro por cuadro, a ToolbarView.handle_event y
+EventHandler.processEvent. Tras cada cuadro se renderiza el canvas y la barra de
+herramientas y se mide el tiempo. Al terminar informa los tiempos por cuadro y el
+estado final del canvas, lo que convierte sesiones reales en benchmarks y pruebas de
+regresión repetibles.
+
+    python -m tools.replay sesion.rec                  # lo más rápido posible
+    python -m tools.replay sesion.rec --pace original  # respetando los tiempos grabados
+    python -m tools.replay sesion.rec --output-json final.json
+
+Las acciones que abren diálogos (guardar, abrir, exportar, selector de color) y los
+resultados de diálogos grabados se omiten, ya que no hay ventana ni usuario que responda.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from controllers.input_recorder import ReplayInputState, load_recording
+
+def build_app(window_size, toolbar_width=60, options=None):
+    """
+    Construye modelo, vistas y controladores como lo hace main.py.
+
+    Args:
+        window_size (tuple): Tamaño de la ventana grabada.
+        toolbar_width (int, opcional): Ancho de la barra de herramientas.
+        options (dict, opcional): Opciones de main.py guardadas en la cabecera de la
+            grabación: auto_flatten, indexed_color, compare y export_scale. Las que
+            faltan (grabaciones anteriores) toman el valor por defecto de main.py.
+
+    Returns:
+        tuple: (canvas, canvasView, toolbarView, superController)
+    """
+    from models.canvas import Canvas
+    from views.canvas_view import CanvasView
+    from views.toolbar_view import ToolbarView
+    from controllers.super_controller import SuperController
+    options = options or {}
+    screen = pygame.display.set_mode(window_size)
+    canvas = Canvas(indexed_color=bool(options.get("indexed_color")))
+    canvasView = CanvasView(canvas, screen, toolbar_width)
+    superController = SuperController(canvas, canvasView)
+    toolbarView = ToolbarView(superController.drawingController, screen, window_size[1], toolbar_width)
+    controller = superController.drawingController
+    controller.toolbarView = toolbarView
+    controller.autoFlattenThreshold = options.get("auto_flatten")
+    controller.exportScale = options.get("export_scale", 1.0)
+    if options.get("compare"):
+        controller.compareFamilies = tuple(options["compare"])
+        controller.toggleComparison()
+    return canvas, canvasView, toolbarView, superController
+
+def disable_dialogs(controller):
+    def skipped(name):
+        def action(*args, **kwargs):
+            print(f"Acción omitida durante la reproducción: {name}")
+            return None
+        return action
+    for name in ("saveCanvas", "openCanvas", "exportCanvas", "openColorPicker", "handleDialogResult"):
+        setattr(controller, name, skipped(name))
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def replay(path, pace="fast"):
+    """
+    Reproduce una grabación.
+
+    Args:
+        path (str): Ruta de la grabación.
+        pace (str, opcional): "fast" para reproducir lo más rápido posible u "original"
+            para respetar los instantes grabados.
+
+    Returns:
+        dict: Informe con tiempos por cuadro y estado final del canvas.
+    """
+    header, entries = load_recording(path)
+    canvas, canvasView, toolbarView, superController = build_app(tuple(header["window"]), options=header.get("options"))
+    controller = superController.drawingController
+    inputState = ReplayInputState()
+    controller.inputState = inputState
+    disable_dialogs(controller)
+
+    frames = {}
+    for entry in entries:
+        frames.setdefault(entry["frame"], []).append(entry)
+
+    frame_times = []
+    start = time.perf_counter()
+    for frame in sorted(frames):
+        frame_start = time.perf_counter()
+        for entry in frames[frame]:
+            if pace == "original":
+                delay = entry["t"] - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+                frame_start = time.perf_counter()
+            inputState.pressed = entry["pressed"]
+            inputState.mods = entry["mods"]
+            event = entry["event"]
+            if not toolbarView.handle_event(event):
+                superController.eventHandler.processEvent(event)
+        canvasView.render()
+        toolbarView.draw()
+        pygame.display.flip()
+        frame_times.append(time.perf_counter() - frame_start)
+    total = time.perf_counter() - start
+
+    document = canvas.to_json()
+    ordered = sorted(frame_times)
+    return {
+        "events": len(entries),
+        "frames": len(frame_times),
+        "total_seconds": total,
+        "frame_ms": {
+            "mean": 1000 * sum(frame_times) / len(frame_times) if frame_times else 0.0,
+            "p50": 1000 * percentile(ordered, 0.5),
+            "p95": 1000 * percentile(ordered, 0.95),
+            "max": 1000 * (ordered[-1] if ordered else 0.0),
+        },
+        "shapes": len(canvas.shapes),
+        "canvas_sha256": hashlib.sha256(document.encode("utf-8")).hexdigest(),
+        "document": document,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproduce sin ventana una sesión grabada del Graficador.")
+    parser.add_argument("recording", help="Archivo grabado con main.py --record.")
+    parser.add_argument("--pace", choices=["fast", "original"], default="fast",
+                        help="Velocidad de reproducción.")
+    parser.add_argument("--output-json", metavar="RUTA", help="Guarda el estado final del canvas.")
+    parser.add_argument("--report-json", metavar="RUTA", help="Guarda el informe en JSON.")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    report = replay(args.recording, args.pace)
+    pygame.quit()
+
+    document = report.pop("document")
+    if args.output_json:
+        with open(args.output_json, "w") as f:
+            f.write(document)
+    if args.report_json:
+        with open(args.report_json, "w") as f:
+            json.dump(report, f, indent=2)
+    frame_ms = report["frame_ms"]
+    print(f"Eventos: {report['events']}  Cuadros: {report['frames']}  Total: {report['total_seconds']:.3f} s")
+    print(f"Tiempo por cuadro (ms): media {frame_ms['mean']:.2f}  p50 {frame_ms['p50']:.2f}  "
+          f"p95 {frame_ms['p95']:.2f}  máx {frame_ms['max']:.2f}")
+    print(f"Figuras finales: {report['shapes']}  SHA-256 del canvas: {report['canvas_sha256']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+import struct
+import zlib
+import numpy as np
+import pygame
+from models.canvas import Canvas
+
+class PngStreamWriter:
+    """
+    Codificador PNG (RGB de 8 bits) que recibe las filas de la imagen de forma
+    incremental y las comprime directamente en el archivo, sin tener la imagen completa
+    en memoria.
+
+    Atributos:
+        width (int): Ancho de la imagen.
+        height (int): Alto de la imagen.
+        rows_written (int): Filas recibidas hasta el momento.
+    """
+    SIGNATURE = b"\x89PNG\r\n\x1a\n"
+    CHUNK_BYTES = 1 << 20  # Tamaño a partir del cual se emite un bloque IDAT
+
+    def __init__(self, file, width, height, compression=6):
+        self.file = file
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        # Tras el filtro "Up" los datos son sobre todo series de ceros: la estrategia RLE
+        # comprime igual o mejor que la búsqueda general de coincidencias y mucho más rápido
+        self._compressor = zlib.compressobj(compression, zlib.DEFLATED, 15, 8, zlib.Z_RLE)
+        self._pending = []
+        self._pending_bytes = 0
+        self._previous = np.zeros(width * 3, dtype=np.uint8)  # Fila anterior, para el filtro
+        self.file.write(self.SIGNATURE)
+        self.writeChunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def writeChunk(self, kind, data):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
+
+    def writeRows(self, rgb):
+        """
+        Agrega filas consecutivas de la imagen.
+
+        Args:
+            rgb (numpy.ndarray): Arreglo (filas, ancho, 3) de uint8.
+        """
+        rows = rgb.shape[0]
+        if self.rows_written + rows > self.height:
+            raise ValueError("Se recibieron más filas que el alto de la imagen")
+        # Cada fila va precedida del byte de filtro. Con el filtro "Up" (2) se guarda la
+        # diferencia con la fila anterior, que en dibujos de trazos es casi siempre cero
+        # y se comprime mucho mejor.
+        flat = rgb.reshape(rows, self.width * 3)
+        scanlines = np.empty((rows, 1 + self.width * 3), dtype=np.uint8)
+        scanlines[:, 0] = 2
+        scanlines[0, 1:] = flat[0] - self._previous
+        scanlines[1:, 1:] = flat[1:] - flat[:-1]
+        self._previous = flat[-1].copy()
+        self._queue(self._compressor.compress(scanlines))
+        self.rows_written += rows
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"Faltan filas: {self.rows_written} de {self.height}")
+        self._queue(self._compressor.flush())
+        self._flushChunks(force=True)
+        self.writeChunk(b"IEND", b"")
+
+    def _queue(self, data):
+        if data:
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+        self._flushChunks()
+
+    def _flushChunks(self, force=False):
+        if self._pending and (force or self._pending_bytes >= self.CHUNK_BYTES):
+            self.writeChunk(b"IDAT", b"".join(self._pending))
+            self._pending = []
+            self._pending_bytes = 0
+
+class BandExporter:
+    """
+    Exporta el canvas a PNG por franjas horizontales.
+
+    Cada franja se rasteriza con los algoritmos de las figuras, usando solo las figuras
+    que la intersectan, y sus filas se envían de inmediato al codificador PNG, de modo
+    que la memoria máxima es la de una franja sin importar el tamaño de salida. Con una
+    escala mayor que 1 las figuras se redibujan a esa escala (no se amplía el raster de
+    pantalla), lo que permite exportar pósteres de decenas de miles de píxeles.
+
+    Atributos:
+        canvas_rect (pygame.Rect): Área del canvas en coordenadas de pantalla.
+        scale (float): Factor de escala de la salida.
+        band_bytes (int): Memoria aproximada de la superficie de cada franja.
+    """
+    def __init__(self, canvas_rect, scale=1.0, band_bytes=64 * 1024 * 1024):
+        self.canvas_rect = pygame.Rect(canvas_rect)
+        self.scale = scale
+        self.band_bytes = band_bytes
+
+    @property
+    def size(self):
+        return (max(1, round(self.canvas_rect.width * self.scale)),
+                max(1, round(self.canvas_rect.height * self.scale)))
+
+    def scaledShapes(self, canvas):
+        """
+        Crea copias de las figuras escaladas en el marco de pantalla (la imagen de salida
+        empieza en la esquina del canvas escalada).
+
+        Returns:
+            list: Pares (descripción escalada, rectángulo envolvente) en orden de dibujo.
+        """
+        scaled = []
+        for shape in canvas.shapes:
+            data = Canvas.shapeToDict(shape)
+            data["points"] = [(round(x * self.scale), round(y * self.scale)) for x, y in data["points"]]
+            data["lineWidth"] = max(1, round(data["lineWidth"] * self.scale))
+            copy = Canvas.shapeFromDict(data)
+            if hasattr(shape, "erase_color"):
+                copy.erase_color = shape.erase_color
+            scaled.append((copy, copy.drawingAlgorithm.bounds(copy)))
+        return scaled
+
+    def export(self, canvas, file):
+        """
+        Escribe el canvas como PNG en un archivo binario abierto.
+
+        Las figuras se dibujan en el mismo marco que en pantalla, con el área a la
+        izquierda del canvas incluida y el recorte en los bordes superior e inferior de
+        la imagen, de modo que a escala 1 el resultado coincide con lo que muestra
+        CanvasView.
+
+        Returns:
+            tuple: Tamaño (ancho, alto) de la imagen escrita.
+        """
+        width, height = self.size
+        left, image_top = round(self.canvas_rect.left * self.scale), round(self.canvas_rect.top * self.scale)
+        scaled = self.scaledShapes(canvas)
+        rects = [rect for _, rect in scaled]
+        # Margen para que los trazos cuyo centro cae fuera de la franja la pinten igual
+        margin = max([shape.lineWidth for shape, _ in scaled] + [1]) + 16
+        band_height = max(margin, min(height, self.band_bytes // (4 * (left + width)) - 2 * margin))
+        # Las franjas se desplazan un número par de filas: el redondeo al par más cercano
+        # de round y numpy.rint da entonces los mismos píxeles en todas las franjas
+        margin += (margin + image_top) % 2
+        band_height += band_height % 2
+        surface = pygame.Surface((left + width, band_height + 2 * margin), 0, 32)
+        writer = PngStreamWriter(file, width, height)
+        for top in range(0, height, band_height):
+            rows = min(band_height, height - top)
+            area = pygame.Rect(0, image_top + top - margin, left + width, rows + 2 * margin)
+            surface.set_clip(None)
+            surface.fill(canvas.background_color)
+            self.drawBackgroundImage(canvas, surface, area)
+            # Las figuras se recortan contra la imagen completa y no contra la franja, así
+            # la geometría no cambia entre franjas y no aparecen costuras. Los trazos que
+            # salen de la superficie de la franja los rasteriza draw_line, que no depende
+            # del recorte (pygame.draw.line sí)
+            output_rect = pygame.Rect(left, image_top - area.top, width, height)
+            surface.set_clip(pygame.Rect(0, -area.top, left + width, image_top + height))
+            for index in area.collidelistall(rects):
+                shape = scaled[index][0]
+                data = Canvas.shapeToDict(shape)
+                data["points"] = [(x, y - area.top) for x, y in data["points"]]
+                band_shape = Canvas.shapeFromDict(data)
+                if hasattr(shape, "erase_color"):
+                    band_shape.erase_color = shape.erase_color
+                band_shape.drawingAlgorithm.draw(band_shape, surface, output_rect)
+            # tobytes entrega las filas en el orden del PNG, sin transponer el arreglo
+            data = pygame.image.tobytes(surface.subsurface((left, margin, width, rows)), "RGB")
+            writer.writeRows(np.frombuffer(data, dtype=np.uint8).reshape(rows, width, 3))
+        writer.close()
+        return width, height
+
+    def drawBackgroundImage(self, canvas, surface, area):
+        """
+        Dibuja la parte del mapa de bits de figuras aplanadas que cae en la franja,
+        escalada a la resolución de salida.
+        """
+        if canvas.background_image is None:
+            return
+        # Filas de pantalla que cubren la franja
+        source = pygame.Rect(self.canvas_rect.left, int(area.top / self.scale) - 1,
+                             self.canvas_rect.width, int(area.height / self.scale) + 3)
+        source = source.clip(canvas.background_rect).clip(self.canvas_rect)
+        if not source.width or not source.height:
+            return
+        strip = canvas.background_image.subsurface(source.move(-canvas.background_rect.x, -canvas.background_rect.y))
+        left, top = round(source.left * self.scale), round(source.top * self.scale)
+        size = (round(source.right * self.scale) - left, round(source.bottom * self.scale) - top)
+        surface.blit(pygame.transform.scale(strip, size), (left, top - area.top))
@@ -1,38 +1,198 @@
 import pygame
+from views.sprite_cache import SpriteCache
+from views.pick_buffer import PickBuffer
+from views.spatial_grid import SpatialGrid
 
 class CanvasView:
-    def __init__(self, canvas, surface, toolbar_width):
+    def __init__(self, canvas, surface, toolbar_width, use_sprite_cache=True):
         self.canvas = canvas
         self.surface = surface
         self.toolbar_width = toolbar_width
+        # Caché de sprites por figura: los renders completos copian sprites en lugar de rasterizar
+        self.sprite_cache = SpriteCache(indexed=canvas.indexed_color) if use_sprite_cache else None
+        # Búfer de identificadores para seleccionar figuras leyendo un solo píxel
+        self.pick_buffer = PickBuffer(canvas)
+        self.hovered_shape = None
+        self.selected_shapes = []
         self.canvas_rect = pygame.Rect(self.toolbar_width, 0,
                                        self.surface.get_width() - self.toolbar_width,
                                        self.surface.get_height())
+        # Redibujado por regiones: solo se repinta lo que cambió desde el último render
+        # Las figuras pintadas se indexan por su número de orden de dibujo en una rejilla
+        # espacial con el rectángulo que ocupan, que se actualiza con cada operación
+        self._order = {}  # id(figura) -> número de orden
+        self._drawn = {}  # número de orden -> figura
+        self._painted = SpatialGrid()  # número de orden -> rectángulo que ocupa en pantalla
+        self._next_order = 0
+        self._dirty = []
+        self._overlay_rects = []
+        self._full_redraw = True
+        self._rendered_rect = None
+        self.comparison = None  # ComparisonView activa, si se comparan algoritmos
+        canvas.addListener(self.onCanvasOperation)
 
     def updateLayout(self, new_width, new_height, toolbar_width):
         self.toolbar_width = toolbar_width
         self.canvas_rect = pygame.Rect(toolbar_width, 0, new_width - toolbar_width, new_height)
+        self.invalidate()
+
+    def invalidate(self, rect=None):
+        """
+        Marca una región del canvas para redibujar en el próximo render.
+
+        Args:
+            rect (pygame.Rect, opcional): Región a redibujar. Si es None se redibuja todo.
+        """
+        if rect is None:
+            self._full_redraw = True
+        else:
+            self._dirty.append(pygame.Rect(rect))
+
+    def onCanvasOperation(self, record, shapes):
+        op = record["op"]
+        if op in ("background", "load", "flatten", "clear"):
+            self.invalidate()  # clear también quita el mapa de bits de figuras aplanadas
+        if op == "erase" and self.canvas.background_image is not None:
+            self._dirty.append(pygame.Rect(record["rect"]))  # Contenido aplanado borrado
+        for shape in shapes:
+            order = self._order.get(id(shape))
+            old_rect = self._painted.rect(order) if order is not None else None
+            if old_rect is not None:
+                self._dirty.append(old_rect)
+            elif op in ("update", "transform"):
+                self._full_redraw = True  # Se desconoce la región que ocupaba
+            elif op != "add":
+                self._dirty.append(shape.drawingAlgorithm.bounds(shape))
+            if op in ("add", "update", "transform"):
+                self._dirty.append(self.track(shape))
+            else:
+                self.untrack(shape)
+        if op in ("remove", "erase", "clear", "flatten"):
+            if self.hovered_shape in shapes:
+                self.hovered_shape = None
+            self.selected_shapes = [shape for shape in self.selected_shapes if shape not in shapes]
+
+    def track(self, shape):
+        """
+        Registra (o actualiza) en el índice espacial el rectángulo de una figura. Las
+        figuras nuevas reciben el siguiente número de orden, ya que se dibujan encima.
+
+        Returns:
+            pygame.Rect: Rectángulo que ocupa la figura.
+        """
+        order = self._order.get(id(shape))
+        if order is None:
+            order = self._order[id(shape)] = self._next_order
+            self._next_order += 1
+            self._drawn[order] = shape
+        # Fuera del canvas no se pinta nada: el recorte acota las celdas que ocupa
+        rect = shape.drawingAlgorithm.bounds(shape).clip(self.canvas_rect)
+        self._painted.insert(order, rect)
+        return rect
+
+    def untrack(self, shape):
+        order = self._order.pop(id(shape), None)
+        if order is not None:
+            del self._drawn[order]
+            self._painted.remove(order)
+
+    def pickShape(self, pos):
+        """
+        Devuelve la figura visible bajo una posición de la pantalla.
+
+        Args:
+            pos (tuple): Posición en coordenadas de pantalla.
+
+        Returns:
+            Shape: Figura bajo la posición, o None si no hay ninguna.
+        """
+        return self.pick_buffer.pick(pos, self.canvas_rect, self.surface.get_size())
 
     def render(self, preview_rect=None):
         """
         Renderiza el lienzo y opcionalmente un rectángulo de previsualización.
 
+        Solo se repintan las regiones afectadas por operaciones del canvas desde el
+        último render (y las de los resaltados del render anterior); el lienzo completo
+        se repinta al cambiar el fondo, el documento o el área del canvas.
+
         Args:
             preview_rect (pygame.Rect, opcional): Rectángulo de previsualización.
         """
-        # Dibuja el fondo del lienzo
-        pygame.draw.rect(self.surface, self.canvas.background_color, self.canvas_rect)
+        if self.comparison is not None:
+            self.comparison.render()
+            if preview_rect:
+                pygame.draw.rect(self.surface, (200, 200, 200), preview_rect, 2)
+            # Al salir del modo de comparación el lienzo se repinta completo
+            self._full_redraw = True
+            self._dirty = []
+            self._overlay_rects = []
+            pygame.display.flip()
+            return
+        if self._full_redraw or self._rendered_rect != self.canvas_rect:
+            # Dibuja el fondo del lienzo
+            pygame.draw.rect(self.surface, self.canvas.background_color, self.canvas_rect)
+            self.canvas.drawBackgroundImage(self.surface, self.canvas_rect)
 
-        # Dibuja todas las figuras en el lienzo
-        for shape in self.canvas.shapes:
-            shape.drawingAlgorithm.draw(shape, self.surface, self.canvas_rect)
+            # Dibuja todas las figuras en el lienzo
+            self._order = {}
+            self._drawn = {}
+            self._painted.clear()
+            self._next_order = 0
+            for shape in self.canvas.shapes:
+                self.track(shape)
+                self.drawShape(shape)
+            self._full_redraw = False
+            self._rendered_rect = pygame.Rect(self.canvas_rect)
+        else:
+            self.redrawRegions(self._dirty + self._overlay_rects)
+        self._dirty = []
+
+        # Resalta la figura bajo el cursor y las figuras seleccionadas
+        self._overlay_rects = []
+        if self.hovered_shape is not None and self.hovered_shape not in self.selected_shapes:
+            self.drawHighlight(self.hovered_shape, (120, 170, 255), 1)
+        for shape in self.selected_shapes:
+            self.drawHighlight(shape, (0, 120, 215), 2)
 
         # Dibuja el rectángulo de previsualización si se proporciona
         if preview_rect:
             pygame.draw.rect(self.surface, (200, 200, 200), preview_rect, 2)  # Gris claro con borde
+            self._overlay_rects.append(pygame.Rect(preview_rect))
 
         # Actualiza la pantalla
         pygame.display.flip()
 
+    def redrawRegions(self, regions):
+        """
+        Repinta las regiones indicadas con el fondo y las figuras que las intersectan,
+        respetando el orden de dibujo.
+        """
+        regions = [region.clip(self.canvas_rect) for region in regions]
+        regions = [region for region in regions if region.width and region.height]
+        if not regions:
+            return
+        if len(regions) > 16:
+            regions = [regions[0].unionall(regions[1:])]
+        for region in regions:
+            self.surface.set_clip(region)
+            self.surface.fill(self.canvas.background_color, region)
+            self.canvas.drawBackgroundImage(self.surface, region)
+            for order in sorted(self._painted.query(region)):
+                self.drawShape(self._drawn[order])
+            self.surface.set_clip(None)
+
+    def drawShape(self, shape):
+        if self.sprite_cache is not None:
+            self.sprite_cache.draw(shape, self.surface, self.canvas_rect)
+        else:
+            shape.drawingAlgorithm.draw(shape, self.surface, self.canvas_rect)
+
+    def drawHighlight(self, shape, color, width):
+        rect = shape.drawingAlgorithm.bounds(shape).clip(self.canvas_rect)
+        if rect.width and rect.height:
+            pygame.draw.rect(self.surface, color, rect, width)
+            self._overlay_rects.append(rect)
+
     def update(self):
         self.render()
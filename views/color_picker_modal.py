@@ -1,9 +1,15 @@
 import tkinter as tk
 
-def tk_color_picker(initial_color=(255, 255, 255), initial_thickness=1, prompt="Elija color de pincel y grosor", show_thickness=True):
-    root = tk.Tk()
-    root.withdraw()
-    win = tk.Toplevel()
+def open_color_picker(master, on_result, initial_color=(255, 255, 255), initial_thickness=1, prompt="Elija color de pincel y grosor", show_thickness=True):
+    """
+    Abre el selector de color sobre una raíz de Tk existente sin bloquear.
+
+    Args:
+        master (tk.Tk): Raíz de Tk que aloja la ventana.
+        on_result (callable): Función llamada al cerrar la ventana con (color, grosor),
+            ambos None si se cancela.
+    """
+    win = tk.Toplevel(master)
     win.title(prompt)
     win.resizable(False, False)
     if show_thickness:
@@ -17,6 +23,7 @@ def tk_color_picker(initial_color=(255, 255, 255), initial_thickness=1, prompt="
         result["color"] = None
         result["thickness"] = None
         win.destroy()
+        on_result(result["color"], result["thickness"])
 
     win.protocol("WM_DELETE_WINDOW", cancel)
 
@@ -69,6 +76,7 @@ def tk_color_picker(initial_color=(255, 255, 255), initial_thickness=1, prompt="
         result["color"] = (r_var.get(), g_var.get(), b_var.get())
         result["thickness"] = thickness_var.get() if show_thickness else None
         win.destroy()
+        on_result(result["color"], result["thickness"])
 
     cancel_button = tk.Button(button_frame, text="Cancelar", command=cancel)
     cancel_button.pack(side="left", padx=10)
@@ -81,6 +89,3 @@ def tk_color_picker(initial_color=(255, 255, 255), initial_thickness=1, prompt="
     win.geometry(f"+{x}+{y}")
 
     win.grab_set()
-    win.wait_window()
-    root.destroy()
-    return result["color"], result["thickness"]
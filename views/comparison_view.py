@@ -0,0 +1,240 @@
+import time
+from collections import deque
+import numpy as np
+import pygame
+from models.canvas import Canvas
+
+class ComparisonView:
+    """
+    Modo de comparación A/B entre dos familias de algoritmos.
+
+    En cada cuadro las mismas figuras del canvas se rasterizan con las dos familias
+    sobre superficies fuera de pantalla (en coordenadas de pantalla, como en un render
+    completo de CanvasView, sin caché de sprites) y se mide el tiempo de cada figura.
+    El resultado se presenta lado a lado (mitad izquierda con la familia A y mitad
+    derecha con la B) o superpuesto, alternando la familia visible y resaltando los
+    píxeles en que difieren. Un panel muestra, por tipo de figura, el tiempo medio por
+    cuadro de cada familia y los píxeles distintos entre ambas.
+
+    Atributos:
+        families (tuple): Las dos familias comparadas, por ejemplo ("BASIC", "PYGAME").
+        mode (str): "split" (lado a lado) u "overlay" (superpuesto).
+        shown (int): Índice de la familia visible en modo superpuesto.
+        highlight (bool): Si se resaltan los píxeles distintos en modo superpuesto.
+        frame_diff (int): Píxeles distintos entre ambas familias en el último cuadro.
+    """
+    MODES = ("split", "overlay")
+    DIFF_COLOR = (255, 0, 255)
+
+    def __init__(self, canvas, canvasView, families=("BASIC", "PYGAME"), window=60):
+        """
+        Args:
+            canvas (Canvas): Canvas cuyas figuras se comparan.
+            canvasView (CanvasView): Vista sobre cuya superficie se presenta la comparación.
+            families (tuple, opcional): Familias A y B.
+            window (int, opcional): Cuadros que se promedian en los tiempos.
+        """
+        self.canvas = canvas
+        self.canvasView = canvasView
+        self.families = tuple(families)
+        self.mode = "split"
+        self.shown = 0
+        self.highlight = True
+        self.frame_diff = 0
+        self.window = window
+        self._surfaces = [None, None]
+        self._twins = {}  # id(figura) -> (versión, figura, copias por familia)
+        self._times = {}  # (familia, tipo) -> tiempos por cuadro de los últimos cuadros
+        self._type_diffs = {}  # tipo -> píxeles distintos con solo las figuras de ese tipo
+        self._stale_types = None  # Tipos cuyo conteo de diferencias hay que recalcular (None: todos)
+        self._font = None
+        canvas.addListener(self.onCanvasOperation)
+
+    def close(self):
+        self.canvas.removeListener(self.onCanvasOperation)
+
+    def onCanvasOperation(self, record, shapes):
+        if record["op"] in ("load", "clear", "flatten", "background") or self._stale_types is None:
+            self._stale_types = None
+            return
+        for shape in shapes:
+            self._stale_types.add(self.shapeType(shape))
+
+    def toggleMode(self):
+        self.mode = self.MODES[(self.MODES.index(self.mode) + 1) % len(self.MODES)]
+
+    def toggleShown(self):
+        self.shown = 1 - self.shown
+
+    @staticmethod
+    def shapeType(shape):
+        return Canvas.shapeToDict(shape)["type"]
+
+    def twin(self, shape, family):
+        """
+        Devuelve una copia de la figura dibujada con la familia indicada. Las copias se
+        conservan mientras no cambie la versión de la figura.
+        """
+        entry = self._twins.get(id(shape))
+        if entry is None or entry[0] != shape.version or entry[1] is not shape:
+            entry = self._twins[id(shape)] = (shape.version, shape, {})
+        copies = entry[2]
+        copy = copies.get(family)
+        if copy is None:
+            data = Canvas.shapeToDict(shape)
+            if data["type"] is None or data["algorithmType"] == family:
+                copy = shape
+            else:
+                try:
+                    copy = Canvas.shapeFromDict(dict(data, algorithmType=family))
+                except ValueError:
+                    copy = shape  # La familia no tiene algoritmo para este tipo
+                if hasattr(shape, "erase_color"):
+                    copy.erase_color = shape.erase_color
+            copies[family] = copy
+        return copy
+
+    def render(self):
+        """
+        Rasteriza las figuras con ambas familias y presenta la comparación en la
+        superficie de la vista.
+        """
+        rect = self.canvasView.canvas_rect
+        size = (rect.right, rect.bottom)
+        for i in range(2):
+            if self._surfaces[i] is None or self._surfaces[i].get_size() != size:
+                self._surfaces[i] = pygame.Surface(size, 0, 32)
+                self._stale_types = None
+        shapes = self.canvas.shapes
+        types = [self.shapeType(shape) for shape in shapes]
+        for family, target in zip(self.families, self._surfaces):
+            totals = self.drawFamily(family, shapes, types, target, rect, background=True)
+            for shape_type in set(types) | {key[1] for key in self._times if key[0] == family}:
+                samples = self._times.setdefault((family, shape_type), deque(maxlen=self.window))
+                samples.append(totals.get(shape_type, 0.0))
+        # Las copias guardan viva su figura, así que su id no puede reutilizarse
+        live = {id(shape) for shape in shapes}
+        self._twins = {key: entry for key, entry in self._twins.items() if key in live}
+
+        a, b = (pygame.surfarray.pixels2d(surface)[rect.left:rect.right, rect.top:rect.bottom]
+                for surface in self._surfaces)
+        different = a != b
+        self.frame_diff = int(np.count_nonzero(different))
+        del a, b
+        self.updateTypeDiffs(shapes, types, rect)
+        self.present(rect, different)
+
+    def drawFamily(self, family, shapes, types, target, rect, background):
+        """
+        Dibuja las figuras con una familia y mide el tiempo de cada una.
+
+        Returns:
+            dict: Segundos acumulados por tipo de figura.
+        """
+        target.fill(self.canvas.background_color, rect)
+        if background:
+            self.canvas.drawBackgroundImage(target, rect)
+        totals = {}
+        for shape, shape_type in zip(shapes, types):
+            copy = self.twin(shape, family)
+            start = time.perf_counter()
+            copy.drawingAlgorithm.draw(copy, target, rect)
+            totals[shape_type] = totals.get(shape_type, 0.0) + time.perf_counter() - start
+        return totals
+
+    def updateTypeDiffs(self, shapes, types, rect):
+        """
+        Recalcula, para los tipos con figuras nuevas o modificadas, los píxeles distintos
+        entre las familias dibujando solo las figuras de ese tipo.
+        """
+        present = set(types)
+        stale = present if self._stale_types is None else self._stale_types & present
+        self._type_diffs = {key: value for key, value in self._type_diffs.items() if key in present}
+        if not stale:
+            self._stale_types = set()
+            return
+        scratch = [pygame.Surface(surface.get_size(), 0, 32) for surface in self._surfaces]
+        for shape_type in stale:
+            selected = [shape for shape, kind in zip(shapes, types) if kind == shape_type]
+            for family, target in zip(self.families, scratch):
+                self.drawFamily(family, selected, [shape_type] * len(selected), target, rect, background=False)
+            a, b = (pygame.surfarray.pixels2d(surface)[rect.left:rect.right, rect.top:rect.bottom]
+                    for surface in scratch)
+            self._type_diffs[shape_type] = int(np.count_nonzero(a != b))
+            del a, b
+        self._stale_types = set()
+
+    def present(self, rect, different):
+        surface = self.canvasView.surface
+        if self.mode == "split":
+            half = rect.width // 2
+            left = pygame.Rect(rect.left, rect.top, half, rect.height)
+            right = pygame.Rect(rect.left + half, rect.top, rect.width - half, rect.height)
+            surface.blit(self._surfaces[0], left, left)
+            surface.blit(self._surfaces[1], right, right)
+            pygame.draw.line(surface, (90, 90, 90), right.topleft, (right.left, right.bottom - 1))
+            self.drawLabel(self.families[0], (left.left + 6, left.top + 6))
+            self.drawLabel(self.families[1], (right.left + 6, right.top + 6))
+        else:
+            surface.blit(self._surfaces[self.shown], rect, rect)
+            if self.highlight and self.frame_diff:
+                pixels = pygame.surfarray.pixels2d(surface)
+                pixels[rect.left:rect.right, rect.top:rect.bottom][different] = surface.map_rgb(self.DIFF_COLOR) & 0xFFFFFFFF
+                del pixels
+            self.drawLabel(f"{self.families[self.shown]} (Tab alterna)", (rect.left + 6, rect.top + 6))
+        self.drawStats(rect)
+
+    def font(self):
+        if self._font is None:
+            self._font = pygame.font.SysFont(None, 18)
+        return self._font
+
+    def drawLabel(self, text, pos):
+        label = self.font().render(text, True, (255, 255, 255), (40, 40, 40))
+        self.canvasView.surface.blit(label, pos)
+
+    def summary(self):
+        """
+        Resume las mediciones por tipo de figura.
+
+        Returns:
+            list: Filas (tipo, ms por cuadro de A, ms por cuadro de B, píxeles distintos).
+        """
+        def mean_ms(family, shape_type):
+            samples = self._times.get((family, shape_type))
+            return 1000 * sum(samples) / len(samples) if samples else 0.0
+        kinds = sorted({key[1] for key in self._times} & set(self._type_diffs))
+        return [(kind, mean_ms(self.families[0], kind), mean_ms(self.families[1], kind), self._type_diffs[kind])
+                for kind in kinds]
+
+    def drawStats(self, rect):
+        """
+        Dibuja el panel con los tiempos por cuadro y las diferencias por tipo de figura.
+        """
+        rows = self.summary()
+        a, b = self.families
+        table = [("Tipo", f"{a} ms", f"{b} ms", "Dif. px")]
+        table += [(kind, f"{time_a:.2f}", f"{time_b:.2f}", str(diff)) for kind, time_a, time_b, diff in rows]
+        table.append(("Total", f"{sum(r[1] for r in rows):.2f}", f"{sum(r[2] for r in rows):.2f}", str(self.frame_diff)))
+        font = self.font()
+        cells = [[font.render(text, True, (255, 255, 255)) for text in row] for row in table]
+        widths = [max(row[i].get_width() for row in cells) + 12 for i in range(4)]
+        height = font.get_linesize()
+        panel = pygame.Surface((sum(widths) + 6, height * len(cells) + 8), pygame.SRCALPHA)
+        panel.fill((30, 30, 30, 200))
+        for i, row in enumerate(cells):
+            x = 6
+            for j, cell in enumerate(row):
+                # La primera columna se alinea a la izquierda y las numéricas a la derecha
+                offset = 0 if j == 0 else widths[j] - 12 - cell.get_width()
+                panel.blit(cell, (x + offset, 4 + i * height))
+                x += widths[j]
+        self.canvasView.surface.blit(panel, (rect.left + 6, rect.bottom - panel.get_height() - 6))
+
+    def printSummary(self):
+        a, b = self.families
+        print(f"Comparación {a} / {b} (media de los últimos {self.window} cuadros):")
+        for kind, time_a, time_b, diff in self.summary():
+            faster = a if time_a <= time_b else b
+            print(f"  {kind:<10} {a} {time_a:.2f} ms  {b} {time_b:.2f} ms  "
+                  f"diferencia {diff} px  más rápido: {faster}")
@@ -0,0 +1,220 @@
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import pygame
+
+# Evento de Pygame con el resultado de un diálogo: atributos tag y result
+DIALOG_RESULT = pygame.event.custom_type()
+
+class DialogService:
+    """
+    Servicio de diálogos de archivo y de color con una única instancia de Tk.
+
+    La instancia de Tk vive durante toda la sesión en un proceso auxiliar
+    (python -m views.dialog_service), en el hilo principal de ese proceso: Tk no admite
+    ejecutarse fuera del hilo principal en todas las plataformas (en macOS falla), y el
+    hilo principal de la aplicación es el bucle de Pygame. Abrir un diálogo no crea ni
+    destruye una raíz de Tk y no bloquea el bucle de Pygame: el canvas se sigue
+    renderizando mientras el diálogo está abierto.
+
+    Las peticiones y los resultados viajan como líneas JSON por la entrada y la salida
+    estándar del proceso; un hilo lector publica cada resultado como un evento
+    DIALOG_RESULT con la etiqueta de la petición.
+
+    Atributos:
+        busy (bool): True mientras hay un diálogo pedido o abierto.
+    """
+    POLL_MS = 50
+
+    def __init__(self):
+        self.busy = False
+        self._process = None
+        self._reader = None
+        self._pending = None  # Etiqueta de la petición en curso
+
+    def askSaveFilename(self, tag, **options):
+        """
+        Pide un diálogo de guardar archivo; el resultado es la ruta o None si se cancela.
+
+        Args:
+            tag (str): Etiqueta con que se publicará el resultado.
+            **options: Opciones de filedialog.asksaveasfilename.
+
+        Returns:
+            bool: True si se aceptó la petición.
+        """
+        return self.request(tag, "save", options)
+
+    def askOpenFilename(self, tag, **options):
+        """
+        Pide un diálogo de abrir archivo; el resultado es la ruta o None si se cancela.
+        """
+        return self.request(tag, "open", options)
+
+    def askColor(self, tag, initial_color, initial_thickness=1, prompt="Elija color de pincel y grosor", show_thickness=True):
+        """
+        Pide el selector de color; el resultado es la tupla (color, grosor), con None en
+        ambos si se cancela.
+        """
+        return self.request(tag, "color", {
+            "initial_color": initial_color,
+            "initial_thickness": initial_thickness,
+            "prompt": prompt,
+            "show_thickness": show_thickness
+        })
+
+    def request(self, tag, kind, options):
+        if self.busy:
+            print("Ya hay un diálogo abierto.")
+            return False
+        self.busy = True
+        self._pending = tag
+        try:
+            if self._process is None or self._process.poll() is not None:
+                self.start()
+            self._process.stdin.write(json.dumps({"tag": tag, "kind": kind, "options": options}) + "\n")
+            self._process.stdin.flush()
+        except OSError as e:
+            print(f"No se pudieron abrir diálogos: {e}")
+            self._post(tag, None)
+        return True
+
+    def start(self):
+        """
+        Lanza el proceso de diálogos y el hilo que lee sus resultados.
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "views.dialog_service"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, encoding="utf-8", env=env
+        )
+        self._reader = threading.Thread(target=self._read, args=(self._process,), name="DialogService", daemon=True)
+        self._reader.start()
+
+    def close(self):
+        """
+        Cierra el proceso de diálogos y espera al hilo lector. Un diálogo que siga
+        abierto se cancela.
+        """
+        process = self._process
+        if process is None:
+            return
+        self._process = None
+        if self.busy:
+            process.terminate()  # El proceso no lee su entrada mientras muestra un diálogo
+        else:
+            try:
+                process.stdin.close()  # Fin de la entrada: el proceso termina solo
+            except OSError:
+                pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        self._reader.join()
+        self._reader = None
+
+    def _read(self, process):
+        for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue  # Salida ajena al protocolo
+            result = message.get("result")
+            if isinstance(result, list):
+                # Color y grosor: JSON devuelve listas
+                result = tuple(tuple(value) if isinstance(value, list) else value for value in result)
+            self._post(message.get("tag"), result)
+        process.stdout.close()
+        if self.busy:
+            # El proceso terminó con un diálogo pendiente: se publica como cancelado
+            self._post(self._pending, None)
+
+    def _post(self, tag, result):
+        self.busy = False
+        self._pending = None
+        try:
+            pygame.event.post(pygame.event.Event(DIALOG_RESULT, tag=tag, result=result))
+        except pygame.error:
+            pass  # Pygame ya se cerró
+
+def run_dialogs(requests=sys.stdin, results=sys.stdout, poll_ms=DialogService.POLL_MS):
+    """
+    Atiende en el hilo principal las peticiones de diálogo de DialogService hasta que
+    se cierra la entrada. Se ejecuta en el proceso auxiliar.
+
+    Args:
+        requests (archivo de texto): Peticiones, una línea JSON por petición.
+        results (archivo de texto): Resultados, una línea JSON por petición.
+        poll_ms (int, opcional): Intervalo con que Tk revisa si hay peticiones nuevas.
+    """
+    import tkinter as tk
+    from tkinter import filedialog
+    from views.color_picker_modal import open_color_picker
+
+    pending = queue.Queue()
+
+    def read_requests():
+        # Tk no puede esperar la entrada estándar en todas las plataformas: un hilo la lee
+        for line in requests:
+            try:
+                pending.put(json.loads(line))
+            except ValueError:
+                continue
+        pending.put(None)
+
+    def answer(tag, result):
+        results.write(json.dumps({"tag": tag, "result": result}) + "\n")
+        results.flush()
+
+    threading.Thread(target=read_requests, daemon=True).start()
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError as e:
+        print(f"No se pudieron abrir diálogos: {e}", file=sys.stderr)
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            answer(item.get("tag"), None)
+
+    def poll():
+        try:
+            item = pending.get_nowait()
+        except queue.Empty:
+            root.after(poll_ms, poll)
+            return
+        if item is None:
+            root.quit()
+            return
+        tag, kind, options = item.get("tag"), item.get("kind"), item.get("options") or {}
+        if kind == "color":
+            options["initial_color"] = tuple(options.get("initial_color", (255, 255, 255)))
+            # El selector no es modal: publica el resultado al cerrarse
+            def on_result(color, thickness):
+                answer(tag, [color, thickness])
+                root.after(poll_ms, poll)
+            open_color_picker(root, on_result, **options)
+            return
+        if "filetypes" in options:
+            options["filetypes"] = [tuple(filetype) for filetype in options["filetypes"]]
+        if kind == "save":
+            path = filedialog.asksaveasfilename(parent=root, **options)
+        else:
+            path = filedialog.askopenfilename(parent=root, **options)
+        answer(tag, path or None)
+        root.after(poll_ms, poll)
+
+    root.after(0, poll)
+    root.mainloop()
+    root.destroy()
+
+if __name__ == "__main__":
+    run_dialogs()
@@ -0,0 +1,54 @@
+import io
+import pygame
+
+class OffscreenRenderer:
+    """
+    Renderizador sin ventana del modelo Canvas.
+
+    Dibuja las figuras con sus propios algoritmos sobre una superficie en memoria, en
+    las mismas coordenadas de pantalla que usa la aplicación, de modo que el resultado
+    coincide píxel a píxel con lo que muestra CanvasView.
+
+    Atributos:
+        origin (tuple): Esquina superior izquierda del canvas en coordenadas de pantalla.
+            Por defecto (60, 0), el ancho de la barra de herramientas de la aplicación.
+    """
+    def __init__(self, origin=(60, 0)):
+        self.origin = tuple(origin)
+
+    def render(self, canvas, width, height):
+        """
+        Renderiza el canvas en una superficie nueva.
+
+        Args:
+            canvas (Canvas): Canvas a renderizar.
+            width (int): Ancho del área a renderizar.
+            height (int): Alto del área a renderizar.
+
+        Returns:
+            pygame.Surface: Superficie de width x height con el contenido del canvas.
+        """
+        ox, oy = self.origin
+        if ox < 0 or oy < 0:
+            raise ValueError("El origen del canvas no puede ser negativo")
+        canvas_rect = pygame.Rect(ox, oy, width, height)
+        # Se dibuja en coordenadas absolutas para reproducir exactamente el redondeo de
+        # los algoritmos y luego se recorta el área del canvas.
+        surface = pygame.Surface((ox + width, oy + height), 0, 32)
+        surface.fill(canvas.background_color, canvas_rect)
+        canvas.drawBackgroundImage(surface, canvas_rect)
+        for shape in canvas.shapes:
+            shape.drawingAlgorithm.draw(shape, surface, canvas_rect)
+        return surface.subsurface(canvas_rect).copy()
+
+    @staticmethod
+    def encodePng(surface):
+        """
+        Codifica una superficie como PNG.
+
+        Returns:
+            bytes: Contenido del archivo PNG.
+        """
+        buffer = io.BytesIO()
+        pygame.image.save(surface, buffer, "png")
+        return buffer.getvalue()
@@ -0,0 +1,176 @@
+import copy
+import pygame
+from views.spatial_grid import SpatialGrid
+
+class PickBuffer:
+    """
+    Búfer de selección fuera de pantalla.
+
+    Cada figura del canvas se rasteriza con su propio algoritmo de dibujo, pero usando
+    como color un identificador único codificado en RGB. Encontrar la figura bajo el
+    cursor consiste entonces en leer un píxel y buscar su identificador en un
+    diccionario, sin recorrer Canvas.shapes.
+
+    El búfer escucha las operaciones del canvas: las figuras añadidas se dibujan encima
+    de inmediato y las eliminadas o modificadas marcan su región como sucia, que se
+    redibuja (solo con las figuras que la intersectan) antes de la siguiente consulta.
+    Las figuras que intersectan cada región se buscan en un índice espacial que se
+    actualiza con cada operación, por lo que el costo no crece con el tamaño del documento.
+
+    Los identificadores crecen con el orden de inserción, que coincide con el orden de
+    dibujo del canvas, por lo que redibujar una región en orden de identificador respeta
+    qué figura queda encima.
+
+    Atributos:
+        canvas (Canvas): Canvas observado.
+        surface (pygame.Surface): Superficie de identificadores.
+        canvas_rect (pygame.Rect): Área del canvas usada en el último redibujado completo.
+    """
+    MAX_ID = 0xFFFFFF
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.surface = None
+        self.canvas_rect = None
+        self._next_id = 1
+        self._shapes = {}  # id de selección -> figura (en orden de dibujo)
+        self._rects = SpatialGrid()  # id de selección -> rectángulo pintado
+        self._ids = {}     # id(figura) -> id de selección
+        self._dirty = []
+        self._full_rebuild = True
+        canvas.addListener(self.onCanvasOperation)
+
+    def onCanvasOperation(self, record, shapes):
+        op = record["op"]
+        if op == "add":
+            for shape in shapes:
+                self.register(shape)
+                if not self._full_rebuild and self.surface is not None:
+                    self.drawShape(shape)
+        elif op in ("remove", "erase", "clear", "flatten"):
+            # Las figuras aplanadas pasan al fondo y dejan de poder seleccionarse
+            for shape in shapes:
+                self.unregister(shape)
+        elif op in ("update", "transform"):
+            for shape in shapes:
+                self.markChanged(shape)
+        elif op == "load":
+            self._full_rebuild = True
+
+    def register(self, shape):
+        if self._next_id > self.MAX_ID:
+            self._full_rebuild = True  # Se reasignan identificadores compactos
+            return
+        pick_id = self._next_id
+        self._next_id += 1
+        self._shapes[pick_id] = shape
+        self._ids[id(shape)] = pick_id
+        self._rects.insert(pick_id, None)
+
+    def unregister(self, shape):
+        pick_id = self._ids.pop(id(shape), None)
+        if pick_id is None:
+            return
+        del self._shapes[pick_id]
+        rect = self._rects.remove(pick_id)
+        if rect is not None:
+            self._dirty.append(rect)
+
+    def markChanged(self, shape):
+        pick_id = self._ids.get(id(shape))
+        if pick_id is None:
+            return
+        rect = self._rects.rect(pick_id)
+        if rect is not None:
+            self._dirty.append(rect)
+        if self.canvas_rect is not None:
+            new_rect = shape.drawingAlgorithm.bounds(shape).clip(self.canvas_rect)
+            self._dirty.append(new_rect)
+            self._rects.insert(pick_id, new_rect)
+
+    def pick(self, pos, canvas_rect, size, radius=2):
+        """
+        Devuelve la figura visible en una posición del canvas.
+
+        Args:
+            pos (tuple): Posición en coordenadas de pantalla.
+            canvas_rect (pygame.Rect): Área actual del canvas.
+            size (tuple): Tamaño de la superficie de dibujo.
+            radius (int, opcional): Tolerancia en píxeles alrededor de pos, útil para
+                figuras de un píxel de grosor.
+
+        Returns:
+            Shape: Figura encontrada, o None si no hay ninguna.
+        """
+        if not canvas_rect.collidepoint(pos):
+            return None
+        self.sync(canvas_rect, size)
+        x, y = pos
+        shape = self.shapeAt(x, y)
+        if shape is not None:
+            return shape
+        for r in range(1, radius + 1):
+            for dx in range(-r, r + 1):
+                for dy in (-r, r) if abs(dx) != r else range(-r, r + 1):
+                    shape = self.shapeAt(x + dx, y + dy)
+                    if shape is not None:
+                        return shape
+        return None
+
+    def shapeAt(self, x, y):
+        if not self.canvas_rect.collidepoint(x, y):
+            return None
+        r, g, b, _ = self.surface.get_at((x, y))
+        return self._shapes.get((r << 16) | (g << 8) | b)
+
+    def sync(self, canvas_rect, size):
+        """
+        Deja el búfer al día: redibujo completo si cambió el área o el documento, o
+        redibujo de las regiones sucias en caso contrario.
+        """
+        if self.surface is None or self.surface.get_size() != size or self.canvas_rect != canvas_rect:
+            self.surface = pygame.Surface(size, 0, 32)
+            self.canvas_rect = pygame.Rect(canvas_rect)
+            self._full_rebuild = True
+        if self._full_rebuild:
+            self.rebuild()
+        elif self._dirty:
+            self.redrawRegions(self._dirty)
+        self._dirty = []
+
+    def rebuild(self):
+        self._next_id = 1
+        self._shapes.clear()
+        self._rects.clear()
+        self._ids.clear()
+        self.surface.fill((0, 0, 0))
+        for shape in self.canvas.shapes:
+            self.register(shape)
+            self.drawShape(shape)
+        self._full_rebuild = False
+
+    def redrawRegions(self, regions):
+        for region in regions:
+            region = region.clip(self.canvas_rect)
+            if not region.width or not region.height:
+                continue
+            self.surface.fill((0, 0, 0), region)
+            self.surface.set_clip(region)
+            # Los identificadores siguen el orden de dibujo
+            for pick_id in sorted(self._rects.query(region)):
+                self.drawShape(self._shapes[pick_id])
+            self.surface.set_clip(None)
+
+    def drawShape(self, shape):
+        """
+        Rasteriza una figura en el búfer con el color de su identificador.
+        """
+        pick_id = self._ids.get(id(shape))
+        if pick_id is None:
+            return
+        proxy = copy.copy(shape)
+        proxy.color = ((pick_id >> 16) & 0xFF, (pick_id >> 8) & 0xFF, pick_id & 0xFF)
+        if hasattr(proxy, "erase_color"):
+            proxy.erase_color = (0, 0, 0)  # Las áreas de borrado tapan, pero no se seleccionan
+        shape.drawingAlgorithm.draw(proxy, self.surface, self.canvas_rect)
+        self._rects.insert(pick_id, shape.drawingAlgorithm.bounds(shape).clip(self.canvas_rect))
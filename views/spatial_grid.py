@@ -0,0 +1,92 @@
+import pygame
+
+class SpatialGrid:
+    """
+    Índice espacial de rectángulos sobre una rejilla uniforme.
+
+    Cada clave se registra en las celdas que cubre su rectángulo, de modo que buscar
+    las claves que intersectan una región solo recorre las celdas de esa región y no
+    todas las figuras. Insertar, mover o quitar una clave cuesta lo proporcional a las
+    celdas que cubre.
+
+    Atributos:
+        cell_size (int): Lado de cada celda en píxeles.
+    """
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self._cells = {}  # (columna, fila) -> claves cuyo rectángulo cubre la celda
+        self._rects = {}  # clave -> rectángulo (o None si aún no ocupa área)
+
+    def __len__(self):
+        return len(self._rects)
+
+    def __contains__(self, key):
+        return key in self._rects
+
+    def rect(self, key):
+        return self._rects.get(key)
+
+    def cells(self, rect):
+        size = self.cell_size
+        for column in range(rect.left // size, (rect.right - 1) // size + 1):
+            for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield column, row
+
+    def insert(self, key, rect):
+        """
+        Registra una clave con su rectángulo, reemplazando el anterior si ya existía.
+
+        Args:
+            key: Clave hashable.
+            rect (pygame.Rect): Rectángulo que ocupa, o None.
+        """
+        self.remove(key)
+        rect = pygame.Rect(rect) if rect is not None else None
+        self._rects[key] = rect
+        if rect is not None and rect.width > 0 and rect.height > 0:
+            for cell in self.cells(rect):
+                self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        """
+        Quita una clave del índice.
+
+        Returns:
+            pygame.Rect: Rectángulo que tenía, o None si no estaba.
+        """
+        rect = self._rects.pop(key, None)
+        if rect is not None and rect.width > 0 and rect.height > 0:
+            for cell in self.cells(rect):
+                keys = self._cells.get(cell)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._cells[cell]
+        return rect
+
+    def query(self, region):
+        """
+        Devuelve las claves cuyo rectángulo intersecta una región.
+
+        Args:
+            region (pygame.Rect): Región de búsqueda.
+
+        Returns:
+            set: Claves encontradas.
+        """
+        found = set()
+        if region.width <= 0 or region.height <= 0:
+            return found
+        candidates = set()
+        for cell in self.cells(region):
+            keys = self._cells.get(cell)
+            if keys:
+                candidates.update(keys)
+        for key in candidates:
+            if region.colliderect(self._rects[key]):
+                found.add(key)
+        return found
+
+    def clear(self):
+        self._cells.clear()
+        self._rects.clear()
@@ -0,0 +1,181 @@
+import weakref
+from collections import OrderedDict
+import numpy as np
+import pygame
+from models.palette import to_indexed
+
+class CachedRaster:
+    """
+    Rasterización en caché de una figura.
+
+    Según la densidad de la figura se guarda de una de dos formas:
+    - Como arreglo de índices de píxel (xs, ys) más un único color ya mapeado al formato
+      de la superficie destino, para figuras delgadas de un solo color (líneas, contornos).
+    - Como sprite recortado al rectángulo que ocupa la figura, para figuras densas o con
+      varios colores.
+    """
+    __slots__ = ("ref", "version", "canvas_key", "rect", "sprite", "xs", "ys", "mapped_color", "nbytes")
+
+    def __init__(self, ref, version, canvas_key, rect):
+        self.ref = ref
+        self.version = version
+        self.canvas_key = canvas_key
+        self.rect = rect
+        self.sprite = None
+        self.xs = None
+        self.ys = None
+        self.mapped_color = None
+        self.nbytes = 0
+
+    def blit(self, surface):
+        if self.sprite is not None:
+            surface.blit(self.sprite, self.rect)
+        elif self.xs is not None and len(self.xs):
+            xs, ys = self.xs, self.ys
+            if xs.dtype == np.uint16:
+                # Índices compactos del modo indexado, relativos a la esquina del rectángulo
+                xs, ys = xs + self.rect.x, ys + self.rect.y
+            clip = surface.get_clip()
+            if not clip.contains(self.rect):
+                # Escritura directa en memoria: hay que respetar el recorte de la superficie
+                clip = clip.clip(self.rect)
+                mask = (xs >= clip.left) & (xs < clip.right) & (ys >= clip.top) & (ys < clip.bottom)
+                xs, ys = xs[mask], ys[mask]
+            pixels = pygame.surfarray.pixels2d(surface)
+            pixels[xs, ys] = self.mapped_color
+            del pixels
+
+
+class SpriteCache:
+    """
+    Caché LRU de rasterizaciones por figura.
+
+    Cada figura se rasteriza una sola vez con su propio algoritmo sobre una superficie
+    auxiliar transparente; el resultado, recortado al rectángulo que ocupa dentro del
+    canvas, se guarda y los renders siguientes solo lo copian. Una entrada deja de ser
+    válida cuando cambia la versión de la figura (updatePoints, color o grosor) o el
+    área del canvas.
+
+    Atributos:
+        max_bytes (int): Memoria máxima que pueden ocupar todas las entradas juntas.
+        max_sprite_bytes (int): Tamaño máximo de una entrada individual; las figuras más
+            grandes se dibujan directamente sin pasar por la caché.
+        used_bytes (int): Memoria ocupada actualmente por la caché.
+        indexed (bool): Si los sprites se guardan con paleta de 8 bits.
+    """
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_sprite_bytes=None, indexed=False):
+        """
+        Inicializa la caché de sprites.
+
+        Args:
+            max_bytes (int, opcional): Límite de memoria de la caché en bytes.
+            max_sprite_bytes (int, opcional): Límite por entrada. Por defecto es un cuarto de max_bytes.
+            indexed (bool, opcional): Guarda los sprites con paleta de 8 bits (modo de color indexado).
+        """
+        self.max_bytes = max_bytes
+        self.max_sprite_bytes = max_sprite_bytes if max_sprite_bytes is not None else max_bytes // 4
+        self.used_bytes = 0
+        self.indexed = indexed
+        self._entries = OrderedDict()  # id(shape) -> CachedRaster
+        self._scratch = None
+
+    def draw(self, shape, surface, canvas_rect):
+        """
+        Dibuja una figura en la superficie usando su rasterización en caché si es válida.
+
+        Args:
+            shape (Shape): Figura a dibujar.
+            surface (pygame.Surface): Superficie destino.
+            canvas_rect (pygame.Rect): Área del canvas.
+        """
+        key = id(shape)
+        canvas_key = tuple(canvas_rect)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.ref() is shape and entry.version == shape.version and entry.canvas_key == canvas_key:
+                self._entries.move_to_end(key)
+                entry.blit(surface)
+                return
+            self._remove(key)
+
+        rect = shape.drawingAlgorithm.bounds(shape).clip(canvas_rect)
+        if rect.width * rect.height * (1 if self.indexed else 4) > self.max_sprite_bytes:
+            shape.drawingAlgorithm.draw(shape, surface, canvas_rect)
+            return
+        ref = weakref.ref(shape, lambda _ref, k=key: self._remove(k, _ref))
+        entry = CachedRaster(ref, shape.version, canvas_key, rect)
+        if rect.width and rect.height:
+            self.rasterize(shape, entry, surface, canvas_rect)
+        self._store(key, entry)
+        entry.blit(surface)
+
+    def rasterize(self, shape, entry, surface, canvas_rect):
+        """
+        Rasteriza una figura y llena la entrada de caché correspondiente.
+
+        La figura se dibuja en coordenadas absolutas sobre una superficie auxiliar, por lo
+        que la entrada contiene exactamente los mismos píxeles que un dibujo directo.
+        """
+        rect = entry.rect
+        if self._scratch is None or self._scratch.get_size() != surface.get_size():
+            self._scratch = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+        self._scratch.fill((0, 0, 0, 0), rect)
+        shape.drawingAlgorithm.draw(shape, self._scratch, canvas_rect)
+        sprite = self._scratch.subsurface(rect)
+
+        alpha = pygame.surfarray.pixels_alpha(sprite)
+        xs, ys = np.nonzero(alpha)
+        del alpha
+        area = rect.width * rect.height
+        # Con paleta un sprite ocupa un byte por píxel y los índices de píxel se guardan en
+        # 16 bits relativos al rectángulo: se elige lo que ocupe menos
+        compact = self.indexed and rect.width <= 0xFFFF and rect.height <= 0xFFFF
+        if (len(xs) * 4 < area if compact else len(xs) * 8 < area * 4) and surface.get_bytesize() in (1, 2, 4):
+            rgb = pygame.surfarray.pixels3d(sprite)[xs, ys]
+            if len(xs) == 0 or (rgb == rgb[0]).all():
+                if compact:
+                    entry.xs, entry.ys = xs.astype(np.uint16), ys.astype(np.uint16)
+                else:
+                    entry.xs = (xs + rect.x).astype(np.intp)
+                    entry.ys = (ys + rect.y).astype(np.intp)
+                entry.mapped_color = surface.map_rgb(tuple(int(c) for c in rgb[0])) if len(xs) else 0
+                entry.nbytes = entry.xs.nbytes + entry.ys.nbytes
+                return
+        indexed = to_indexed(sprite, (shape.color, getattr(shape, "erase_color", shape.color))) if self.indexed else None
+        if indexed is not None:
+            entry.sprite = indexed
+        elif len(xs) == area:
+            # Sin transparencia: un sprite sin canal alfa se copia mucho más rápido
+            entry.sprite = sprite.convert(surface)
+        else:
+            entry.sprite = sprite.copy()
+        entry.nbytes = area * entry.sprite.get_bytesize()
+
+    def discard(self, shape):
+        """
+        Elimina de la caché la rasterización de una figura, si existe.
+
+        Args:
+            shape (Shape): Figura cuya entrada se descarta.
+        """
+        self._remove(id(shape))
+
+    def clear(self):
+        """
+        Vacía la caché por completo.
+        """
+        self._entries.clear()
+        self.used_bytes = 0
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self.used_bytes += entry.nbytes
+        while self.used_bytes > self.max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key, ref=None):
+        entry = self._entries.get(key)
+        if entry is None or (ref is not None and entry.ref is not ref):
+            return
+        del self._entries[key]
+        self.used_bytes -= entry.nbytes
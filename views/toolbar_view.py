@@ -157,12 +157,13 @@ class ToolbarView:
         y = margin
 
         # Sección de herramientas
-        tools = ["LINE", "CIRCLE", "RECTANGLE", "POLYGON", "CURVE", "ERASE_AREA"]
+        tools = ["LINE", "CIRCLE", "ELLIPSE", "RECTANGLE", "POLYGON", "CURVE", "ERASE_AREA", "SELECT"]
+        tool_labels = {"ELLIPSE": "Eli", "SELECT": "Sel"}  # Herramientas sin ícono
         for tool in tools:
             img = self.icons.get(tool)
             btn = Button((x, y, btn_width, btn_height),
                          lambda t=tool: self.controller.setTool(t),
-                         self.font, image=img)
+                         self.font, text=tool_labels.get(tool), image=img)
             self.buttons.append(btn)
             self.tool_buttons[tool] = btn
             y += btn_height + margin